@@ -0,0 +1,176 @@
+from hashlib import md5
+from time import time_ns
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+
+# 응답 캐시 그룹별 의존 모델: {group: {model: 객체 id 속성 (None 이면 그룹 전체)}}
+DEPENDENCIES = {}
+
+STATS = ('hit', 'miss')
+
+
+def _stamp_key(group, pk=None):
+    return f'response-cache:stamp:{group}:{"*" if pk is None else pk}'
+
+
+def _stats_key(group, name):
+    return f'response-cache:stats:{group}:{name}'
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # 키가 없거나 만료된 경우 (다른 인스턴스가 먼저 만들었으면 add 는 무시됨)
+        cache.add(key, 1, timeout=None)
+
+
+def get_stamps(*keys):
+    """
+    버전 값 조회
+    - 없는 버전은 현재 시각으로 만들어서, 버전이 캐시에서 밀려나도 예전 응답이 다시 쓰이지 않게 함
+    """
+    stamps = cache.get_many(keys)
+    for key in keys:
+        if key not in stamps:
+            cache.add(key, time_ns(), timeout=None)
+            stamps[key] = cache.get(key)
+    return [stamps[key] for key in keys]
+
+
+def bump_response_cache(group, pk=None):
+    """
+    응답 캐시 무효화 - 버전 값을 올려 해당 그룹(과 객체)의 캐시 키를 바꿈
+    - 목록 버전은 항상, 상세 버전은 `pk`가 있으면 해당 객체만 / 없으면 그룹 전체를 올림
+    - 트랜잭션 안에서 호출되면 커밋 이후에 반영 (커밋 전의 값이 다시 캐시되지 않도록)
+    """
+    def bump():
+        _incr(_stamp_key(group, 'list'))
+        _incr(_stamp_key(group, pk))
+
+    transaction.on_commit(bump)
+
+
+def get_count_stamp(model):
+    return get_stamps(_stamp_key(f'count:{model._meta.label}'))[0]
+
+
+def bump_count_cache(model):
+    """
+    페이지네이션 전체 개수 캐시 무효화 (`_common.paginations.CountedPageNumberPagination`)
+    """
+    transaction.on_commit(lambda: _incr(_stamp_key(f'count:{model._meta.label}')))
+
+
+def register_count_invalidation(model):
+    """
+    모델이 생성/저장(삭제(soft delete) 포함)/삭제되면 전체 개수 캐시를 무효화하도록 signal 연결
+    """
+    def on_change(sender, **kwargs):
+        bump_count_cache(model)
+
+    uid = f'count-cache:{model._meta.label}'
+    post_save.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+
+
+def get_stats(group):
+    values = cache.get_many([_stats_key(group, name) for name in STATS])
+    return {name: values.get(_stats_key(group, name), 0) for name in STATS}
+
+
+def reset_stats(group):
+    cache.delete_many([_stats_key(group, name) for name in STATS])
+
+
+def register_dependencies(group, dependencies):
+    """
+    모델이 저장/삭제되거나 ManyToMany 관계가 바뀌면 그룹의 응답 캐시를 무효화하도록 signal 연결
+    """
+    DEPENDENCIES.setdefault(group, {}).update(dependencies)
+
+    for model, attr in dependencies.items():
+        def on_change(sender, instance, attr=attr, **kwargs):
+            bump_response_cache(group, None if attr is None else getattr(instance, attr))
+
+        def on_m2m_change(sender, instance, action, model=model, attr=attr, **kwargs):
+            if action not in ('post_add', 'post_remove', 'post_clear'):
+                return
+            if isinstance(instance, model):
+                on_change(sender, instance, attr=attr)
+            else:
+                # 반대쪽 모델에서 바꾼 경우 (예: user.liked_posts.add(post))
+                bump_response_cache(group)
+
+        uid = f'response-cache:{group}:{model._meta.label}'
+        post_save.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(on_m2m_change, sender=field.remote_field.through, weak=False,
+                                dispatch_uid=f'{uid}:{field.name}')
+
+
+class CachedResponseMixin:
+    """
+    서버 측 응답 캐시
+    - `cache_group`을 지정한 viewset 의 `cache_actions` 응답(data)을 URL, 형식, 인증 여부(또는 사용자)별로 캐시
+    - `cache_dependencies`({모델: 객체 id 속성})의 signal 로 버전 값을 올려 무효화
+      (`QuerySet.update()`처럼 signal 이 없는 변경은 `bump_response_cache()`를 직접 호출)
+    - 버전 값을 캐시에 두므로 memcached 같은 공유 캐시를 쓰면 여러 인스턴스에서도 일관됨
+    """
+    cache_group = None
+    cache_dependencies = {}
+    cache_actions = ('list', 'retrieve')
+    cache_per_user = False
+    cache_timeout = 60 * 5
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_group is not None:
+            register_dependencies(cls.cache_group, cls.cache_dependencies)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.cache_group is None or self.action not in self.cache_actions:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            _incr(_stats_key(self.cache_group, 'hit'))
+            return Response(cached)
+
+        _incr(_stats_key(self.cache_group, 'miss'))
+        response = handler(request, *args, **kwargs)
+        if response.status_code == HTTP_200_OK and isinstance(response, Response):
+            cache.set(key, response.data, timeout=self.cache_timeout)
+        return response
+
+    def get_response_cache_key(self, request):
+        if self.detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            stamps = get_stamps(_stamp_key(self.cache_group), _stamp_key(self.cache_group, self.kwargs[lookup_url_kwarg]))
+        else:
+            stamps = get_stamps(_stamp_key(self.cache_group, 'list'))
+
+        if self.cache_per_user:
+            viewer = request.user.pk
+        else:
+            viewer = 'auth' if request.user.is_authenticated else 'anon'
+
+        identity = '|'.join(map(str, (
+            request.build_absolute_uri(),
+            getattr(request.accepted_renderer, 'format', None),
+            viewer,
+            *stamps,
+        )))
+        return f'response-cache:{self.cache_group}:{self.action}:{md5(identity.encode()).hexdigest()}'
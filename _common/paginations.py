@@ -0,0 +1,318 @@
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+from hashlib import md5
+from json import dumps, loads
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, FieldError, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+from _common.cache import get_count_stamp
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder 는 datetime 을 밀리초까지만 남기므로, 키셋 비교가 어긋나지 않도록 마이크로초까지 유지
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    키셋(cursor) 페이지네이션
+    - 마지막으로 받은 행의 정렬 키 값(position)을 cursor 로 전달하고, `(a, b, id) > (...)` 조건으로 다음 페이지를 조회
+    - OFFSET 과 전체 개수(COUNT) 계산이 없으므로 몇 번째 페이지든 비용이 같음
+    - `ordering` 의 마지막 필드는 유일한 값이어야 함 (보통 id)
+    """
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = '잘못된 cursor 입니다.'
+
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        position, reverse = self.decode_cursor(request, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+    # ----- 정렬과 키셋 조건 ----- #
+
+    def get_field_name(self, field):
+        return field.lstrip('-')
+
+    def is_descending(self, field, position):
+        return field.startswith('-')
+
+    def get_order_by(self, reverse=False):
+        order_by = []
+        for field in self.ordering:
+            expression = F(self.get_field_name(field))
+            descending = field.startswith('-') != reverse
+            order_by.append(expression.desc() if descending else expression.asc())
+        return order_by
+
+    def get_keyset_filter(self, position, reverse=False):
+        """
+        (a, b, c) 다음 행 조건: a > ? OR (a = ? AND b > ?) OR (a = ? AND b = ? AND c > ?)
+        - 내림차순 필드는 < 로 비교하고, 이전 페이지는 방향을 반대로 비교
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = self.get_field_name(field)
+            lookup = 'lt' if self.is_descending(field, position) != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_position(self, instance):
+        return [getattr(instance, self.get_field_name(field)) for field in self.ordering]
+
+    def iterate_queryset(self, queryset, chunk_size):
+        """
+        `ordering` 순서대로 chunk_size 개씩 키셋 조건으로 나눠 조회하면서 하나씩 반환
+        - MySQL 에서는 `.iterator()`도 결과 전체를 한 번에 가져오므로, 전체를 내려받을 때 메모리 사용량을 일정하게 유지
+        """
+        queryset = queryset.order_by(*self.get_order_by())
+        chunk = list(queryset[:chunk_size])
+        while True:
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+            chunk = list(queryset.filter(self.get_keyset_filter(self.get_position(chunk[-1])))[:chunk_size])
+
+    # ----- cursor ----- #
+
+    def encode_cursor(self, position, reverse=False):
+        data = dumps({'p': position, 'r': int(reverse)}, cls=CursorEncoder, separators=(',', ':'))
+        return urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request, queryset):
+        """
+        cursor 를 (정렬 필드별 값, 이전 페이지 여부)로 변환
+        - 값의 개수와 타입이 정렬 필드와 맞지 않으면 NotFound (조작된 cursor 가 쿼리까지 가서 500 이 되지 않도록)
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            data = loads(urlsafe_b64decode(encoded.encode()).decode())
+            position, reverse = data['p'], data['r']
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering) \
+                or not isinstance(reverse, int) or reverse not in (0, 1):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            position = [
+                self.to_position_value(queryset, self.get_field_name(field), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def to_position_value(self, queryset, name, value):
+        """
+        cursor 의 값을 정렬 필드(모델 필드 또는 annotate 한 값)의 타입으로 변환 (변환할 수 없으면 ValidationError)
+        """
+        if value is None or isinstance(value, (list, dict)):
+            raise ValidationError(self.invalid_cursor_message)
+
+        try:
+            annotation = queryset.query.annotations.get(name)
+            field = annotation.output_field if annotation is not None else queryset.model._meta.get_field(name)
+        except (FieldDoesNotExist, FieldError):
+            return value
+        return field.to_python(value)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        cursor = self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+
+class OrderingKeysetPagination(KeysetPagination):
+    """
+    `?ordering=`(view 의 `ordering_fields`)을 따르는 키셋 페이지네이션
+    - 정렬 필드의 값이 같은 행끼리는 id 로 구분 (첫 번째 정렬 필드와 같은 방향)
+    - `?ordering=`이 없으면 `ordering`으로 정렬
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = OrderingFilter().get_ordering(request, queryset, view)
+        if not ordering:
+            return self.ordering
+
+        fields = [field for field in ordering if field.lstrip('-') not in ('id', 'pk')]
+        return (*fields, '-id' if fields and fields[0].startswith('-') else 'id')
+
+
+def estimate_table_rows(model):
+    """
+    DB 통계의 테이블 행 수 추정값 (MySQL, PostgreSQL 만 지원 / 그 외에는 None)
+    - 통계는 삭제(soft delete)된 행도 포함하고 주기적으로만 갱신되므로 근사값
+    """
+    if connection.vendor == 'mysql':
+        sql = 'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [model._meta.db_table])
+        row = cursor.fetchone()
+    # PostgreSQL 은 통계가 없으면 -1
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class CountProviderPaginator(Paginator):
+    """
+    전체 개수(`count`)를 `count_provider(object_list)`로 계산하는 Django Paginator
+    """
+
+    def __init__(self, *args, count_provider, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_provider = count_provider
+
+    @cached_property
+    def count(self):
+        return self.count_provider(self.object_list)
+
+
+class CountedPageNumberPagination(PageNumberPagination):
+    """
+    전체 개수를 캐시하는 페이지 번호 페이지네이션
+    - 개수는 (모델, 검색 조건(SQL)) 별로 `count_timeout`초 동안 캐시하고, 모델이 저장/삭제되면 무효화
+      (view 에서 `_common.cache.register_count_invalidation()`으로 signal 연결)
+    - `estimate_count`: 검색 조건이 없는 목록은 DB 통계의 행 수 추정값 사용 (`estimate_threshold` 행 이상일 때만)
+      - 추정값은 삭제(soft delete)된 행도 포함하므로 실제보다 클 수 있음
+        -> 추정값으로 계산한 페이지가 비어 있으면 정확한 개수로 다시 계산하고 마지막 페이지를 응답
+    - 응답의 `count_exact`로 정확한 값인지 추정값인지 알려줌
+    """
+    count_timeout = 30
+    estimate_count = False
+    estimate_threshold = 10000
+
+    @property
+    def django_paginator_class(self):
+        return partial(CountProviderPaginator, count_provider=self.get_count)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        self.count_exact = True
+        page = super().paginate_queryset(queryset, request, view)
+        if page or self.count_exact:
+            return page
+
+        # 추정값이 실제보다 커서 범위를 벗어난 페이지 -> 정확한 개수의 마지막 페이지로 맞춤
+        self.estimate_count, self.count_exact = False, True
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        self.page = paginator.page(paginator.num_pages)
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_exact', self.count_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_count(self, queryset):
+        try:
+            sql = str(queryset.order_by().query)
+        except EmptyResultSet:
+            return 0
+
+        if self.estimate_count and self.is_unfiltered(sql):
+            estimate = estimate_table_rows(queryset.model)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                self.count_exact = False
+                return estimate
+
+        signature = md5(sql.encode()).hexdigest()
+        key = f'page-count:{queryset.model._meta.label}:{get_count_stamp(queryset.model)}:{signature}'
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout=self.count_timeout)
+        return count
+
+    def is_unfiltered(self, sql):
+        """
+        검색/필터 조건 없이 view 의 기본 queryset 그대로인지 (중첩된 목록(댓글 등)은 부모 조건이 있으므로 제외)
+        """
+        if self.view is None or getattr(self.view, 'get_parents_query_dict', dict)():
+            return False
+        try:
+            return sql == str(self.view.get_queryset().order_by().query)
+        except EmptyResultSet:
+            return False
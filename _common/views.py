@@ -1,9 +1,97 @@
+from hashlib import md5
+from json import dumps
+from operator import attrgetter
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
 from rest_framework.response import Response
-from rest_framework.status import HTTP_204_NO_CONTENT
+from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_200_OK, HTTP_304_NOT_MODIFIED
 from rest_framework.viewsets import ModelViewSet
 
+from _common.cache import CachedResponseMixin
+
+
+class ConditionalGetMixin:
+    """
+    조건부 GET (ETag / Last-Modified / 304)
+    - 응답에 쓸 행(목록은 현재 페이지, 상세는 객체)을 조회한 뒤 serialize 하기 전에 행의 값으로 ETag 를 만들고,
+      요청의 If-None-Match 와 같으면 serialize 없이 304 응답 (조회한 행은 응답에도 그대로 사용)
+    - `etag_fields`: ETag 에 넣을 행의 속성 - 좋아요/댓글 수처럼 modified_at 을 바꾸지 않고 갱신되는 저장된 집계 필드,
+      관계 객체의 속성(`product.modified_at`)도 지정
+    - `etag_per_user`: 사용자마다 응답이 다른 경우(좋아요 여부, 응모 여부 등) - 사용자 id 를 ETag 에 포함
+    - Last-Modified 는 modified_at 만으로 변경을 알 수 있는 상세 조회에서만 사용
+    """
+    etag_fields = ('pk', 'modified_at')
+    etag_per_user = False
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        if page is None:
+            return super().list(request, *args, **kwargs)
+
+        # 페이지 정보(다음/이전 링크, 전체 개수 등)가 바뀌어도 응답이 다르므로 함께 포함
+        meta = self.get_paginated_response([]).data
+        meta.pop('results', None)
+        values = {'rows': [self.get_etag_row(obj) for obj in page], 'page': meta}
+
+        self._etag_page = page
+        return self.conditional_response(super().list, values, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        # 없는 객체는 여기서 404
+        obj = self.get_object()
+        self._etag_object = obj
+        return self.conditional_response(super().retrieve, self.get_etag_row(obj), request, *args, **kwargs)
+
+    def paginate_queryset(self, queryset):
+        page = getattr(self, '_etag_page', None)
+        if page is not None:
+            return page
+        return super().paginate_queryset(queryset)
+
+    def get_object(self):
+        obj = getattr(self, '_etag_object', None)
+        if obj is not None:
+            return obj
+        return super().get_object()
+
+    def conditional_response(self, handler, values, request, *args, **kwargs):
+        etag = self.make_etag(request, values)
+        last_modified = self.get_last_modified(values)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (HTTP_200_OK, HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            if self.etag_per_user:
+                patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+
+    def get_etag_row(self, obj):
+        return {field: attrgetter(field)(obj) for field in self.etag_fields}
+
+    def make_etag(self, request, values):
+        identity = {
+            'values': values,
+            'format': getattr(request.accepted_renderer, 'format', None),
+            'user': request.user.pk if self.etag_per_user else None,
+        }
+        data = dumps(identity, default=str, sort_keys=True)
+        return f'W/"{md5(data.encode()).hexdigest()}"'
+
+    def get_last_modified(self, values):
+        if not self.detail or self.etag_per_user or self.etag_fields != ConditionalGetMixin.etag_fields:
+            return None
+        last_modified = values.get('modified_at')
+        # HTTP 날짜는 초 단위
+        return int(last_modified.timestamp()) if last_modified else None
+
 
-class CommonViewSet(ModelViewSet):
+class CommonViewSet(ConditionalGetMixin, CachedResponseMixin, ModelViewSet):
     # 저장 시 자동으로 요청한 사용자 설정
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -13,4 +101,4 @@ class CommonViewSet(ModelViewSet):
         obj = self.get_object()
         obj.is_deleted = True
         obj.save()
-        return Response(status=HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=HTTP_204_NO_CONTENT)
@@ -8,9 +8,23 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
 import os
+import re
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', '_config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from loffle.streams import raffle_stream  # noqa: E402 (앱 로딩 이후에 import)
+
+RAFFLE_STREAM_PATH = re.compile(r'^/raffles/(?P<pk>\d+)/stream$')
+
+
+async def application(scope, receive, send):
+    # 래플 응모 수/진행 상황 SSE 스트림은 Django 를 거치지 않고 직접 처리 (연결마다 스레드를 점유하지 않도록)
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        match = RAFFLE_STREAM_PATH.match(scope['path'])
+        if match:
+            return await raffle_stream(scope, receive, send, int(match['pk']))
+    return await django_application(scope, receive, send)
@@ -159,6 +159,26 @@ EMAIL_HOST_PASSWORD = None
 
 PASSWORD_RESET_TIMEOUT_DAYS = 1  # 패스워드 토큰의 유효기간 (default: 3)
 
+# 응답 캐시(`_common.cache`)의 데이터와 버전 값을 저장
+# - 여러 인스턴스로 운영할 때는 공유 캐시(memcached 등)를 사용해야 무효화가 모든 인스턴스에 반영됨
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'loffle',
+    },
+}
+
+# 로또 당첨 번호 API (테스트에서는 `run_lotto_stub_server` 의 주소로 변경)
+LOTTO_API_URL = 'https://www.dhlottery.co.kr/common.do'
+LOTTO_API_TIMEOUT = (3.05, 5)  # (connect, read) 초
+LOTTO_API_RETRIES = 3
+LOTTO_API_BACKOFF = 0.5
+
+# 래플 응모 처리 방식
+# - 'direct': 응모 요청에서 슬롯 선점, 응모 기록, 티켓 차감까지 처리
+# - 'queued': 응모 요청은 정원만 예약하고 대기열에 저장(202 + 접수증), `flush_raffle_applies` 워커가 모아서 처리
+RAFFLE_APPLY_MODE = 'direct'
+
 SWAGGER_SETTINGS = {
     'USE_SESSION_AUTH': False,
     'SECURITY_DEFINITIONS': {
@@ -33,6 +33,14 @@ if 'RDS_HOSTNAME' in os.environ:
         }
     }
 
+if 'MEMCACHED_LOCATION' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ['MEMCACHED_LOCATION'],
+        }
+    }
+
 import socket
 
 local_ip = str(socket.gethostbyname(socket.gethostname()))
@@ -1,7 +1,6 @@
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.contrib.auth.models import AbstractUser, UserManager
-from django.db.models import Sum, Count, F, Q, FilteredRelation
-from django.db.models.functions import Coalesce
 
 
 class User(AbstractUser):
@@ -48,28 +47,32 @@ class User(AbstractUser):
     def __str__(self):  # __unicode__ on Python 2
         return self.username
 
+    @property
+    def ticket_balance_or_none(self):
+        # 티켓을 한 번도 구매하지 않은 사용자는 잔액 행이 없음
+        try:
+            return self.ticket_balance
+        except ObjectDoesNotExist:
+            return None
+
     @property
     def num_buy_tickets(self):
-        return self.buy_tickets \
-            .select_related('ticket') \
-            .aggregate(num_buy_tickets=Coalesce(Sum(F('ticket__quantity')), 0))['num_buy_tickets']
+        balance = self.ticket_balance_or_none
+        return balance.num_buy_tickets if balance else 0
 
     @property
     def num_use_tickets(self):
-        return self.applied_raffles \
-            .select_related('raffle') \
-            .aggregate(num_use_tickets=Coalesce(Count(F('raffle_id')), 0))['num_use_tickets']
+        balance = self.ticket_balance_or_none
+        return balance.num_use_tickets if balance else 0
 
     # 돌려받는 티켓의 수량은 취소된 응모의 개수
     @property
     def num_return_tickets(self):
-        return self.applied_raffles \
-            .select_related('raffle') \
-            .annotate(raffle_failed=FilteredRelation(
-                'raffle', condition=Q(raffle__progress=__import__('loffle').models.Raffle.PROGRESS_CHOICES[3][0]))) \
-            .aggregate(num_return_tickets=Coalesce(Count(F('raffle_failed')), 0))['num_return_tickets']
+        balance = self.ticket_balance_or_none
+        return balance.num_return_tickets if balance else 0
 
     # 사용자가 소유한 티켓 수량 = 구매한 티켓 수량 - 사용한 티켓 개수 + 응모한 래플이 취소되어 돌려받은 래플 개수
     @property
     def num_tickets(self):
-        return self.num_buy_tickets - self.num_use_tickets + self.num_return_tickets
+        balance = self.ticket_balance_or_none
+        return balance.num_tickets if balance else 0
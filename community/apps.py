@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CommunityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'community'
+
+    def ready(self):
+        # viewset 의 응답 캐시 무효화 signal 연결 (관리 명령 등 요청을 받지 않는 프로세스에서도 동작하도록)
+        from community import views  # noqa: F401
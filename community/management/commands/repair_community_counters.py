@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from community.models import Post, PostComment, Review, ReviewComment, Question
+
+
+class Command(BaseCommand):
+    help = '게시글/댓글/리뷰/질문의 좋아요 수, 댓글 수, 답변 수를 실제 행으로부터 다시 계산하기'
+
+    def handle(self, *args, **options):
+        for model in (Post, PostComment, Review, ReviewComment, Question):
+            count = model.repair_counters()
+            self.stdout.write(self.style.SUCCESS(
+                f'{model.__name__} {count}건의 집계 값({", ".join(model.COUNTERS)})을 다시 계산했습니다.'))
@@ -0,0 +1,79 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:15
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# {모델: {집계 필드: 관계 이름}}
+COUNTERS = {
+    'Post': {'like_count': 'like', 'comment_count': 'comments'},
+    'PostComment': {'like_count': 'like'},
+    'Review': {'like_count': 'like', 'comment_count': 'comments'},
+    'ReviewComment': {'like_count': 'like'},
+    'Question': {'answer_count': 'answers'},
+}
+
+
+def count_related(apps, schema_editor):
+    """
+    좋아요 수, (삭제되지 않은) 댓글/답변 수 채우기
+    """
+    for model_name, counters in COUNTERS.items():
+        model = apps.get_model('community', model_name)
+        values = {}
+        for counter, name in counters.items():
+            relation = model._meta.get_field(name)
+            if relation.many_to_many:
+                related, lookup = relation.remote_field.through.objects.all(), relation.m2m_field_name()
+            else:
+                related, lookup = relation.related_model.objects.filter(is_deleted=False), relation.field.name
+            count = related.filter(**{lookup: OuterRef('pk')}) \
+                .order_by().values(lookup).annotate(count=Count('pk')).values('count')
+            values[counter] = Coalesce(Subquery(count), 0)
+        model.objects.update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0003_auto_20210930_1749'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='answer_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reviewcomment',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_related, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0004_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_deleted', 'like_count', 'id'], name='post_like_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_deleted', 'comment_count', 'id'], name='post_comment_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['is_deleted', 'answer_count', 'id'], name='question_answer_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_deleted', 'like_count', 'id'], name='review_like_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_deleted', 'comment_count', 'id'], name='review_comment_count_idx'),
+        ),
+    ]
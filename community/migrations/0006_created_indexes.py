@@ -0,0 +1,41 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0005_popular_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'is_deleted', 'created_at', 'id'], name='answer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='notice_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'is_deleted', 'created_at', 'id'], name='postcomment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='question_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='review_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewcomment',
+            index=models.Index(fields=['review', 'is_deleted', 'created_at', 'id'], name='reviewcomment_created_idx'),
+        ),
+    ]
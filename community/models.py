@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed
 
 from account.models import User
 
@@ -13,12 +16,100 @@ class CommonManager(models.Manager):
         # queryset = Post.objects.filter(is_deleted=False)
         # queryset = Post.objects.filter(is_deleted=False).prefetch_related('like').select_related('user')
         # 세 queryset 성능 및 속도 비교해보기
-        return super().get_queryset().select_related('user').filter(is_deleted=self.is_deleted)
+        # `is_deleted=False` 는 `NOT is_deleted` 로 변환되어 (is_deleted, ...) 인덱스를 쓰지 못하므로 IN 으로 비교
+        return super().get_queryset().select_related('user').filter(is_deleted__in=[self.is_deleted])
+
+
+class CounterMixin:
+    """
+    좋아요/댓글/답변 수를 행에 저장해서 목록 조회 시 행마다 COUNT 하지 않음
+    - `COUNTERS`: {집계 필드: 관계 이름} - 좋아요(ManyToMany)는 바뀔 때마다 해당 행만 다시 계산 (`recount_likes`)
+    - `PARENT_COUNTER`: (부모 필드, 부모의 집계 필드) - 댓글/답변을 작성하거나 삭제(soft delete)/복구하면 F() 로 갱신
+    - 저장할 때 집계 필드는 덮어쓰지 않음 (다른 요청이 그 사이에 바꾼 값이 사라지지 않도록)
+    """
+    COUNTERS = {}
+    PARENT_COUNTER = None
+
+    __original_is_deleted = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__original_is_deleted = self.__dict__.get('is_deleted')
+
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        if not is_new and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTERS
+            ]
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if self.PARENT_COUNTER is not None:
+                if is_new:
+                    delta = 0 if self.is_deleted else 1
+                elif self.is_deleted != self.__original_is_deleted:
+                    delta = -1 if self.is_deleted else 1
+                else:
+                    delta = 0
+
+                if delta:
+                    parent_field, counter = self.PARENT_COUNTER
+                    parent_model = self._meta.get_field(parent_field).related_model
+                    parent_model._base_manager.filter(pk=getattr(self, f'{parent_field}_id')) \
+                        .update(**{counter: F(counter) + delta})
+        self.__original_is_deleted = self.__dict__.get('is_deleted')
+
+    @classmethod
+    def get_counter_subquery(cls, counter):
+        relation = cls._meta.get_field(cls.COUNTERS[counter])
+        if relation.many_to_many:
+            related, lookup = relation.remote_field.through.objects, relation.m2m_field_name()
+        else:
+            # 댓글/답변은 삭제(soft delete)되지 않은 것만
+            related, lookup = relation.related_model.objects, relation.field.name
+        return related.filter(**{lookup: OuterRef('pk')}) \
+            .order_by().values(lookup).annotate(count=Count('pk')).values('count')
+
+    @classmethod
+    def repair_counters(cls, pks=None, counters=None):
+        """
+        집계 필드를 실제 행으로부터 한 번의 UPDATE로 다시 계산 (`pks`: 대상 id, 기본값: 전체)
+        """
+        queryset = cls._base_manager.all()
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        return queryset.update(**{
+            counter: Coalesce(Subquery(cls.get_counter_subquery(counter)), 0)
+            for counter in (counters or cls.COUNTERS)
+        })
+
+
+def recount_likes(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    좋아요를 추가/취소하면 해당 행의 좋아요 수를 좋아요 테이블로부터 다시 계산 (m2m_changed)
+    - 증감 대신 다시 계산하므로 같은 사용자가 동시에 요청해도 값이 어긋나지 않음
+    """
+    if reverse:
+        # user.liked_posts.add(post) 처럼 사용자 쪽에서 바꾼 경우
+        if action == 'pre_clear':
+            instance._cleared_like_pks = list(model._base_manager.filter(like=instance).values_list('pk', flat=True))
+            return
+        liked_model, pks = model, pk_set
+        if action == 'post_clear':
+            pks = instance.__dict__.pop('_cleared_like_pks', ())
+    else:
+        liked_model, pks = type(instance), [instance.pk]
+
+    if action in ('post_add', 'post_remove', 'post_clear') and pks:
+        liked_model.repair_counters(pks=pks, counters=['like_count'])
 
 
 # --------------------------------------------------------
 
-class Post(models.Model):
+class Post(CounterMixin, models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -29,11 +120,24 @@ class Post(models.Model):
     # file = models.ManyToManyField(File, on_delete=models.SET_NULL, null=True, blank=True)  # File
     like = models.ManyToManyField(User, related_name="liked_posts", blank=True)
 
+    COUNTERS = {'like_count': 'like', 'comment_count': 'comments'}
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
 
+    class Meta:
+        indexes = [
+            # 인기순 목록 (is_deleted = false ORDER BY like_count DESC, id DESC)
+            models.Index(fields=['is_deleted', 'like_count', 'id'], name='post_like_count_idx'),
+            models.Index(fields=['is_deleted', 'comment_count', 'id'], name='post_comment_count_idx'),
+            # 최신순 목록 cursor 페이지네이션 (is_deleted = false ORDER BY created_at DESC, id DESC)
+            models.Index(fields=['is_deleted', 'created_at', 'id'], name='post_created_idx'),
+        ]
+
 
-class PostComment(models.Model):
+class PostComment(CounterMixin, models.Model):
     content = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
@@ -43,13 +147,23 @@ class PostComment(models.Model):
     user = models.ForeignKey(User, related_name="postcomments", on_delete=models.CASCADE)
     like = models.ManyToManyField(User, related_name="liked_postcomments", blank=True)
 
+    COUNTERS = {'like_count': 'like'}
+    PARENT_COUNTER = ('post', 'comment_count')
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+
     # class Meta:
     #     db_table = '_'.join((__package__, 'post_comment'))
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
 
+    class Meta:
+        indexes = [
+            # 댓글 목록 cursor 페이지네이션 (post_id = ? AND is_deleted = false ORDER BY created_at, id)
+            models.Index(fields=['post', 'is_deleted', 'created_at', 'id'], name='postcomment_created_idx'),
+        ]
+
 
-class Review(models.Model):
+class Review(CounterMixin, models.Model):
     # title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -61,11 +175,24 @@ class Review(models.Model):
     # raffle = models.ForeignKey(Raffle, on_delete=models.CASCADE)
     like = models.ManyToManyField(User, related_name="liked_reviews", blank=True)
 
+    COUNTERS = {'like_count': 'like', 'comment_count': 'comments'}
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
 
+    class Meta:
+        indexes = [
+            # 인기순 목록 (is_deleted = false ORDER BY like_count DESC, id DESC)
+            models.Index(fields=['is_deleted', 'like_count', 'id'], name='review_like_count_idx'),
+            models.Index(fields=['is_deleted', 'comment_count', 'id'], name='review_comment_count_idx'),
+            # 최신순 목록 cursor 페이지네이션 (is_deleted = false ORDER BY created_at DESC, id DESC)
+            models.Index(fields=['is_deleted', 'created_at', 'id'], name='review_created_idx'),
+        ]
+
 
-class ReviewComment(models.Model):
+class ReviewComment(CounterMixin, models.Model):
     content = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
@@ -75,9 +202,18 @@ class ReviewComment(models.Model):
     user = models.ForeignKey(User, related_name="reviewcomments", on_delete=models.CASCADE)
     like = models.ManyToManyField(User, related_name="liked_reviewcomments", blank=True)
 
+    COUNTERS = {'like_count': 'like'}
+    PARENT_COUNTER = ('review', 'comment_count')
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['review', 'is_deleted', 'created_at', 'id'], name='reviewcomment_created_idx'),
+        ]
+
 
 class Notice(models.Model):
     title = models.CharField(max_length=200)
@@ -92,6 +228,11 @@ class Notice(models.Model):
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_deleted', 'created_at', 'id'], name='notice_created_idx'),
+        ]
+
 
 # ================= #
 # Question & Answer #
@@ -104,7 +245,7 @@ class QuestionType(models.Model):
         return self.name
 
 
-class Question(models.Model):
+class Question(CounterMixin, models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -115,11 +256,21 @@ class Question(models.Model):
     # file = models.ManyToManyField(File, on_delete=models.SET_NULL, null=True, blank=True)  # File
     question_type = models.ForeignKey(QuestionType, related_name="questions", on_delete=models.PROTECT)
 
+    COUNTERS = {'answer_count': 'answers'}
+    answer_count = models.PositiveIntegerField(default=0, editable=False)
+
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_deleted', 'answer_count', 'id'], name='question_answer_count_idx'),
+            # 최신순 목록 cursor 페이지네이션 (is_deleted = false ORDER BY created_at DESC, id DESC)
+            models.Index(fields=['is_deleted', 'created_at', 'id'], name='question_created_idx'),
+        ]
 
-class Answer(models.Model):
+
+class Answer(CounterMixin, models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -130,5 +281,17 @@ class Answer(models.Model):
     # file = models.ForeignKey(File, on_delete=models.SET_NULL, null=True, blank=True)  # File
     question = models.ForeignKey(Question, related_name="answers", on_delete=models.CASCADE)
 
+    PARENT_COUNTER = ('question', 'answer_count')
+
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['question', 'is_deleted', 'created_at', 'id'], name='answer_created_idx'),
+        ]
+
+
+for liked_model in (Post, PostComment, Review, ReviewComment):
+    m2m_changed.connect(recount_likes, sender=liked_model.like.through,
+                        dispatch_uid=f'recount-likes:{liked_model._meta.label}')
@@ -1,9 +1,36 @@
-from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
 
-from _config import settings
+from _common.paginations import OrderingKeysetPagination, CountedPageNumberPagination
 
 
-class CommunityPagination(PageNumberPagination):
+class CommunityPagination(CountedPageNumberPagination):
     page_size = 5 # settings.REST_FRAMEWORK['PAGE_SIZE']
     page_size_query_param = 'page_size'
     # ordering = '-created_at'
+
+    def get_previous_link(self):
+        # `?page=`가 없으면 cursor 페이지네이션으로 바뀌므로 첫 페이지 링크에도 page=1 을 남김
+        if not self.page.has_previous():
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param,
+                                   self.page.previous_page_number())
+
+
+class LargeBoardPagination(CommunityPagination):
+    """
+    글이 많은 게시판(자유게시판, 리뷰)의 페이지 번호 페이지네이션
+    - 검색 조건이 없는 목록은 전체 개수로 DB 통계의 추정값 사용
+    """
+    estimate_count = True
+
+
+class CommunityCursorPagination(OrderingKeysetPagination):
+    """
+    게시판/댓글 cursor(키셋) 페이지네이션 (기본값)
+    - 정렬(`?ordering=`, 기본값: 게시판은 최신순, 댓글은 작성순)과 id 로 키셋을 만들고 COUNT/OFFSET 없이 조회
+    - (is_deleted, created_at, id) / (부모, is_deleted, created_at, id) 인덱스와
+      인기순 정렬의 (is_deleted, 집계 필드, id) 인덱스를 따라 읽으므로 몇 번째 페이지든 인덱스 범위 조회 한 번
+    - 인기순 정렬은 집계 값이 계속 바뀌므로 페이지를 넘기는 사이에 순위가 바뀐 글은 빠지거나 중복될 수 있음
+    """
+    page_size = 5
+    page_size_query_param = 'page_size'
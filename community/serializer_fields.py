@@ -1,30 +1,26 @@
-from rest_framework.fields import SerializerMethodField
+from rest_framework.fields import SerializerMethodField, IntegerField
 from _common.serializers import CustomSerializer
 
 
 class LikeField(CustomSerializer):
-    like_count = SerializerMethodField()
+    # 좋아요/댓글/답변 수는 모델에 저장된 값 (`community.models.CounterMixin`)
+    like_count = IntegerField(read_only=True)
     like_or_not = SerializerMethodField()
 
-    @staticmethod
-    def get_like_count(obj):
-        return obj.like.count()
-
     def get_like_or_not(self, obj):
-        return obj.like.filter(pk=self.context['request'].user.pk).exists()
+        # CommunityViewSet 에서 페이지 단위로 계산한 값이 있으면 그대로 사용
+        if hasattr(obj, 'like_or_not'):
+            return obj.like_or_not
 
+        user = self.context['request'].user
+        if not user.is_authenticated:
+            return False
+        return obj.like.filter(pk=user.pk).exists()
 
-class CommentField(CustomSerializer):
-    comment_count = SerializerMethodField()
 
-    @staticmethod
-    def get_comment_count(obj):
-        return obj.comments.count()
+class CommentField(CustomSerializer):
+    comment_count = IntegerField(read_only=True)
 
 
 class AnswerField(CustomSerializer):
-    answer_count = SerializerMethodField()
-
-    @staticmethod
-    def get_answer_count(obj):
-        return obj.answers.count()
+    answer_count = IntegerField(read_only=True)
@@ -1,3 +1,107 @@
+from base64 import urlsafe_b64encode
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from account.models import User
+from community.models import Post
+
+
+class CommunityPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@community.test', username='user', sex='M', phone='00000000001')
+        cls.posts = [Post.objects.create(title=f'title {i}', content='content', user=cls.user) for i in range(7)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_cursor_by_default(self):
+        ids, url = [], '/posts?page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            self.assertNotIn('count', data)
+            ids += [post['id'] for post in data['results']]
+            url = data['next']
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+
+        # 마지막 페이지의 이전 페이지
+        data = self.client.get(self.client.get('/posts?page_size=3').json()['next']).json()
+        previous = self.client.get(data['previous']).json()
+        self.assertEqual([post['id'] for post in previous['results']], [post.pk for post in self.posts[:3:-1]])
+
+    def test_page_number_with_page(self):
+        data = self.client.get('/posts?page=2&page_size=3').json()
+        self.assertEqual(data['count'], 7)
+        self.assertTrue(data['count_exact'])
+        self.assertEqual([post['id'] for post in data['results']], [post.pk for post in self.posts[3:0:-1]])
+
+        # 첫 페이지 링크에도 page=1 이 남아 있어서 페이지 번호 방식이 유지됨
+        self.assertIn('page=1', data['previous'])
+        previous = self.client.get(data['previous']).json()
+        self.assertEqual(previous['count'], 7)
+        self.assertIsNone(previous['previous'])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-a-cursor', urlsafe_b64encode(b'{"p":["x",1],"r":0}').decode(),
+                       urlsafe_b64encode(b'{"p":["2021-01-01T00:00:00+00:00",1],"r":"a"}').decode()):
+            self.assertEqual(self.client.get('/posts', {'cursor': cursor}).status_code, 404)
+
+
+class CommonManagerPlanTest(TestCase):
+
+    def test_uses_index(self):
+        # `is_deleted__in=[False]` 조건으로도 (is_deleted, ...) 인덱스로 조회하고 정렬함
+        for queryset, index in ((Post.objects.order_by('-created_at', '-id'), 'post_created_idx'),
+                                (Post.objects.order_by('-like_count', '-id'), 'post_like_count_idx'),
+                                (Post.deleted_objects.order_by('-created_at', '-id'), 'post_created_idx')):
+            plan = queryset.select_related(None)[:5].explain()
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+class ConditionalGetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@community.test', username='user', sex='M', phone='00000000001')
+        cls.posts = [Post.objects.create(title=f'title {i}', content='content', user=cls.user) for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_list(self):
+        response = self.client.get('/posts')
+        etag = response['ETag']
+
+        # 현재 페이지만 조회하고 serialize 없이 304
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/posts', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # modified_at 을 바꾸지 않는 집계 필드(좋아요 수)가 바뀌어도 ETag 가 바뀜
+        self.posts[0].like.add(self.user)
+        response = self.client.get('/posts', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # 페이지 정보(다음 링크)가 바뀌어도 ETag 가 바뀜
+        etag = self.client.get('/posts?page_size=3')['ETag']
+        Post.objects.create(title='title', content='content', user=self.user)
+        self.assertEqual(self.client.get('/posts?page_size=3', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail(self):
+        post = self.posts[0]
+        etag = self.client.get(f'/posts/{post.pk}')['ETag']
+        self.assertEqual(self.client.get(f'/posts/{post.pk}', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        post.comments.create(content='comment', user=self.user)
+        self.assertEqual(self.client.get(f'/posts/{post.pk}', HTTP_IF_NONE_MATCH=etag).status_code, 200)
 
-# Create your tests here.
+        # 없는 객체는 ETag 없이 404
+        response = self.client.get(f'/posts/{post.pk + 100}')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
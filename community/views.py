@@ -1,6 +1,6 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
+from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
@@ -8,9 +8,10 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticate
 from rest_framework.response import Response
 from rest_framework_extensions.mixins import NestedViewSetMixin
 
+from _common.cache import CachedResponseMixin, register_count_invalidation
 from _common.views import CommonViewSet
 from community.models import Post, PostComment, Review, ReviewComment, Notice, Question, Answer, QuestionType
-from community.paginations import CommunityPagination
+from community.paginations import CommunityPagination, CommunityCursorPagination, LargeBoardPagination
 from _common.permissions import IsOwnerOrReadOnly
 from community.serializers import PostSerializer, PostCommentSerializer, ReviewSerializer, ReviewCommentSerializer, \
     NoticeSerializer, QuestionSerializer, AnswerSerializer, QuestionTypeSerializer
@@ -23,9 +24,65 @@ class CommunityViewSet(CommonViewSet):
 
     filterset_fields = ('user',)
     search_fields = ('content',)
-    ordering_fields = '__all__'  # ('created_at', 'like_count')
+    ordering_fields = ('created_at',)
     ordering = '-created_at'
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 페이지 번호 방식(`CommunityPagination`)의 전체 개수 캐시 무효화
+        if cls.queryset is not None:
+            register_count_invalidation(cls.queryset.model)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = self.get_pagination_class()()
+        return self._paginator
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            self.resolve_like_or_not(page)
+        return page
+
+    def resolve_like_or_not(self, objects):
+        """
+        요청한 사용자의 좋아요 여부(`like_or_not`)를 페이지의 행마다 조회하지 않고 IN 쿼리 한 번으로 계산
+        - 익명 사용자는 조회하지 않음
+        """
+        model = self.get_queryset().model
+        if not objects or 'like' not in {field.name for field in model._meta.many_to_many}:
+            return
+        # 조건부 GET 에서 조회한 페이지를 다시 쓰는 경우 이미 계산되어 있음
+        if hasattr(objects[0], 'like_or_not'):
+            return
+
+        user = self.request.user
+        liked = set()
+        if user.is_authenticated:
+            field = model._meta.get_field('like')
+            source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+            liked = set(field.remote_field.through.objects
+                        .filter(**{f'{source}__in': [obj.pk for obj in objects], target: user.pk})
+                        .values_list(f'{source}_id', flat=True))
+        for obj in objects:
+            obj.like_or_not = obj.pk in liked
+
+    def get_pagination_class(self):
+        """
+        기본값은 cursor 페이지네이션(`CommunityCursorPagination`)
+        - 웹 UI 처럼 페이지 번호가 필요하면 `?page=` 를 보내서 페이지 번호 방식(`CommunityPagination`) 사용
+          (집계 필드로 정렬한 인기순 목록은 항상 cursor)
+        """
+        if self.pagination_class.page_query_param not in self.request.query_params:
+            return CommunityCursorPagination
+
+        ordering = OrderingFilter().get_ordering(self.request, self.get_queryset(), self) or ()
+        counters = getattr(self.get_queryset().model, 'COUNTERS', {})
+        if ordering and ordering[0].lstrip('-') in counters:
+            return CommunityCursorPagination
+        return self.pagination_class
+
     def add_like(self, request, **kwargs):
         obj = self.get_object()
         if obj.like.filter(pk=request.user.pk).exists():
@@ -60,7 +117,11 @@ class PostViewSet(CommunityViewSet):
     # model = Post
     queryset = Post.objects.all()
     serializer_class = PostSerializer
+    pagination_class = LargeBoardPagination
     search_fields = CommunityViewSet.search_fields + ('title',)
+    ordering_fields = CommunityViewSet.ordering_fields + ('like_count', 'comment_count')
+    etag_fields = CommunityViewSet.etag_fields + ('like_count', 'comment_count')
+    etag_per_user = True
 
     @action(methods=('post', 'delete'), detail=True, permission_classes=(IsAuthenticated,),
             url_path='like', url_name='like')
@@ -73,6 +134,9 @@ class PostCommentViewSet(ChildViewSet):
     parent_model = Post
     queryset = PostComment.objects.all()
     serializer_class = PostCommentSerializer
+    ordering_fields = CommunityViewSet.ordering_fields + ('like_count',)
+    etag_fields = CommunityViewSet.etag_fields + ('like_count',)
+    etag_per_user = True
 
     @action(methods=('post', 'delete'), detail=True, permission_classes=(IsAuthenticated,),
             url_path='like', url_name='like')
@@ -84,7 +148,11 @@ class ReviewViewSet(CommunityViewSet):
     # model = Review
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    pagination_class = LargeBoardPagination
     search_fields = CommunityViewSet.search_fields
+    ordering_fields = CommunityViewSet.ordering_fields + ('like_count', 'comment_count')
+    etag_fields = CommunityViewSet.etag_fields + ('like_count', 'comment_count')
+    etag_per_user = True
 
     @action(methods=('post', 'delete'), detail=True, permission_classes=(IsAuthenticated,),
             url_path='like', url_name='like')
@@ -97,6 +165,9 @@ class ReviewCommentViewSet(ChildViewSet):
     parent_model = Review
     queryset = ReviewComment.objects.all()
     serializer_class = ReviewCommentSerializer
+    ordering_fields = CommunityViewSet.ordering_fields + ('like_count',)
+    etag_fields = CommunityViewSet.etag_fields + ('like_count',)
+    etag_per_user = True
 
     @action(methods=('post', 'delete'), detail=True, permission_classes=(IsAuthenticated,),
             url_path='like', url_name='like')
@@ -111,6 +182,9 @@ class NoticeViewSet(CommunityViewSet):
     queryset = Notice.objects.all()
     serializer_class = NoticeSerializer
 
+    cache_group = 'notice'
+    cache_dependencies = {Notice: 'pk'}
+
 
 # ---------------------------------------------------------------
 
@@ -119,6 +193,8 @@ class QuestionViewSet(CommunityViewSet):
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
     search_fields = CommunityViewSet.search_fields + ('title',)
+    ordering_fields = CommunityViewSet.ordering_fields + ('answer_count',)
+    etag_fields = CommunityViewSet.etag_fields + ('answer_count',)
 
 
 class AnswerViewSet(ChildViewSet):
@@ -131,7 +207,7 @@ class AnswerViewSet(ChildViewSet):
 
 # ---------------------------------------------------------------
 
-class QuestionTypeViewSet(ReadOnlyModelViewSet):
+class QuestionTypeViewSet(CachedResponseMixin, ReadOnlyModelViewSet):
     """
     Question의 질문 종류
 
@@ -141,3 +217,6 @@ class QuestionTypeViewSet(ReadOnlyModelViewSet):
     """
     queryset = QuestionType.objects.all().order_by('id')
     serializer_class = QuestionTypeSerializer
+
+    cache_group = 'question-type'
+    cache_dependencies = {QuestionType: 'pk'}
@@ -0,0 +1,48 @@
+from django_filters import rest_framework as filters
+
+from loffle.models import Raffle, Product, ProductFacet
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    pass
+
+
+class ProductFilter(filters.FilterSet):
+    """
+    제품 목록 패싯 검색
+    - `brand`, `size`, `color`: 쉼표로 구분한 값 중 하나와 일치 (`?brand=Nike,Adidas&size=270`)
+    - 패싯 값과 제품 수는 `GET /products/facets`
+    """
+    brand = CharInFilter()
+    size = CharInFilter()
+    color = CharInFilter()
+
+    class Meta:
+        model = Product
+        fields = ProductFacet.FACETS
+
+
+class RaffleFilter(filters.FilterSet):
+    """
+    래플 목록 검색
+    - `progress`: 진행 상황 (여러 개 가능 - `?progress=ongoing&progress=waiting`)
+    - `brand`, `product_name`: 연결된 제품의 브랜드(일치), 이름(부분 일치)
+    - `start_date_time_after`/`_before`, `end_date_time_after`/`_before`, `announce_date_time_after`/`_before`: 일시 범위
+    - 진행 상황 + 일시 범위 조건은 (is_deleted, progress, 일시) 인덱스를 사용
+    - 실행 계획 확인: `python manage.py explain_raffle_search`
+    """
+    progress = filters.MultipleChoiceFilter(choices=Raffle.PROGRESS_CHOICES, distinct=False)
+    brand = filters.CharFilter(method='filter_brand')
+    product_name = filters.CharFilter(field_name='product__name', lookup_expr='icontains')
+    start_date_time = filters.IsoDateTimeFromToRangeFilter()
+    end_date_time = filters.IsoDateTimeFromToRangeFilter()
+    announce_date_time = filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Raffle
+        fields = ('product', 'progress', 'brand', 'product_name',
+                  'start_date_time', 'end_date_time', 'announce_date_time')
+
+    def filter_brand(self, queryset, name, value):
+        # JOIN 대신 product_id IN (브랜드의 제품) 으로 검색해서 (product, is_deleted), (is_deleted, brand) 인덱스를 사용
+        return queryset.filter(product__in=Product.objects.filter(brand=value).values('pk'))
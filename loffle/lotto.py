@@ -0,0 +1,75 @@
+from datetime import date
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class LottoFetchError(Exception):
+    pass
+
+
+class LottoFetcher:
+    """
+    동행복권 로또 당첨 번호 API 클라이언트
+    - 커넥션 풀을 가진 세션을 재사용하고, 모든 요청에 timeout 적용
+    - 연결 실패/5xx 응답은 backoff 를 두고 제한된 횟수만큼 재시도
+    - API 주소는 `LOTTO_API_URL` 설정으로 바꿀 수 있음 (테스트에서는 `run_lotto_stub_server` 주소 사용)
+    """
+
+    def __init__(self, url=None, timeout=None, retries=None, backoff=None, pool_size=10):
+        self.url = url or settings.LOTTO_API_URL
+        self.timeout = timeout or settings.LOTTO_API_TIMEOUT
+
+        retry = Retry(
+            total=settings.LOTTO_API_RETRIES if retries is None else retries,
+            backoff_factor=settings.LOTTO_API_BACKOFF if backoff is None else backoff,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=('GET',),
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, draw_no):
+        """
+        회차의 당첨 번호 조회
+        - 반환값: {'draw_no', 'draw_date', 'numbers', 'bonus_num'}
+        """
+        try:
+            res = self.session.get(
+                self.url,
+                params={'method': 'getLottoNumber', 'drwNo': draw_no},
+                timeout=self.timeout,
+            )
+            res.raise_for_status()
+            data = res.json()
+        except (requests.RequestException, ValueError) as e:
+            raise LottoFetchError(f'{draw_no}회차 당첨 번호를 가져오지 못했습니다. ({e})') from e
+
+        # 아직 추첨하지 않은 회차는 {"returnValue": "fail"} 응답
+        if data.get('returnValue') != 'success':
+            raise LottoFetchError(f'{draw_no}회차 당첨 번호가 없습니다.')
+
+        return {
+            'draw_no': data['drwNo'],
+            'draw_date': date.fromisoformat(data['drwNoDate']),
+            'numbers': [data[f'drwtNo{i}'] for i in range(1, 7)],
+            'bonus_num': data['bnusNo'],
+        }
+
+
+_fetcher = None
+
+
+def get_lotto_fetcher():
+    """
+    프로세스에서 공유하는 LottoFetcher (세션/커넥션 풀 재사용)
+    """
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = LottoFetcher()
+    return _fetcher
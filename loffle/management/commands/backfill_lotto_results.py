@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from loffle.models import LottoResult, KST
+
+
+class Command(BaseCommand):
+    help = '지난 회차의 로또 당첨 번호를 동시에 조회하여 저장하기 (이미 저장된 회차는 건너뜀)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', type=int, default=1, dest='from_no', help='시작 회차 (기본값: 1)')
+        parser.add_argument('--to', type=int, dest='to_no', help='마지막 회차 (기본값: 가장 최근 회차)')
+        parser.add_argument('--workers', type=int, default=8, help='동시에 요청하는 수')
+
+    def handle(self, *args, **options):
+        to_no = options['to_no'] or self.latest_draw_no()
+        draw_nos = list(range(options['from_no'], to_no + 1))
+
+        count, errors = LottoResult.fetch_many(draw_nos, workers=options['workers'])
+
+        for draw_no, error in sorted(errors.items()):
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(f'{count}개 회차의 당첨 번호를 저장했습니다. (실패: {len(errors)})'))
+
+    @staticmethod
+    def latest_draw_no():
+        # 1회차(2002-12-07)부터 매주 토요일 20:45 추첨
+        first_draw_at = datetime(year=2002, month=12, day=7, hour=20, minute=45, tzinfo=KST)
+        now_kst = datetime.now(tz=KST)
+        return (now_kst - first_draw_at) // timedelta(days=7) + 1
@@ -0,0 +1,66 @@
+import tracemalloc
+from datetime import timedelta
+from random import sample
+from time import perf_counter
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from account.models import User
+from loffle.models import Product, Raffle, RaffleApply
+from loffle.sampling import new_seed
+
+
+class Command(BaseCommand):
+    help = '응모자 수에 따른 1차 추첨(후보자 뽑기)의 메모리 사용량/시간 비교 (임시 데이터는 종료 후 삭제)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='래플별 응모자 수')
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['applicants'])
+        prefix = uuid4().hex[:8]
+
+        User.objects.bulk_create([
+            User(email=f'{prefix}-{i}@bench.test', username=f'{prefix}-{i}', sex='M', phone=f'{prefix[:3]}{i:08d}')
+            for i in range(sizes[-1])
+        ], batch_size=2000)
+        user_ids = list(User.objects.filter(username__startswith=f'{prefix}-').values_list('id', flat=True))
+
+        now = timezone.now()
+        product = Product.objects.create(name=prefix, size='-', brand='-', serial='-', color='-',
+                                         release_date=now.date(), user_id=user_ids[0])
+        raffles = []
+        try:
+            for size in sizes:
+                raffle = Raffle.objects.create(start_date_time=now - timedelta(minutes=1),
+                                               end_date_time=now + timedelta(days=1),
+                                               target_quantity=size, user_id=user_ids[0], product=product)
+                raffles.append(raffle)
+                RaffleApply.objects.bulk_create([
+                    RaffleApply(raffle=raffle, user_id=user_id, ordinal_number=i)
+                    for i, user_id in enumerate(user_ids[:size], start=1)
+                ], batch_size=2000)
+                Raffle.repair_counters(raffle_ids=[raffle.pk])
+                raffle.refresh_from_db()
+
+                self.stdout.write(f'응모자 {size}명')
+                self.report('  values_list + random.sample', lambda: sample(
+                    list(raffle.applied.values_list('id', flat=True)), raffle.get_num_candidates()))
+                self.report('  reservoir sampling (chunked)', lambda: raffle.sample_candidates(new_seed()))
+        finally:
+            for raffle in raffles:
+                Raffle._base_manager.filter(pk=raffle.pk).delete()
+            Product._base_manager.filter(pk=product.pk).delete()
+            User.objects.filter(pk__in=user_ids).delete()
+
+    def report(self, label, func):
+        tracemalloc.start()
+        started = perf_counter()
+        func()
+        elapsed = perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(f'{label}: 최대 메모리 {peak / 1024:,.0f} KiB / {elapsed * 1000:,.0f} ms')
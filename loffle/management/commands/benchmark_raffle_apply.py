@@ -0,0 +1,142 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import Event, Thread
+from time import perf_counter, sleep
+from uuid import uuid4
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, DatabaseError
+from django.utils import timezone
+
+from account.models import User
+from loffle.models import Product, Raffle, RaffleApplyRequest, TicketBalance, TicketLedger
+
+
+class Command(BaseCommand):
+    help = '래플 응모 처리 방식(direct / queued)별 처리량 비교 (임시 데이터는 종료 후 삭제)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=2000, help='래플별 응모자 수 (= 목표 수량)')
+        parser.add_argument('--threads', type=int, default=32, help='동시에 응모 요청을 보내는 스레드 수')
+        parser.add_argument('--batch', type=int, default=500, help='queued 모드 워커의 배치 크기')
+        parser.add_argument('--max-retries', type=int, default=10, dest='max_retries',
+                            help='queued 모드 워커가 DB 오류로 연속해서 다시 시도하는 최대 횟수')
+
+    def handle(self, *args, **options):
+        num_applicants, num_threads = options['applicants'], options['threads']
+        prefix = uuid4().hex[:8]
+        self.max_retries = options['max_retries']
+
+        product, raffles = None, []
+        try:
+            User.objects.bulk_create([
+                User(email=f'{prefix}-{i}@bench.test', username=f'{prefix}-{i}', sex='M', phone=f'{prefix[:3]}{i:08d}')
+                for i in range(num_applicants)
+            ], batch_size=2000)
+            users = list(User.objects.filter(username__startswith=f'{prefix}-'))
+            user_ids = [user.pk for user in users]
+
+            # 두 래플에 한 번씩 응모할 수 있도록 티켓 2장씩 지급
+            TicketLedger.objects.bulk_create([
+                TicketLedger(user_id=user_id, kind=TicketLedger.KIND_CHOICES[0][0], quantity=2) for user_id in user_ids
+            ], batch_size=2000)
+            TicketBalance.rebuild(user_ids)
+
+            now = timezone.now()
+            product = Product.objects.create(name=prefix, size='-', brand='-', serial='-', color='-',
+                                             release_date=now.date(), user_id=user_ids[0])
+            for mode in ('direct', 'queued'):
+                raffle = Raffle.objects.create(start_date_time=now - timedelta(minutes=1),
+                                               end_date_time=now + timedelta(days=1),
+                                               target_quantity=num_applicants, user_id=user_ids[0], product=product)
+                raffles.append(raffle)
+                getattr(self, f'run_{mode}')(raffle, users, num_threads, options['batch'])
+        finally:
+            # 준비 중에 실패해도 만든 데이터는 모두 삭제 (사용자를 지우면 원장/잔액도 함께 삭제됨)
+            for raffle in raffles:
+                Raffle._base_manager.filter(pk=raffle.pk).delete()
+            if product is not None:
+                Product._base_manager.filter(pk=product.pk).delete()
+            User.objects.filter(username__startswith=f'{prefix}-').delete()
+
+    def run_direct(self, raffle, users, num_threads, batch_size):
+        def apply(user):
+            try:
+                Raffle.objects.select_related(None).get(pk=raffle.pk).apply(user)
+                return 'applied'
+            except ValidationError:
+                return 'rejected'
+            except DatabaseError:
+                return 'db error'
+            finally:
+                connection.close()
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            results = Counter(executor.map(apply, users))
+        elapsed = perf_counter() - started
+
+        self.report('direct', results, accepted=elapsed, completed=elapsed)
+
+    def run_queued(self, raffle, users, num_threads, batch_size):
+        def enqueue(user):
+            try:
+                Raffle.objects.select_related(None).get(pk=raffle.pk).enqueue_apply(user)
+                return 'queued'
+            except ValidationError:
+                return 'rejected'
+            except DatabaseError:
+                return 'db error'
+            finally:
+                connection.close()
+
+        # 접수와 동시에 워커 하나가 대기열을 처리
+        enqueued = Event()
+        flushed = Counter()
+
+        def flush():
+            retries = 0
+            try:
+                while True:
+                    try:
+                        result = RaffleApplyRequest.flush(batch_size=batch_size)
+                    except DatabaseError:
+                        # 배치 전체가 롤백되므로 다시 처리 (계속 실패하면 중단)
+                        flushed['db error'] += 1
+                        retries += 1
+                        if retries > self.max_retries:
+                            flushed['gave up'] += 1
+                            return
+                        sleep(0.01 * retries)
+                        continue
+                    retries = 0
+                    flushed.update(result)
+                    if not sum(result.values()):
+                        if enqueued.is_set():
+                            return
+                        sleep(0.01)
+            finally:
+                connection.close()
+
+        worker = Thread(target=flush)
+        started = perf_counter()
+        worker.start()
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            results = Counter(executor.map(enqueue, users))
+        accepted = perf_counter() - started
+        enqueued.set()
+        worker.join()
+        completed = perf_counter() - started
+
+        results.update({f'flush {status}': count for status, count in flushed.items()})
+        self.report('queued', results, accepted=accepted, completed=completed)
+        if flushed['gave up']:
+            raise CommandError(f'DB 오류로 {self.max_retries}번 넘게 연속해서 실패하여 대기열 처리를 중단했습니다.')
+
+    def report(self, mode, results, accepted, completed):
+        total = sum(count for status, count in results.items() if not status.startswith('flush'))
+        self.stdout.write(f'{mode}: {dict(results)}')
+        self.stdout.write(f'  접수: {accepted:,.2f}초 ({total / accepted:,.0f}건/초)'
+                          f' / 처리 완료: {completed:,.2f}초 ({total / completed:,.0f}건/초)')
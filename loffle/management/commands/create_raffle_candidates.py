@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from loffle.models import Raffle, RaffleCandidateDraw
+
+
+class Command(BaseCommand):
+    help = '종료(done)된 래플의 1차 추첨(후보자 뽑기) 실행, 또는 기록된 seed 로 추첨 결과 검증'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--raffle', type=int, dest='raffle_id', help='대상 래플 id (기본값: 추첨하지 않은 전체)')
+        parser.add_argument('--seed', help='사용할 seed (기본값: 무작위 생성)')
+        parser.add_argument('--verify', action='store_true', help='추첨하지 않고 기록된 seed 로 결과를 재현하여 비교')
+
+    def handle(self, *args, **options):
+        raffle_id = options['raffle_id']
+
+        if options['verify']:
+            draws = RaffleCandidateDraw.objects.select_related('raffle')
+            if raffle_id is not None:
+                draws = draws.filter(raffle_id=raffle_id)
+            for draw in draws:
+                if draw.raffle.verify_candidates():
+                    self.stdout.write(self.style.SUCCESS(f'래플 {draw.raffle_id}: 일치 (seed={draw.seed})'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'래플 {draw.raffle_id}: 불일치 (seed={draw.seed})'))
+            return
+
+        if raffle_id is None:
+            count = Raffle.create_pending_candidates()
+            self.stdout.write(self.style.SUCCESS(f'래플 {count}건의 1차 추첨을 했습니다.'))
+            return
+
+        try:
+            raffle = Raffle.objects.select_related(None).get(pk=raffle_id)
+        except Raffle.DoesNotExist:
+            raise CommandError(f'래플 {raffle_id}이(가) 존재하지 않습니다.')
+        if not raffle.create_candidates(seed=options['seed']):
+            raise CommandError(f'래플 {raffle_id}은(는) 1차 추첨을 할 수 없습니다. (종료 상태가 아니거나 이미 추첨함)')
+        self.stdout.write(self.style.SUCCESS(
+            f'래플 {raffle_id}의 1차 추첨을 했습니다. (seed={raffle.candidate_draw.seed})'))
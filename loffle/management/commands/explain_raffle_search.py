@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+from django.utils import timezone
+
+from loffle.filters import RaffleFilter
+from loffle.models import Raffle
+
+
+class Command(BaseCommand):
+    help = '래플 검색(`RaffleFilter`) 조건별 실행 계획(EXPLAIN)을 출력하고 기대한 인덱스를 사용하는지 확인'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--brand', default='Nike', help='브랜드 검색에 사용할 브랜드')
+        parser.add_argument('--verbose-plan', action='store_true', dest='verbose_plan', help='실행 계획 전체 출력')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        week = (now + timedelta(days=7)).isoformat()
+
+        # (설명, 검색 조건, 사용해야 하는 인덱스)
+        cases = [
+            ('진행중 + 이번 주 종료', {'progress': 'ongoing', 'end_date_time_after': now.isoformat(),
+                                  'end_date_time_before': week},
+             ['raffle_progress_end_idx']),
+            ('대기 + 시작 일시 범위', {'progress': 'waiting', 'start_date_time_after': now.isoformat()},
+             ['raffle_progress_start_idx']),
+            ('발표 일시 범위', {'announce_date_time_after': now.isoformat(), 'announce_date_time_before': week},
+             ['raffle_announce_idx']),
+            ('브랜드', {'brand': options['brand']},
+             ['product_brand_idx', 'raffle_product_idx']),
+        ]
+
+        missing = []
+        for label, params, indexes in cases:
+            query = QueryDict(mutable=True)
+            query.update(params)
+            filterset = RaffleFilter(query, queryset=Raffle.objects.select_related(None))
+            if not filterset.is_valid():
+                raise CommandError(f'{label}: 잘못된 검색 조건 {dict(filterset.errors)}')
+
+            plan = filterset.qs.explain()
+            used = [index for index in indexes if index in plan]
+            unused = [index for index in indexes if index not in plan]
+            missing.extend(unused)
+
+            if unused:
+                self.stdout.write(self.style.ERROR(f'{label}: 인덱스 미사용 {unused}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{label}: {used}'))
+            if options['verbose_plan'] or unused:
+                self.stdout.write(plan)
+
+        if missing:
+            raise CommandError(f'인덱스를 사용하지 않는 검색 조건이 있습니다. {missing}')
@@ -0,0 +1,31 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from loffle.models import RaffleApplyRequest
+
+
+class Command(BaseCommand):
+    help = '래플 응모 요청 대기열 처리 워커 (`RAFFLE_APPLY_MODE = "queued"`) - 처리 대기 중인 요청을 모아서 한 트랜잭션에 응모 처리'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=500, help='한 트랜잭션에서 처리할 최대 요청 수')
+        parser.add_argument('--interval', type=float, default=0.2, help='대기열이 비었을 때 다시 확인할 간격 (초)')
+        parser.add_argument('--once', action='store_true', help='대기열이 빌 때까지 처리하고 종료')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            result = RaffleApplyRequest.flush(batch_size=options['batch'])
+            processed = sum(result.values())
+            if processed:
+                self.stdout.write(
+                    f'[{timezone.localtime():%Y-%m-%d %H:%M:%S}] 응모 완료: {result["applied"]}건 / 응모 실패: {result["rejected"]}건')
+
+            # 배치를 가득 채웠으면 밀린 요청이 더 있으므로 바로 다음 배치 처리
+            if processed < options['batch']:
+                if options['once']:
+                    return
+                sleep(options['interval'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from loffle.models import ProductFacet
+
+
+class Command(BaseCommand):
+    help = '제품으로부터 패싯(브랜드, 사이즈, 색상) 값별 제품 수(ProductFacet) 다시 계산하기'
+
+    def handle(self, *args, **options):
+        count = ProductFacet.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'패싯 값 {count}건을 다시 계산했습니다.'))
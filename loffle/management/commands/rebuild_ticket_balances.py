@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from loffle.models import TicketBalance
+
+
+class Command(BaseCommand):
+    help = '티켓 원장(TicketLedger)으로부터 사용자별 티켓 잔액(TicketBalance) 다시 계산하기'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, nargs='*', dest='user_ids', help='대상 사용자 id (기본값: 전체)')
+
+    def handle(self, *args, **options):
+        count = TicketBalance.rebuild(user_ids=options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'티켓 잔액 {count}건을 다시 계산했습니다.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from loffle.models import Raffle
+
+
+class Command(BaseCommand):
+    help = '래플의 응모 수(applied_count)와 1차 당첨자 수(candidates_count)를 실제 응모/후보자 행으로부터 다시 계산하기'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--raffle', type=int, nargs='*', dest='raffle_ids', help='대상 래플 id (기본값: 전체)')
+
+    def handle(self, *args, **options):
+        count = Raffle.repair_counters(raffle_ids=options['raffle_ids'])
+        self.stdout.write(self.style.SUCCESS(f'래플 {count}건의 집계 값을 다시 계산했습니다.'))
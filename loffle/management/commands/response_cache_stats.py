@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from _common.cache import DEPENDENCIES, get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = '응답 캐시 그룹별 hit/miss 횟수 보기'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='출력 후 횟수 초기화')
+
+    def handle(self, *args, **options):
+        # 모든 viewset 을 불러와 캐시 그룹 등록
+        get_resolver().url_patterns
+
+        for group in sorted(DEPENDENCIES):
+            stats = get_stats(group)
+            total = stats['hit'] + stats['miss']
+            ratio = stats['hit'] / total * 100 if total else 0
+            self.stdout.write(f'{group}: hit {stats["hit"]} / miss {stats["miss"]} ({ratio:.1f}%)')
+            if options['reset']:
+                reset_stats(group)
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from json import dumps
+from random import Random
+from urllib.parse import urlparse, parse_qs
+
+from django.core.management.base import BaseCommand
+
+FIRST_DRAW_DATE = date(year=2002, month=12, day=7)
+
+
+def stub_lotto_number(draw_no):
+    """
+    동행복권 API 와 같은 형식의 응답 (회차 번호로 정해지는 번호)
+    """
+    if draw_no < 1:
+        return {'returnValue': 'fail'}
+
+    numbers = Random(draw_no).sample(range(1, 46), 7)
+    data = {
+        'returnValue': 'success',
+        'drwNo': draw_no,
+        'drwNoDate': (FIRST_DRAW_DATE + timedelta(days=7 * (draw_no - 1))).isoformat(),
+        'bnusNo': numbers.pop(),
+    }
+    for i, number in enumerate(sorted(numbers), start=1):
+        data[f'drwtNo{i}'] = number
+    return data
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        try:
+            body = stub_lotto_number(int(params['drwNo'][0]))
+        except (KeyError, ValueError):
+            body = {'returnValue': 'fail'}
+
+        content = dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = '외부 네트워크 없이 사용할 로또 당첨 번호 API stub 서버 (LOTTO_API_URL 을 이 주소로 설정)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer((options['host'], options['port']), StubHandler)
+        self.stdout.write(f'LOTTO_API_URL = http://{options["host"]}:{options["port"]}/common.do')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from loffle.models import Raffle, RaffleResult
+
+
+class Command(BaseCommand):
+    help = '래플 진행 상황 스케줄러 - 시작/종료 일시가 되면 진행 상황을 bulk UPDATE 로 바꾸고 (waiting -> ongoing -> failed), 종료(done)된 래플의 1차 추첨과 발표 전 결과 캐시 준비'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll', type=int, default=5,
+                            help='다음 처리 일시를 다시 조회하는 간격 (초) - 새로 만들어지거나 일정이 바뀐 래플은 이 간격 안에 반영')
+        parser.add_argument('--warm-up', type=int, default=900, dest='warm_up',
+                            help='발표 일시 몇 초 전부터 추첨 결과를 캐시에 미리 올릴지')
+        parser.add_argument('--once', action='store_true', help='밀린 변경만 반영하고 종료')
+
+    def handle(self, *args, **options):
+        self.poll = timedelta(seconds=options['poll'])
+        self.warm_up = timedelta(seconds=options['warm_up'])
+        # 발표 일시가 이 시각까지인 래플은 추첨 결과를 캐시에 올렸음
+        self.warmed_until = timezone.now()
+
+        # 시작할 때는 밀린 변경을 모두 반영
+        self.advance()
+        if options['once']:
+            return
+
+        while True:
+            # `poll`초마다 다음 처리 일시만 다시 조회하고, 처리할 일이 있을 때만 `advance()` 실행
+            close_old_connections()
+            now = timezone.now()
+            due = self.get_next_due(now)
+            if due is not None and due <= now:
+                self.advance()
+                continue
+
+            wake = min(due, now + self.poll) if due else now + self.poll
+            sleep((wake - now).total_seconds())
+
+    def get_next_due(self, now):
+        """
+        다음으로 처리할 일시 (없으면 None)
+        - (is_deleted, progress, 일시), (is_deleted, 발표 일시) 인덱스의 MIN 조회 세 번
+        """
+        waiting, ongoing, done = (Raffle.PROGRESS_CHOICES[i][0] for i in (0, 1, 2))
+
+        # 시작 일시가 되면 waiting -> ongoing
+        # (이미 지난 일시도 포함 - 조회 사이에 만들어지거나 일정이 바뀐 래플은 바로 처리, `advance()` 이후에는 남지 않음)
+        start = Raffle.objects \
+            .filter(progress=waiting) \
+            .aggregate(due=Min('start_date_time'))['due']
+        # 종료 일시가 지나면 waiting, ongoing -> failed (종료 일시까지는 응모 가능)
+        end = Raffle.objects \
+            .filter(progress__in=(waiting, ongoing)) \
+            .aggregate(due=Min('end_date_time'))['due']
+        # 발표를 기다리는 종료(done) 래플 중 1차 추첨 전인 래플 / 아직 추첨 결과를 캐시에 올리지 않은 래플
+        announce = Raffle.objects \
+            .filter(progress=done, announce_date_time__gt=now) \
+            .aggregate(draw=Min('announce_date_time', filter=Q(candidates_count=0)),
+                       warm_up=Min('announce_date_time',
+                                   filter=Q(candidates_count__gt=0, announce_date_time__gt=self.warmed_until)))
+
+        dues = [due for due in (start, end and end + timedelta(microseconds=1)) if due is not None]
+        if announce['draw'] is not None:
+            # 1차 추첨은 바로 하되, 추첨하지 못한 래플을 쉬지 않고 다시 시도하지 않도록 `poll` 간격을 둠
+            dues.append(self.advanced_at + self.poll)
+        if announce['warm_up'] is not None:
+            dues.append(announce['warm_up'] - self.warm_up)
+        return min(dues, default=None)
+
+    def advance(self):
+        close_old_connections()
+        now = self.advanced_at = timezone.now()
+
+        result = Raffle.advance_progress(now)
+        if any(result.values()):
+            self.stdout.write(
+                f'[{timezone.localtime(now):%Y-%m-%d %H:%M:%S}] 응모 시작: {result["started"]}건'
+                f' / 응모 종료: {result["closed"]}건 / 응모 실패: {result["failed"]}건')
+
+        # 목표 수량을 채워 종료된 래플의 1차 추첨 (응모 요청과 분리, 추첨 결과는 바로 캐시에 올라감)
+        drawn = Raffle.create_pending_candidates()
+        if drawn:
+            self.stdout.write(f'[{timezone.localtime(now):%Y-%m-%d %H:%M:%S}] 1차 추첨: {drawn}건')
+
+        # 발표 일시가 다가온 래플 중 아직 올리지 않은 래플만 추첨 결과를 캐시에 올림
+        until = now + self.warm_up
+        RaffleResult.warm_up(until, now=now, since=self.warmed_until)
+        self.warmed_until = until
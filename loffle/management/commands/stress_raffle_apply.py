@@ -0,0 +1,74 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, DatabaseError
+from django.utils import timezone
+
+from account.models import User
+from loffle.models import Ticket, TicketBuy, Product, Raffle, RaffleApply
+
+
+class Command(BaseCommand):
+    help = '여러 스레드에서 동시에 래플에 응모하여 초과 응모/순번 중복/DB 오류/미달이 없는지 확인 (실패하면 CommandError, 임시 데이터는 종료 후 삭제)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=200, help='동시에 응모하는 사용자 수')
+        parser.add_argument('--target', type=int, default=50, help='래플의 목표 수량')
+
+    def handle(self, *args, **options):
+        num_threads, target_quantity = options['threads'], options['target']
+        prefix = uuid4().hex[:8]
+
+        users = [
+            User.objects.create_user(
+                email=f'{prefix}-{i}@stress.test', username=f'{prefix}-{i}', sex='M', phone=f'{prefix[:3]}{i:08d}')
+            for i in range(num_threads)
+        ]
+        ticket = Ticket.objects.create(quantity=1, price=0)
+        for user in users:
+            TicketBuy.objects.create(ticket=ticket, user=user)
+
+        now = timezone.now()
+        product = Product.objects.create(name=prefix, size='-', brand='-', serial='-', color='-',
+                                         release_date=now.date(), user=users[0])
+        raffle = Raffle.objects.create(start_date_time=now - timedelta(minutes=1), end_date_time=now + timedelta(days=1),
+                                       target_quantity=target_quantity, user=users[0], product=product)
+
+        def apply(user):
+            try:
+                Raffle.objects.get(pk=raffle.pk).apply(user)
+                return 'applied'
+            except ValidationError:
+                return 'rejected'
+            except DatabaseError:
+                return 'db error'
+            finally:
+                connection.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers=num_threads) as executor:
+                results = Counter(executor.map(apply, users))
+
+            ordinals = list(RaffleApply.objects.filter(raffle=raffle).values_list('ordinal_number', flat=True))
+            oversubscribed = max(len(ordinals) - target_quantity, 0)
+            duplicated = len(ordinals) - len(set(ordinals))
+            # 응모한 사용자가 충분한데 목표 수량(또는 사용자 수)만큼 채우지 못한 경우 (잠금 대기 시간 초과, 교착 상태 등)
+            underfilled = max(min(target_quantity, len(users)) - len(ordinals), 0)
+
+            self.stdout.write(f'결과: {dict(results)}')
+            self.stdout.write(f'응모 수: {len(ordinals)} / 목표 수량: {target_quantity}')
+            self.stdout.write(f'초과 응모: {oversubscribed} / 중복 순번: {duplicated} / '
+                              f'DB 오류: {results["db error"]} / 미달: {underfilled}')
+        finally:
+            Raffle._base_manager.filter(pk=raffle.pk).delete()
+            Product._base_manager.filter(pk=product.pk).delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            ticket.delete()
+
+        if oversubscribed or duplicated or results['db error'] or underfilled:
+            raise CommandError('실패: 초과 응모, 중복 순번, DB 오류 또는 미달이 있습니다.')
+        self.stdout.write(self.style.SUCCESS('성공'))
@@ -0,0 +1,104 @@
+# Generated by Django 3.2.6 on 2026-10-18 13:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Q, Sum
+
+
+def backfill_ticket_ledger(apps, schema_editor):
+    """
+    기존 구매/응모 내역으로 티켓 원장과 잔액 채우기
+    """
+    TicketBuy = apps.get_model('loffle', 'TicketBuy')
+    RaffleApply = apps.get_model('loffle', 'RaffleApply')
+    TicketLedger = apps.get_model('loffle', 'TicketLedger')
+    TicketBalance = apps.get_model('loffle', 'TicketBalance')
+
+    entries = []
+    for tb in TicketBuy.objects.filter(is_deleted=False).select_related('ticket').iterator():
+        entries.append(TicketLedger(user_id=tb.user_id, kind='buy', quantity=tb.ticket.quantity, ticket_buy_id=tb.id))
+    for ra in RaffleApply.objects.filter(is_deleted=False).select_related('raffle').iterator():
+        entries.append(TicketLedger(user_id=ra.user_id, kind='use', quantity=1, raffle_apply_id=ra.id))
+        if ra.raffle.progress == 'failed':
+            entries.append(TicketLedger(user_id=ra.user_id, kind='refund', quantity=1, raffle_apply_id=ra.id))
+    TicketLedger.objects.bulk_create(entries, batch_size=500)
+
+    totals = TicketLedger.objects.values('user_id').annotate(
+        num_buy_tickets=Sum('quantity', filter=Q(kind='buy')),
+        num_use_tickets=Sum('quantity', filter=Q(kind='use')),
+        num_return_tickets=Sum('quantity', filter=Q(kind='refund')),
+    ).order_by()
+    TicketBalance.objects.bulk_create([
+        TicketBalance(
+            user_id=row['user_id'],
+            num_buy_tickets=row['num_buy_tickets'] or 0,
+            num_use_tickets=row['num_use_tickets'] or 0,
+            num_return_tickets=row['num_return_tickets'] or 0,
+        )
+        for row in totals
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('loffle', '0002_auto_20211030_2007'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketBalance',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ticket_balance', serialize=False, to='account.user')),
+                ('num_buy_tickets', models.PositiveIntegerField(default=0, verbose_name='구매한 티켓 수량')),
+                ('num_use_tickets', models.PositiveIntegerField(default=0, verbose_name='사용한 티켓 수량')),
+                ('num_return_tickets', models.PositiveIntegerField(default=0, verbose_name='돌려받은 티켓 수량')),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'loffle_ticket_balance',
+            },
+        ),
+        migrations.AlterField(
+            model_name='lotto',
+            name='bonus_num',
+            field=models.SmallIntegerField(blank=True, verbose_name='보너스 당첨 번호'),
+        ),
+        migrations.AlterField(
+            model_name='rafflecandidate',
+            name='raffle_apply',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='raffle_candidate', to='loffle.raffleapply', verbose_name='1차 당첨'),
+        ),
+        migrations.AlterField(
+            model_name='rafflewinner',
+            name='raffle_candidate',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='raffle_winner', to='loffle.rafflecandidate', verbose_name='최종 당첨'),
+        ),
+        migrations.CreateModel(
+            name='TicketLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('buy', '구매'), ('use', '사용'), ('refund', '환불')], max_length=10, verbose_name='종류')),
+                ('quantity', models.PositiveIntegerField(verbose_name='수량')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('raffle_apply', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ticket_ledger', to='loffle.raffleapply')),
+                ('ticket_buy', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ticket_ledger', to='loffle.ticketbuy')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'loffle_ticket_ledger',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticketledger',
+            constraint=models.UniqueConstraint(fields=('ticket_buy', 'kind'), name='unique_ticket_ledger_ticket_buy'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketledger',
+            constraint=models.UniqueConstraint(fields=('raffle_apply', 'kind'), name='unique_ticket_ledger_raffle_apply'),
+        ),
+        migrations.RunPython(backfill_ticket_ledger, migrations.RunPython.noop),
+    ]
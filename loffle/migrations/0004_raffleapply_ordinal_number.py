@@ -0,0 +1,86 @@
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def dedupe_raffle_applies(apps, schema_editor):
+    """
+    같은 사용자가 같은 래플에 여러 번 응모한 내역 정리 ((raffle, user) unique 제약 추가 전)
+    - (raffle, user)별로 가장 먼저 응모한 내역만 남기고(삭제되지 않은 내역 우선) 나머지는 삭제
+    - 삭제하는 응모에 사용된 티켓은 원장에 환불 내역을 추가하고 잔액에 반영 (원장 내역은 응모와의 연결만 끊고 남김)
+    """
+    RaffleApply = apps.get_model('loffle', 'RaffleApply')
+    TicketLedger = apps.get_model('loffle', 'TicketLedger')
+    TicketBalance = apps.get_model('loffle', 'TicketBalance')
+
+    duplicated = RaffleApply.objects.values('raffle_id', 'user_id') \
+        .annotate(count=Count('id')).filter(count__gt=1).order_by()
+
+    refunds = []
+    for row in duplicated:
+        applies = RaffleApply.objects.filter(raffle_id=row['raffle_id'], user_id=row['user_id']) \
+            .order_by('is_deleted', 'created_at', 'id')
+        removed_ids = list(applies.values_list('id', flat=True)[1:])
+
+        kinds = TicketLedger.objects.filter(raffle_apply_id__in=removed_ids) \
+            .values('raffle_apply_id').annotate(
+                used=Count('id', filter=models.Q(kind='use')),
+                refunded=Count('id', filter=models.Q(kind='refund')),
+            ).order_by()
+        for ledger in kinds:
+            if ledger['used'] and not ledger['refunded']:
+                refunds.append(TicketLedger(user_id=row['user_id'], kind='refund', quantity=1))
+
+        TicketLedger.objects.filter(raffle_apply_id__in=removed_ids).update(raffle_apply_id=None)
+        RaffleApply.objects.filter(pk__in=removed_ids).delete()
+
+    TicketLedger.objects.bulk_create(refunds, batch_size=500)
+    TicketBalance.objects.bulk_create([TicketBalance(user_id=entry.user_id) for entry in refunds], ignore_conflicts=True)
+    for entry in refunds:
+        TicketBalance.objects.filter(user_id=entry.user_id).update(num_return_tickets=F('num_return_tickets') + 1)
+
+
+def backfill_ordinal_number(apps, schema_editor):
+    """
+    기존 응모 내역에 응모 시각 순서대로 순번 부여
+    """
+    RaffleApply = apps.get_model('loffle', 'RaffleApply')
+
+    applies = []
+    last_raffle_id, ordinal_number = None, 0
+    for ra in RaffleApply.objects.order_by('raffle_id', 'created_at', 'id').iterator():
+        if ra.raffle_id != last_raffle_id:
+            last_raffle_id, ordinal_number = ra.raffle_id, 0
+        ordinal_number += 1
+        ra.ordinal_number = ordinal_number
+        applies.append(ra)
+    RaffleApply.objects.bulk_update(applies, fields=['ordinal_number'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0003_ticket_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='raffleapply',
+            name='ordinal_number',
+            field=models.PositiveIntegerField(editable=False, null=True, verbose_name='응모 순번'),
+        ),
+        migrations.RunPython(dedupe_raffle_applies, migrations.RunPython.noop),
+        migrations.RunPython(backfill_ordinal_number, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='raffleapply',
+            name='ordinal_number',
+            field=models.PositiveIntegerField(editable=False, verbose_name='응모 순번'),
+        ),
+        migrations.AddConstraint(
+            model_name='raffleapply',
+            constraint=models.UniqueConstraint(fields=('raffle', 'user'), name='unique_raffle_apply_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='raffleapply',
+            constraint=models.UniqueConstraint(fields=('raffle', 'ordinal_number'), name='unique_raffle_apply_ordinal_number'),
+        ),
+    ]
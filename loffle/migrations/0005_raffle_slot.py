@@ -0,0 +1,71 @@
+# Generated by Django 3.2.6 on 2026-10-18 13:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_raffle_slots(apps, schema_editor):
+    """
+    기존 래플의 응모 순번 슬롯 만들기 (이미 응모한 순번은 선점된 상태로)
+    - 한 사용자는 슬롯 하나만 선점하도록((raffle, user) unique 제약) 사용자별로 가장 앞선 순번의 응모만 슬롯에 연결
+    """
+    Raffle = apps.get_model('loffle', 'Raffle')
+    RaffleApply = apps.get_model('loffle', 'RaffleApply')
+    RaffleSlot = apps.get_model('loffle', 'RaffleSlot')
+
+    for raffle in Raffle.objects.iterator():
+        applies, user_ids = {}, set()
+        for ra in RaffleApply.objects.filter(raffle_id=raffle.id).order_by('ordinal_number'):
+            if ra.user_id not in user_ids:
+                user_ids.add(ra.user_id)
+                applies[ra.ordinal_number] = ra
+        last = max([raffle.target_quantity, *applies.keys()])
+
+        slots = []
+        for number in range(1, last + 1):
+            ra = applies.get(number)
+            slots.append(RaffleSlot(
+                raffle_id=raffle.id,
+                number=number,
+                user_id=ra.user_id if ra else None,
+                raffle_apply_id=ra.id if ra else None,
+            ))
+        RaffleSlot.objects.bulk_create(slots, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('loffle', '0004_raffleapply_ordinal_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RaffleSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='순번')),
+                ('raffle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='loffle.raffle')),
+                ('raffle_apply', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slot', to='loffle.raffleapply')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='raffle_slots', to=settings.AUTH_USER_MODEL, verbose_name='선점한 사람')),
+            ],
+            options={
+                'db_table': 'loffle_raffle_slot',
+            },
+        ),
+        migrations.RunPython(create_raffle_slots, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='raffleslot',
+            index=models.Index(fields=['raffle', 'user', 'number'], name='raffle_slot_free_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='raffleslot',
+            constraint=models.UniqueConstraint(fields=('raffle', 'number'), name='unique_raffle_slot_number'),
+        ),
+        migrations.AddConstraint(
+            model_name='raffleslot',
+            constraint=models.UniqueConstraint(fields=('raffle', 'user'), name='unique_raffle_slot_user'),
+        ),
+    ]
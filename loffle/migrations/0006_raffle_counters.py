@@ -0,0 +1,41 @@
+# Generated by Django 3.2.6 on 2026-10-18 13:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_raffle_counters(apps, schema_editor):
+    Raffle = apps.get_model('loffle', 'Raffle')
+    RaffleApply = apps.get_model('loffle', 'RaffleApply')
+    RaffleCandidate = apps.get_model('loffle', 'RaffleCandidate')
+
+    applied = RaffleApply.objects.filter(raffle_id=OuterRef('pk'), is_deleted=False) \
+        .order_by().values('raffle_id').annotate(count=Count('id')).values('count')
+    candidates = RaffleCandidate.objects.filter(raffle_apply__raffle_id=OuterRef('pk'), raffle_apply__is_deleted=False) \
+        .order_by().values('raffle_apply__raffle_id').annotate(count=Count('id')).values('count')
+    Raffle.objects.update(
+        applied_count=Coalesce(Subquery(applied), 0),
+        candidates_count=Coalesce(Subquery(candidates), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0005_raffle_slot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='raffle',
+            name='applied_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='응모 수'),
+        ),
+        migrations.AddField(
+            model_name='raffle',
+            name='candidates_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='1차 당첨자 수'),
+        ),
+        migrations.RunPython(fill_raffle_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.6 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0006_raffle_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LottoResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('draw_no', models.PositiveSmallIntegerField(unique=True, verbose_name='회차 번호')),
+                ('draw_date', models.DateField(verbose_name='추첨 날짜')),
+                ('numbers', models.CharField(max_length=30, verbose_name='당첨 번호')),
+                ('bonus_num', models.SmallIntegerField(verbose_name='보너스 당첨 번호')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'loffle_lotto_result',
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+from json import loads
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def split_given_numbers(apps, schema_editor):
+    """
+    JSON 문자열로 저장된 부여 번호(`[1, 2, 3]`)를 (첫 번호, 개수) 로 변환하고 래플을 채움
+    """
+    RaffleCandidate = apps.get_model('loffle', 'RaffleCandidate')
+
+    candidates = []
+    for rc in RaffleCandidate.objects.select_related('raffle_apply').iterator():
+        given_numbers = loads(rc.given_numbers)
+        rc.raffle_id = rc.raffle_apply.raffle_id
+        rc.number_start = min(given_numbers)
+        rc.number_count = len(given_numbers)
+        candidates.append(rc)
+    RaffleCandidate.objects.bulk_update(candidates, fields=['raffle', 'number_start', 'number_count'], batch_size=500)
+
+
+def join_given_numbers(apps, schema_editor):
+    RaffleCandidate = apps.get_model('loffle', 'RaffleCandidate')
+
+    candidates = []
+    for rc in RaffleCandidate.objects.iterator():
+        rc.given_numbers = str(list(range(rc.number_start, rc.number_start + rc.number_count)))
+        candidates.append(rc)
+    RaffleCandidate.objects.bulk_update(candidates, fields=['given_numbers'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0007_lotto_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rafflecandidate',
+            name='raffle',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='candidates', to='loffle.raffle'),
+        ),
+        migrations.AddField(
+            model_name='rafflecandidate',
+            name='number_start',
+            field=models.PositiveSmallIntegerField(null=True, verbose_name='부여받은 첫 번호'),
+        ),
+        migrations.AddField(
+            model_name='rafflecandidate',
+            name='number_count',
+            field=models.PositiveSmallIntegerField(null=True, verbose_name='부여받은 번호 개수'),
+        ),
+        migrations.AlterField(
+            model_name='rafflecandidate',
+            name='given_numbers',
+            field=models.CharField(max_length=100, null=True, verbose_name='부여받은 번호'),
+        ),
+        migrations.RunPython(split_given_numbers, join_given_numbers),
+        migrations.RemoveField(
+            model_name='rafflecandidate',
+            name='given_numbers',
+        ),
+        migrations.AlterField(
+            model_name='rafflecandidate',
+            name='raffle',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='candidates', to='loffle.raffle'),
+        ),
+        migrations.AlterField(
+            model_name='rafflecandidate',
+            name='number_start',
+            field=models.PositiveSmallIntegerField(verbose_name='부여받은 첫 번호'),
+        ),
+        migrations.AlterField(
+            model_name='rafflecandidate',
+            name='number_count',
+            field=models.PositiveSmallIntegerField(verbose_name='부여받은 번호 개수'),
+        ),
+        migrations.AddConstraint(
+            model_name='rafflecandidate',
+            constraint=models.UniqueConstraint(fields=('raffle', 'number_start'), name='unique_raffle_candidate_number_start'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.6 on 2026-10-18 13:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0008_raffle_candidate_number_range'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RaffleCandidateDraw',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seed', models.CharField(max_length=64, verbose_name='seed')),
+                ('num_applicants', models.PositiveIntegerField(verbose_name='추첨 당시 응모자 수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='추첨 일시')),
+                ('raffle', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='candidate_draw', to='loffle.raffle')),
+            ],
+            options={
+                'db_table': 'loffle_raffle_candidate_draw',
+            },
+        ),
+    ]
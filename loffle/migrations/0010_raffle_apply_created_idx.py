@@ -0,0 +1,17 @@
+# Generated by Django 3.2.6 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0009_raffle_candidate_draw'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='raffleapply',
+            index=models.Index(fields=['raffle', 'created_at', 'id'], name='raffle_apply_created_idx'),
+        ),
+    ]
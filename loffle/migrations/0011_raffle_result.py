@@ -0,0 +1,31 @@
+# Generated by Django 3.2.6 on 2026-10-18 13:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0010_raffle_apply_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RaffleResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('candidates', '1차 당첨자'), ('winner', '최종 당첨자')], max_length=10, verbose_name='종류')),
+                ('payload', models.TextField(verbose_name='응답 (JSON)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성 일시')),
+                ('raffle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='loffle.raffle')),
+            ],
+            options={
+                'db_table': 'loffle_raffle_result',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='raffleresult',
+            constraint=models.UniqueConstraint(fields=('raffle', 'kind'), name='unique_raffle_result_kind'),
+        ),
+    ]
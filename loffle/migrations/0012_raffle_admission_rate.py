@@ -0,0 +1,19 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:05
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0011_raffle_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='raffle',
+            name='admission_rate',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(limit_value=1)], verbose_name='초당 입장 인원'),
+        ),
+    ]
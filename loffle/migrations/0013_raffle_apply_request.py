@@ -0,0 +1,45 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('loffle', '0012_raffle_admission_rate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='raffle',
+            name='reserved_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='처리 대기 중인 응모 요청 수'),
+        ),
+        migrations.CreateModel(
+            name='RaffleApplyRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', '처리 대기'), ('applied', '응모 완료'), ('rejected', '응모 실패')], default='pending', max_length=10, verbose_name='처리 상태')),
+                ('message', models.CharField(blank=True, max_length=200, verbose_name='처리 결과')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('raffle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='apply_requests', to='loffle.raffle')),
+                ('raffle_apply', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request', to='loffle.raffleapply')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='raffle_apply_requests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'loffle_raffle_apply_request',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='raffleapplyrequest',
+            index=models.Index(fields=['status', 'id'], name='raffle_apply_request_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='raffleapplyrequest',
+            constraint=models.UniqueConstraint(fields=('raffle', 'user'), name='unique_raffle_apply_request_user'),
+        ),
+    ]
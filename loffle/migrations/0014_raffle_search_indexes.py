@@ -0,0 +1,33 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0013_raffle_apply_request'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_deleted', 'brand'], name='product_brand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='raffle',
+            index=models.Index(fields=['is_deleted', 'progress', 'end_date_time'], name='raffle_progress_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='raffle',
+            index=models.Index(fields=['is_deleted', 'progress', 'start_date_time'], name='raffle_progress_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='raffle',
+            index=models.Index(fields=['is_deleted', 'announce_date_time'], name='raffle_announce_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='raffle',
+            index=models.Index(fields=['product', 'is_deleted'], name='raffle_product_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:13
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_product_facets(apps, schema_editor):
+    """
+    삭제되지 않은 제품의 패싯(브랜드, 사이즈, 색상) 값별 제품 수 채우기
+    """
+    Product = apps.get_model('loffle', 'Product')
+    ProductFacet = apps.get_model('loffle', 'ProductFacet')
+
+    facets = []
+    for facet in ('brand', 'size', 'color'):
+        for value, count in Product.objects.filter(is_deleted=False).order_by() \
+                .values_list(facet).annotate(count=Count('pk')):
+            facets.append(ProductFacet(facet=facet, value=value, count=count))
+    ProductFacet.objects.bulk_create(facets, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0014_raffle_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('brand', '브랜드'), ('size', '사이즈'), ('color', '색상')], max_length=10, verbose_name='패싯')),
+                ('value', models.CharField(max_length=100, verbose_name='값')),
+                ('count', models.IntegerField(default=0, verbose_name='제품 수')),
+            ],
+            options={
+                'db_table': 'loffle_product_facet',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productfacet',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='unique_product_facet_value'),
+        ),
+        migrations.RunPython(count_product_facets, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='product_created_idx'),
+        ),
+    ]
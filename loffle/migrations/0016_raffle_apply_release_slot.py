@@ -0,0 +1,34 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:34
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def release_deleted_apply_slots(apps, schema_editor):
+    """
+    이미 삭제(soft delete)된 응모가 선점하고 있던 슬롯 비우기 (목표 수량 밖의 슬롯은 삭제)
+    """
+    RaffleApply = apps.get_model('loffle', 'RaffleApply')
+    RaffleSlot = apps.get_model('loffle', 'RaffleSlot')
+
+    deleted = RaffleApply.objects.filter(is_deleted=True)
+    slots = RaffleSlot.objects.filter(raffle_apply__in=deleted)
+    slots.filter(number__gt=F('raffle__target_quantity')).delete()
+    slots.update(user=None, raffle_apply=None)
+    deleted.update(ordinal_number=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0015_product_facet'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='raffleapply',
+            name='ordinal_number',
+            field=models.PositiveIntegerField(editable=False, null=True, verbose_name='응모 순번'),
+        ),
+        migrations.RunPython(release_deleted_apply_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:43
+
+from django.db import migrations, models
+from django.db.models import Max, Q, Sum
+
+
+def reverse_deleted_entries(apps, schema_editor):
+    """
+    이미 삭제(soft delete)된 구매/응모의 원장 내역을 음수 내역으로 되돌리고 잔액 다시 계산
+    """
+    TicketLedger = apps.get_model('loffle', 'TicketLedger')
+    TicketBalance = apps.get_model('loffle', 'TicketBalance')
+
+    totals = TicketLedger.objects \
+        .filter(Q(ticket_buy__is_deleted=True) | Q(raffle_apply__is_deleted=True)) \
+        .values('user_id', 'kind', 'ticket_buy_id', 'raffle_apply_id') \
+        .annotate(total=Sum('quantity'), seq=Max('seq')).order_by()
+    entries = [
+        TicketLedger(user_id=row['user_id'], kind=row['kind'], quantity=-row['total'], seq=row['seq'] + 1,
+                     ticket_buy_id=row['ticket_buy_id'], raffle_apply_id=row['raffle_apply_id'])
+        for row in totals if row['total'] > 0
+    ]
+    TicketLedger.objects.bulk_create(entries, batch_size=500)
+
+    fields = {'buy': 'num_buy_tickets', 'use': 'num_use_tickets', 'refund': 'num_return_tickets'}
+    user_ids = {entry.user_id for entry in entries}
+    balances = []
+    for row in TicketLedger.objects.filter(user_id__in=user_ids).values('user_id').annotate(**{
+        field: Sum('quantity', filter=Q(kind=kind)) for kind, field in fields.items()
+    }).order_by():
+        balances.append(TicketBalance(user_id=row['user_id'], **{field: row[field] or 0 for field in fields.values()}))
+    TicketBalance.objects.bulk_update(balances, fields=list(fields.values()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loffle', '0016_raffle_apply_release_slot'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='ticketledger',
+            name='unique_ticket_ledger_ticket_buy',
+        ),
+        migrations.RemoveConstraint(
+            model_name='ticketledger',
+            name='unique_ticket_ledger_raffle_apply',
+        ),
+        migrations.AddField(
+            model_name='ticketledger',
+            name='seq',
+            field=models.PositiveIntegerField(default=0, verbose_name='순번'),
+        ),
+        migrations.AlterField(
+            model_name='ticketledger',
+            name='quantity',
+            field=models.IntegerField(verbose_name='수량'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketledger',
+            constraint=models.UniqueConstraint(fields=('ticket_buy', 'kind', 'seq'), name='unique_ticket_ledger_ticket_buy'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketledger',
+            constraint=models.UniqueConstraint(fields=('raffle_apply', 'kind', 'seq'), name='unique_ticket_ledger_raffle_apply'),
+        ),
+        migrations.RunPython(reverse_deleted_entries, migrations.RunPython.noop),
+    ]
@@ -1,16 +1,21 @@
-from collections import defaultdict
+from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
 from json import dumps, loads
-from random import sample
 
-import requests
-from django.db.models import Exists
+from django.db.models import F, Sum, Q, Max, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from pytz import timezone as pytz_tz
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction, IntegrityError, connection, DatabaseError
+from django.utils import timezone
 
+from _common.cache import bump_response_cache
 from account.models import User
+from loffle.lotto import get_lotto_fetcher, LottoFetchError
+from loffle.sampling import new_seed, reservoir_sample
 
 KST = pytz_tz('Asia/Seoul')
 
@@ -22,7 +27,8 @@ class CommonManager(models.Manager):
         self.is_deleted = is_deleted
 
     def get_queryset(self):
-        return super().get_queryset().select_related('user').filter(is_deleted=self.is_deleted)
+        # `is_deleted=False` 는 `NOT is_deleted` 로 변환되어 (is_deleted, ...) 인덱스를 쓰지 못하므로 IN 으로 비교
+        return super().get_queryset().select_related('user').filter(is_deleted__in=[self.is_deleted])
 
 
 class Ticket(models.Model):
@@ -56,6 +62,278 @@ class TicketBuy(models.Model):
     class Meta:
         db_table = '_'.join((__package__, 'ticket_buy'))
 
+    __original_is_deleted = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__original_is_deleted = self.__dict__.get('is_deleted')
+
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        is_deleted_changed = not is_new and self.is_deleted != self.__original_is_deleted
+
+        # 구매 기록과 티켓 원장/잔액은 같은 트랜잭션에서 저장
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if is_new:
+                TicketLedger.record(
+                    user_id=self.user_id,
+                    kind=TicketLedger.KIND_CHOICES[0][0],  # 'buy'
+                    quantity=self.ticket.quantity,
+                    ticket_buy=self,
+                )
+            # 삭제(soft delete)한 구매는 잔액에서 빼고, 복구하면 다시 더함
+            elif is_deleted_changed and self.is_deleted:
+                TicketLedger.reverse(ticket_buy=self)
+            elif is_deleted_changed:
+                TicketLedger.record(
+                    user_id=self.user_id,
+                    kind=TicketLedger.KIND_CHOICES[0][0],  # 'buy'
+                    quantity=self.ticket.quantity,
+                    ticket_buy=self,
+                    seq=TicketLedger.next_seq(TicketLedger.KIND_CHOICES[0][0], ticket_buy=self),
+                )
+        self.__original_is_deleted = self.__dict__.get('is_deleted')
+
+
+class TicketLedger(models.Model):
+    """
+    티켓 원장 (append-only)
+    - 구매(buy), 사용(use), 환불(refund) 내역을 한 행씩 기록
+    - 구매/응모를 삭제(soft delete)하면 같은 종류의 음수 내역으로 되돌리고, 복구하면 다시 기록 (`seq`로 구분)
+    - 잔액(`TicketBalance`)은 이 원장으로부터 언제든 다시 계산 가능
+    """
+    KIND_CHOICES = (
+        ('buy', '구매'),
+        ('use', '사용'),
+        ('refund', '환불'),
+    )
+    kind = models.CharField(
+        verbose_name='종류',
+        max_length=10,
+        choices=KIND_CHOICES,
+    )
+    # 되돌리는 내역은 음수
+    quantity = models.IntegerField(
+        verbose_name='수량',
+    )
+    # 같은 구매/응모에 대한 같은 종류의 내역 순번 (처음 기록은 0, 삭제/복구할 때마다 1씩 증가)
+    seq = models.PositiveIntegerField(
+        verbose_name='순번',
+        default=0,
+    )
+    user = models.ForeignKey(
+        User,
+        related_name='ticket_ledger',
+        on_delete=models.CASCADE,
+    )
+    ticket_buy = models.ForeignKey(
+        TicketBuy,
+        related_name='ticket_ledger',
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+    )
+    raffle_apply = models.ForeignKey(
+        'RaffleApply',
+        related_name='ticket_ledger',
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = '_'.join((__package__, 'ticket_ledger'))
+        constraints = [
+            # 하나의 구매/응모에 대해 같은 종류, 같은 순번의 내역은 한 번만 기록 (동시에 두 번 기록되지 않도록)
+            models.UniqueConstraint(fields=['ticket_buy', 'kind', 'seq'], name='unique_ticket_ledger_ticket_buy'),
+            models.UniqueConstraint(fields=['raffle_apply', 'kind', 'seq'], name='unique_ticket_ledger_raffle_apply'),
+        ]
+
+    # 종류별로 갱신되는 잔액 필드
+    BALANCE_FIELDS = {
+        KIND_CHOICES[0][0]: 'num_buy_tickets',
+        KIND_CHOICES[1][0]: 'num_use_tickets',
+        KIND_CHOICES[2][0]: 'num_return_tickets',
+    }
+
+    @classmethod
+    def record(cls, user_id, kind, quantity, **refs):
+        """
+        원장에 내역을 추가하고 같은 트랜잭션에서 사용자의 잔액을 갱신
+        """
+        with transaction.atomic():
+            entry = cls.objects.create(user_id=user_id, kind=kind, quantity=quantity, **refs)
+            TicketBalance.ensure([user_id])
+            field = cls.BALANCE_FIELDS[kind]
+            TicketBalance.objects.filter(user_id=user_id).update(**{field: F(field) + quantity})
+        return entry
+
+    @classmethod
+    def next_seq(cls, kind, **ref):
+        return cls.objects.filter(kind=kind, **ref).aggregate(seq=Coalesce(Max('seq') + 1, 0))['seq']
+
+    @classmethod
+    def reverse(cls, **ref):
+        """
+        구매/응모(`ref`)에 대해 기록된 내역을 종류별로 합계만큼 음수 내역으로 되돌림 (구매/응모 삭제 시)
+        - 예: 실패한 래플의 응모를 삭제하면 사용(use) -1, 환불(refund) -1
+        """
+        with transaction.atomic():
+            totals = cls.objects.filter(**ref).values('user_id', 'kind') \
+                .annotate(total=Sum('quantity'), seq=Max('seq')).order_by()
+            for row in totals:
+                if row['total'] > 0:
+                    cls.record(row['user_id'], row['kind'], -row['total'], seq=row['seq'] + 1, **ref)
+
+    @classmethod
+    def debit(cls, raffle_apply, seq=0):
+        """
+        응모에 티켓 1장 사용 (`seq`: 삭제한 응모를 복구할 때 다음 순번)
+        - 잔액이 남아 있을 때만 차감하는 조건부 UPDATE로 동시 응모에도 잔액이 음수가 되지 않음
+        """
+        with transaction.atomic():
+            updated = TicketBalance.objects \
+                .filter(user_id=raffle_apply.user_id,
+                        num_use_tickets__lt=F('num_buy_tickets') + F('num_return_tickets')) \
+                .update(num_use_tickets=F('num_use_tickets') + 1)
+            if not updated:
+                raise ValidationError({'user': [f'사용자 <{raffle_apply.user.username}>는 소유한 티켓이 없습니다.']})
+
+            return cls.objects.create(
+                user_id=raffle_apply.user_id,
+                kind=cls.KIND_CHOICES[1][0],  # 'use'
+                quantity=1,
+                raffle_apply=raffle_apply,
+                seq=seq,
+            )
+
+    @classmethod
+    def refund_raffles(cls, raffle_ids):
+        """
+        래플들의 응모 티켓 환불
+        - 아직 환불되지 않은 응모 내역만 대상으로 하므로 여러 번 호출해도 안전
+        """
+        refund = cls.KIND_CHOICES[2][0]  # 'refund'
+        with transaction.atomic():
+            applies = list(
+                RaffleApply.objects
+                .filter(raffle_id__in=raffle_ids)
+                .exclude(ticket_ledger__kind=refund)
+                .values_list('id', 'user_id')
+            )
+            if not applies:
+                return 0
+
+            cls.objects.bulk_create([
+                cls(user_id=user_id, kind=refund, quantity=1, raffle_apply_id=raffle_apply_id)
+                for raffle_apply_id, user_id in applies
+            ], batch_size=500)
+
+            # 응모 1건당 1장씩 환불
+            TicketBalance.ensure([user_id for _, user_id in applies])
+            cls.add_to_balances(refund, [user_id for _, user_id in applies])
+        return len(applies)
+
+    @classmethod
+    def debit_many(cls, applies):
+        """
+        여러 응모의 티켓을 한 번에 1장씩 차감 (`applies`: [(raffle_apply_id, user_id), ...])
+        - 잔액은 호출하는 쪽에서 잠그고(select_for_update) 확인해야 함
+        """
+        use = cls.KIND_CHOICES[1][0]
+        with transaction.atomic():
+            cls.objects.bulk_create([
+                cls(user_id=user_id, kind=use, quantity=1, raffle_apply_id=raffle_apply_id)
+                for raffle_apply_id, user_id in applies
+            ], batch_size=500)
+            cls.add_to_balances(use, [user_id for _, user_id in applies])
+
+    @classmethod
+    def add_to_balances(cls, kind, user_ids):
+        """
+        내역 1건당 1장씩 잔액 갱신 - 수량이 같은 사용자끼리 묶어서 UPDATE
+        """
+        field = cls.BALANCE_FIELDS[kind]
+        users_by_quantity = defaultdict(list)
+        for user_id, quantity in Counter(user_ids).items():
+            users_by_quantity[quantity].append(user_id)
+
+        for quantity, user_ids in users_by_quantity.items():
+            TicketBalance.objects.filter(user_id__in=user_ids).update(**{field: F(field) + quantity})
+
+
+class TicketBalance(models.Model):
+    """
+    사용자별 티켓 잔액 (`TicketLedger`의 materialized 합계)
+    """
+    user = models.OneToOneField(
+        User,
+        related_name='ticket_balance',
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    num_buy_tickets = models.PositiveIntegerField(
+        verbose_name='구매한 티켓 수량',
+        default=0,
+    )
+    num_use_tickets = models.PositiveIntegerField(
+        verbose_name='사용한 티켓 수량',
+        default=0,
+    )
+    num_return_tickets = models.PositiveIntegerField(
+        verbose_name='돌려받은 티켓 수량',
+        default=0,
+    )
+
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = '_'.join((__package__, 'ticket_balance'))
+
+    @property
+    def num_tickets(self):
+        return self.num_buy_tickets - self.num_use_tickets + self.num_return_tickets
+
+    @classmethod
+    def ensure(cls, user_ids):
+        """
+        잔액 행이 없는 사용자의 행 생성
+        """
+        cls.objects.bulk_create([cls(user_id=user_id) for user_id in set(user_ids)], ignore_conflicts=True)
+
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        """
+        원장으로부터 잔액 다시 계산하기
+        """
+        ledger = TicketLedger.objects.all()
+        balances = cls.objects.all()
+        if user_ids is not None:
+            ledger = ledger.filter(user_id__in=user_ids)
+            balances = balances.filter(user_id__in=user_ids)
+
+        aggregates = {
+            field: Sum('quantity', filter=Q(kind=kind))
+            for kind, field in TicketLedger.BALANCE_FIELDS.items()
+        }
+
+        with transaction.atomic():
+            totals = {
+                row['user_id']: row
+                for row in ledger.values('user_id').annotate(**aggregates).order_by()
+            }
+            cls.ensure(totals.keys())
+            rebuilt = []
+            for balance in balances.select_for_update():
+                row = totals.get(balance.user_id, {})
+                for field in TicketLedger.BALANCE_FIELDS.values():
+                    setattr(balance, field, row.get(field) or 0)
+                rebuilt.append(balance)
+            cls.objects.bulk_update(rebuilt, fields=list(TicketLedger.BALANCE_FIELDS.values()), batch_size=500)
+        return len(rebuilt)
+
 
 class Product(models.Model):
     name = models.CharField(
@@ -92,9 +370,123 @@ class Product(models.Model):
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
 
+    class Meta:
+        indexes = [
+            # 브랜드별 래플 검색 (is_deleted = false AND brand = ?)
+            models.Index(fields=['is_deleted', 'brand'], name='product_brand_idx'),
+            # 제품 목록 키셋 페이지네이션 (is_deleted = false ORDER BY created_at DESC, id DESC)
+            models.Index(fields=['is_deleted', 'created_at', 'id'], name='product_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} | {self.brand} | {self.color} | {self.size}"
 
+    __original_facets = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__original_facets = self.get_facets()
+
+    def get_facets(self):
+        """
+        패싯 카운트(`ProductFacet`)에 들어가는 값 [(facet, value), ...] (삭제된 제품은 빈 목록)
+        """
+        # 지연 로딩(deferred) 필드에 접근하면 다시 조회하므로 __dict__ 에서 읽음
+        if self.__dict__.get('is_deleted') is not False:
+            return []
+        return [(facet, self.__dict__.get(facet)) for facet in ProductFacet.FACETS]
+
+    def save(self, *args, **kwargs):
+        # 제품 저장과 패싯 카운트 갱신을 한 트랜잭션에서 처리 (삭제(soft delete)/복구 포함)
+        original_facets = [] if self._state.adding else self.__original_facets
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            facets = self.get_facets()
+            if facets != original_facets:
+                ProductFacet.add(facets, 1)
+                ProductFacet.add(original_facets, -1)
+        self.__original_facets = facets
+
+
+class ProductFacet(models.Model):
+    """
+    제품 패싯(브랜드, 사이즈, 색상) 값별 제품 수 (삭제되지 않은 제품만)
+    - `Product.save()`에서 같은 트랜잭션으로 갱신하므로, 패싯 목록은 GROUP BY 없이 이 테이블만 조회
+    - `QuerySet.update()`/`delete()`처럼 save() 를 거치지 않은 변경은 `rebuild()`로 다시 계산
+    """
+    FACETS = ('brand', 'size', 'color')
+    FACET_CHOICES = [
+        ('brand', '브랜드'),
+        ('size', '사이즈'),
+        ('color', '색상'),
+    ]
+
+    facet = models.CharField(
+        verbose_name='패싯',
+        max_length=10,
+        choices=FACET_CHOICES,
+    )
+    value = models.CharField(
+        verbose_name='값',
+        max_length=100,
+    )
+    count = models.IntegerField(
+        verbose_name='제품 수',
+        default=0,
+    )
+
+    class Meta:
+        db_table = '_'.join((__package__, 'product_facet'))
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='unique_product_facet_value'),
+        ]
+
+    def __str__(self):
+        return f'ProductFacet | {self.facet} | {self.value} | {self.count}'
+
+    @classmethod
+    def add(cls, facets, delta):
+        """
+        패싯 값들의 제품 수에 `delta` 더하기 (`facets`: [(facet, value), ...])
+        """
+        if not facets:
+            return
+        if delta > 0:
+            cls.objects.bulk_create([cls(facet=facet, value=value) for facet, value in facets], ignore_conflicts=True)
+        condition = Q()
+        for facet, value in facets:
+            condition |= Q(facet=facet, value=value)
+        cls.objects.filter(condition).update(count=F('count') + delta)
+
+    @classmethod
+    def get_counts(cls):
+        """
+        패싯별 값과 제품 수 {facet: [{'value': ..., 'count': ...}, ...]} (제품 수가 많은 순)
+        """
+        counts = {facet: [] for facet in cls.FACETS}
+        for facet, value, count in cls.objects.filter(count__gt=0).order_by('facet', '-count', 'value') \
+                .values_list('facet', 'value', 'count'):
+            counts[facet].append({'value': value, 'count': count})
+        return counts
+
+    @classmethod
+    def rebuild(cls):
+        """
+        제품으로부터 패싯 카운트 다시 계산하기
+        """
+        with transaction.atomic():
+            totals = Counter()
+            for facet in cls.FACETS:
+                for value, count in Product.objects.order_by().values_list(facet).annotate(count=Count('pk')):
+                    totals[(facet, value)] = count
+
+            cls.objects.bulk_create([cls(facet=facet, value=value) for facet, value in totals], ignore_conflicts=True)
+            facets = list(cls.objects.select_for_update())
+            for facet in facets:
+                facet.count = totals.get((facet.facet, facet.value), 0)
+            cls.objects.bulk_update(facets, fields=['count'], batch_size=500)
+        return len(totals)
+
 
 class Raffle(models.Model):
     start_date_time = models.DateTimeField(
@@ -111,6 +503,12 @@ class Raffle(models.Model):
         verbose_name='목표 티켓 수량',
         validators=[MinValueValidator(limit_value=3)]
     )
+    # 응모가 몰리는 래플은 대기열(`loffle.waiting_room`)을 거쳐 초당 입장 인원만큼만 응모 가능 (비어 있으면 대기열 없음)
+    admission_rate = models.PositiveIntegerField(
+        verbose_name='초당 입장 인원',
+        null=True, blank=True,
+        validators=[MinValueValidator(limit_value=1)],
+    )
 
     # lottery = models.ForeignKey(Lottery, related_name='raffles', on_delete=models.SET_NULL, null=True, default=None)
     user = models.ForeignKey(
@@ -149,6 +547,25 @@ class Raffle(models.Model):
         PROGRESS_CHOICES[3][0]: 4,
     }  # python 3.7+ dict 삽입 순서 유지
 
+    # 응모/1차 추첨 때 F() 로 함께 갱신되는 집계 값
+    COUNTER_FIELDS = ('applied_count', 'candidates_count', 'reserved_count')
+    applied_count = models.PositiveIntegerField(
+        verbose_name='응모 수',
+        default=0,
+        editable=False,
+    )
+    candidates_count = models.PositiveIntegerField(
+        verbose_name='1차 당첨자 수',
+        default=0,
+        editable=False,
+    )
+    # write-behind 모드에서 접수했지만 아직 처리하지 않은 응모 요청 수 (응모 수와 합쳐서 목표 수량을 넘지 않도록 예약)
+    reserved_count = models.PositiveIntegerField(
+        verbose_name='처리 대기 중인 응모 요청 수',
+        default=0,
+        editable=False,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False, editable=False)
@@ -156,19 +573,51 @@ class Raffle(models.Model):
     objects = CommonManager()
     deleted_objects = CommonManager(is_deleted=True)
 
-    @property
-    def applied_count(self):
-        return self.applied.count()
-
-    @property
-    def candidates_count(self):
-        return self.applied.exclude(raffle_candidate=None).count()
+    class Meta:
+        indexes = [
+            # 래플 검색 (`loffle.filters.RaffleFilter`): is_deleted = false AND progress IN (...) AND 일시 범위
+            models.Index(fields=['is_deleted', 'progress', 'end_date_time'], name='raffle_progress_end_idx'),
+            models.Index(fields=['is_deleted', 'progress', 'start_date_time'], name='raffle_progress_start_idx'),
+            models.Index(fields=['is_deleted', 'announce_date_time'], name='raffle_announce_idx'),
+            # 제품(브랜드)별 래플 검색
+            models.Index(fields=['product', 'is_deleted'], name='raffle_product_idx'),
+        ]
+
+    @classmethod
+    def repair_counters(cls, raffle_ids=None):
+        """
+        응모 수(`applied_count`), 1차 당첨자 수(`candidates_count`), 처리 대기 중인 응모 요청 수(`reserved_count`)를
+        실제 행으로부터 한 번의 UPDATE로 다시 계산
+        """
+        applied = RaffleApply.objects.filter(raffle_id=OuterRef('pk')) \
+            .order_by().values('raffle_id').annotate(count=Count('id')).values('count')
+        candidates = RaffleCandidate.objects.filter(raffle_apply__raffle_id=OuterRef('pk'), raffle_apply__is_deleted=False) \
+            .order_by().values('raffle_apply__raffle_id').annotate(count=Count('id')).values('count')
+        reserved = RaffleApplyRequest.objects \
+            .filter(raffle_id=OuterRef('pk'), status=RaffleApplyRequest.STATUS_CHOICES[0][0]) \
+            .order_by().values('raffle_id').annotate(count=Count('id')).values('count')
+
+        qs = cls._base_manager.all()
+        if raffle_ids is not None:
+            qs = qs.filter(pk__in=raffle_ids)
+        updated = qs.update(
+            applied_count=Coalesce(Subquery(applied), 0),
+            candidates_count=Coalesce(Subquery(candidates), 0),
+            reserved_count=Coalesce(Subquery(reserved), 0),
+        )
+        bump_response_cache('raffle')
+        return updated
 
     __original_end_date_time = None
+    __original_progress = None
+    __original_target_quantity = None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.__original_end_date_time = self.end_date_time
+        # 지연 로딩(deferred) 필드에 접근하면 다시 조회하므로 __dict__ 에서 읽음
+        self.__original_end_date_time = self.__dict__.get('end_date_time')
+        self.__original_progress = self.__dict__.get('progress')
+        self.__original_target_quantity = self.__dict__.get('target_quantity')
 
     def save(self, *args, **kwargs):
         # 발표일시
@@ -180,9 +629,163 @@ class Raffle(models.Model):
         if not self.progress:
             self.progress = self.calc_progress()
 
-        super().save(*args, **kwargs)
+        is_new = self._state.adding
+
+        # 응모 수 등 F() 로 갱신되는 집계 값은 저장할 때 덮어쓰지 않음
+        if not is_new and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in Raffle.COUNTER_FIELDS
+            ]
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            # 목표 수량만큼 응모 순번 슬롯 만들기
+            if is_new or self.target_quantity != self.__original_target_quantity:
+                self.sync_slots()
+
+            # 응모 실패로 바뀐 경우 응모에 사용된 티켓 환불
+            if self.progress == Raffle.PROGRESS_CHOICES[3][0] and self.__original_progress != self.progress:
+                TicketLedger.refund_raffles([self.pk])
 
         __original_end_date_time = self.end_date_time
+        self.__original_progress = self.progress
+        self.__original_target_quantity = self.target_quantity
+
+    @classmethod
+    def advance_progress(cls, now=None):
+        """
+        시간이 지나면서 바뀌는 진행 상황을 bulk UPDATE 로 반영
+        - waiting -> ongoing: 시작 일시가 지난 경우
+        - ongoing -> done: 목표 수량을 채웠는데 아직 종료되지 않은 경우 (`close()`)
+        - waiting, ongoing -> failed: 목표 수량을 채우지 못하고 종료 일시가 지난 경우 (응모 티켓 환불)
+        """
+        now = now or timezone.now()
+        waiting, ongoing, failed = (Raffle.PROGRESS_CHOICES[i][0] for i in (0, 1, 3))
+
+        with transaction.atomic():
+            # 목표 수량을 채웠는데 종료(done)로 바뀌지 않은 래플(응모 직후의 종료 처리가 실패한 경우)은 실패로 바꾸기 전에 종료
+            closed = sum(raffle.close() for raffle in
+                         cls.objects.select_related(None).filter(progress=ongoing,
+                                                                 applied_count__gte=F('target_quantity')))
+
+            failed_ids = list(
+                cls._base_manager.select_for_update()
+                .filter(progress__in=(waiting, ongoing), end_date_time__lt=now)
+                .values_list('id', flat=True)
+            )
+            if failed_ids:
+                cls._base_manager.filter(pk__in=failed_ids).update(progress=failed, modified_at=now)
+                TicketLedger.refund_raffles(failed_ids)
+
+            started = cls._base_manager \
+                .filter(progress=waiting, start_date_time__lte=now) \
+                .update(progress=ongoing, modified_at=now)
+
+            if started or failed_ids:
+                bump_response_cache('raffle')
+
+        return {'started': started, 'closed': closed, 'failed': len(failed_ids)}
+
+    def sync_slots(self):
+        """
+        응모 순번 슬롯(`RaffleSlot`)을 목표 수량에 맞추기
+        - 부족한 슬롯은 만들고, 목표 수량을 넘는 빈 슬롯은 삭제
+        """
+        last = self.slots.aggregate(last=Coalesce(Max('number'), 0))['last']
+        if last < self.target_quantity:
+            RaffleSlot.objects.bulk_create(
+                [RaffleSlot(raffle=self, number=number) for number in range(last + 1, self.target_quantity + 1)],
+                batch_size=1000,
+            )
+        elif last > self.target_quantity:
+            self.slots.filter(number__gt=self.target_quantity, user=None).delete()
+
+    def apply(self, user):
+        """
+        래플 응모
+        - 빈 슬롯 선점, 응모 기록, 티켓 차감은 `RaffleApply.save()`의 한 트랜잭션 안에서 처리
+        - 응모할 수 없는 경우 ValidationError 발생
+        """
+        ra = RaffleApply(raffle=self, user=user)
+        try:
+            ra.save()
+        except IntegrityError:
+            # (raffle, user) unique 제약 위반 (슬롯 또는 응모 기록)
+            raise ValidationError({'user': [f'사용자 <{user.username}>는 이미 응모한 래플입니다.']})
+
+        self.progress = ra.raffle.progress
+        self.announce_date_time = ra.raffle.announce_date_time
+        return ra
+
+    def enqueue_apply(self, user):
+        """
+        래플 응모 접수 (write-behind 모드)
+        - 정원(응모 수 + 처리 대기 중인 요청 수 < 목표 수량)을 조건부 UPDATE 한 번으로 예약하고 응모 요청을 저장
+        - 슬롯 선점, 응모 기록, 티켓 차감은 `RaffleApplyRequest.flush()`가 모아서 처리
+        - 처리되지 못한(rejected) 요청이 있으면 그 요청을 처리 대기로 되돌려서 다시 접수
+        - 접수할 수 없는 경우 ValidationError 발생
+        """
+        pending, _, rejected = (status for status, _ in RaffleApplyRequest.STATUS_CHOICES)
+
+        if RaffleApply._base_manager.filter(raffle=self, user=user).exists() \
+                or RaffleApplyRequest.objects.filter(raffle=self, user=user).exclude(status=rejected).exists():
+            raise ValidationError({'user': [f'사용자 <{user.username}>는 이미 응모한 래플입니다.']})
+        if user.num_tickets <= 0:
+            raise ValidationError({'user': [f'사용자 <{user.username}>는 소유한 티켓이 없습니다.']})
+
+        with transaction.atomic():
+            reserved = Raffle.objects.select_related(None) \
+                .alias(occupied=F('applied_count') + F('reserved_count')) \
+                .filter(pk=self.pk, progress=Raffle.PROGRESS_CHOICES[1][0], occupied__lt=F('target_quantity')) \
+                .update(reserved_count=F('reserved_count') + 1)
+            if not reserved:
+                self.refresh_from_db(fields=['progress'])
+                if self.progress != Raffle.PROGRESS_CHOICES[1][0]:
+                    raise ValidationError({'raffle': [
+                        f'진행 상황이 <{self.get_progress_display()}>인 래플은 응모할 수 없습니다.']})
+                raise ValidationError({'raffle': [f"응모 가능한 수량<{self.target_quantity}>을 초과하였습니다."]})
+
+            # (raffle, user) 당 요청은 한 행이므로 처리되지 못한 요청은 다시 사용 (조건부 UPDATE 라 동시 접수 중 하나만 성공)
+            reset = RaffleApplyRequest.objects.filter(raffle=self, user=user, status=rejected).update(
+                status=pending, raffle_apply=None, message='', created_at=timezone.now(), processed_at=None)
+            if reset:
+                return RaffleApplyRequest.objects.get(raffle=self, user=user)
+
+            try:
+                # (raffle, user) unique 제약 위반이면 예약도 함께 롤백
+                return RaffleApplyRequest.objects.create(raffle=self, user=user)
+            except IntegrityError:
+                raise ValidationError({'user': [f'사용자 <{user.username}>는 이미 응모한 래플입니다.']})
+
+    def close(self):
+        """
+        빈 슬롯이 없는(목표 수량을 채운) 진행중인 래플을 종료(done)로 변경하고 발표일시 업데이트
+        - 여러 응모가 동시에 호출해도 한 번만 변경되며, 변경한 경우에만 True 반환
+        """
+        if self.slots.filter(user=None).exists():
+            return False
+
+        progress = Raffle.PROGRESS_CHOICES[2][0]  # done
+        announce_date_time = self.calc_announce_date_time(done_date_time=datetime.now())
+        updated = Raffle.objects.filter(pk=self.pk, progress=Raffle.PROGRESS_CHOICES[1][0]) \
+            .update(progress=progress, announce_date_time=announce_date_time, modified_at=timezone.now())
+        if updated:
+            self.progress = progress
+            self.announce_date_time = announce_date_time
+            bump_response_cache('raffle', self.pk)
+        return bool(updated)
+
+    def try_close(self):
+        """
+        응모를 커밋한 뒤에 호출하는 `close()`
+        - 응모는 이미 반영되었으므로 DB 오류로 실패해도 예외를 넘기지 않음 (다음 응모나 `advance_progress()`가 종료 처리)
+        """
+        try:
+            return self.close()
+        except DatabaseError:
+            return False
 
     def calc_announce_date_time(self, done_date_time=None):
         end_dt_utc = self.end_date_time  # datetime(tzinfo=<UTC>)
@@ -236,39 +839,102 @@ class Raffle(models.Model):
             return Raffle.PROGRESS_CHOICES[3][0]  # 'failed'
 
     CANDIDATES_N = (45, 15, 9, 5, 3)  # 45의 약수(divisor)
+    CANDIDATES_CHUNK_SIZE = 2000
 
-    def create_candidates(self):
+    def get_num_candidates(self):
+        # 45의 약수 중 목표 수량(target_quantity)에서 제일 가까운 수를 [n: 후보자의 수]로 설정
+        for num_candidates in Raffle.CANDIDATES_N:
+            if self.target_quantity >= num_candidates:
+                return num_candidates
+        return num_candidates
+
+    def sample_candidates(self, seed, num_candidates=None):
+        """
+        응모 기록(`RaffleApply`) id 를 응모 순번 순서로 나눠 읽으면서 후보자를 뽑기 (reservoir sampling)
+        - 응모자 수와 상관없이 메모리는 후보자 수만큼만 사용
+        - 같은 seed 로 다시 호출하면 같은 후보자가 같은 순서로 나옴
+        """
+        return reservoir_sample(self.iterate_apply_ids(), num_candidates or self.get_num_candidates(), seed)
+
+    def iterate_apply_ids(self):
+        """
+        응모 순번 순서로 `CANDIDATES_CHUNK_SIZE` 개씩 응모 기록 id 를 읽기
+        - MySQL 에서는 `.iterator()`도 결과 전체를 한 번에 가져오므로, 응모 순번 기준 keyset 조건으로 나눠서 조회
+        """
+        last = 0
+        while True:
+            chunk = list(self.applied.filter(ordinal_number__gt=last).order_by('ordinal_number')
+                         .values_list('ordinal_number', 'id')[:Raffle.CANDIDATES_CHUNK_SIZE])
+            for last, raffle_apply_id in chunk:
+                yield raffle_apply_id
+            if len(chunk) < Raffle.CANDIDATES_CHUNK_SIZE:
+                return
+
+    def create_candidates(self, seed=None):
+        """
+        1차 추첨: 응모자 중 후보자를 뽑고 번호 부여
+        - 응모 요청과 분리된 단계(`create_pending_candidates`, `create_raffle_candidates` 명령)에서 실행
+        - 사용한 seed 는 `RaffleCandidateDraw`에 기록되어 `verify_candidates()`로 재현 가능
+        """
         # 래플 상태가 done(완료) 인지 확인
         if self.progress != Raffle.PROGRESS_CHOICES[2][0]:
             return False
 
         # 래플의 후보자가 존재하면 이미 추첨이 진행되었다고 판단
         if self.candidates_count > 0:
-            print('이미 진행된 추첨이 존재합니다.')
             return False
 
-        # 45의 약수 중 목표 수량(target_quantity)에서 제일 가까운 수를 [n: 후보자의 수]로 설정
-        for num_candidates in Raffle.CANDIDATES_N:
-            if self.target_quantity >= num_candidates:
-                break
-
-        # 응모자를 후보자의 수로 추려내기
-        raffle_apply_id_list = list(self.applied.values_list('id', flat=True))
-        candidates_id_list = sample(raffle_apply_id_list, num_candidates)
+        seed = seed or new_seed()
+        num_candidates = self.get_num_candidates()
+        candidates_id_list = self.sample_candidates(seed, num_candidates)
+        if candidates_id_list is None:
+            return False
 
+        # i 번째 후보자는 i * n + 1 ~ (i + 1) * n 번을 부여받음 (n = 45 // 후보자 수)
         candidates_list = []
         num_given_numbers = 45 // num_candidates
         for i, raffle_apply_id in enumerate(candidates_id_list):
-            given_numbers = [j + i * num_given_numbers for j in range(1, num_given_numbers + 1)]
-            candidates_list.append(
-                RaffleCandidate(raffle_apply_id=raffle_apply_id, given_numbers=dumps(given_numbers)))
+            candidates_list.append(RaffleCandidate(
+                raffle=self,
+                raffle_apply_id=raffle_apply_id,
+                number_start=i * num_given_numbers + 1,
+                number_count=num_given_numbers,
+            ))
+
+        try:
+            with transaction.atomic():
+                # raffle 은 unique 이므로 동시에 실행되어도 한 번만 기록됨
+                RaffleCandidateDraw.objects.create(raffle=self, seed=seed, num_applicants=self.applied_count)
+                RaffleCandidate.objects.bulk_create(candidates_list)
+                Raffle.objects.filter(pk=self.pk).update(candidates_count=F('candidates_count') + len(candidates_list))
+        except IntegrityError:
+            return False
+        self.candidates_count += len(candidates_list)
 
-        RaffleCandidate.objects.bulk_create(candidates_list)
+        RaffleResult.capture([self.pk], RaffleResult.KIND_CHOICES[0][0])
         return True
 
+    def verify_candidates(self):
+        """
+        기록된 seed 로 1차 추첨을 다시 실행하여 저장된 후보자와 같은지 확인
+        """
+        draw = RaffleCandidateDraw.objects.get(raffle=self)
+        candidates_id_list = list(
+            self.candidates.order_by('number_start').values_list('raffle_apply_id', flat=True))
+        return self.sample_candidates(draw.seed, len(candidates_id_list)) == candidates_id_list
+
+    @classmethod
+    def create_pending_candidates(cls):
+        """
+        목표 수량을 채워 종료(done)되었지만 아직 1차 추첨을 하지 않은 래플들의 후보자 뽑기
+        """
+        raffles = cls.objects.select_related(None).filter(
+            progress=Raffle.PROGRESS_CHOICES[2][0], candidates_count=0, candidate_draw__isnull=True)
+        return sum(raffle.create_candidates() for raffle in raffles)
+
     def draw_winner(self):
         """
-        (임시) 래플 당첨자 추첨하기
+        래플 당첨자 추첨하기
         """
         now_utc = datetime.now()
         now_kst = now_utc.astimezone(KST)
@@ -278,17 +944,43 @@ class Raffle(models.Model):
         if self.progress != self.PROGRESS_CHOICES[2][0]:
             raise Exception("종료된 상태의 래플만 가능합니다.")
 
-        qs = Lotto.objects.filter(draw_date=self.announce_date_time.date())
-        if not Exists(qs):
+        draw_date = self.announce_date_time.astimezone(KST).date()
+        lotto = Lotto.objects.filter(draw_date=draw_date).first()
+        if lotto is None:
             raise Exception("로또 번호가 존재하지 않습니다.")
 
-        bonus_num = qs.first().bonus_num
-        ra_candidates = self.applied.exclude(raffle_candidate=None)  # RaffleApply
-        for ra in ra_candidates:
-            if bonus_num in loads(ra.raffle_candidate.given_numbers):
-                rc_winner = ra.raffle_candidate
-        rw = RaffleWinner(raffle_candidate=rc_winner)
-        rw.save()
+        return Raffle.draw_winners(draw_date, lotto.bonus_num, raffle_ids=[self.pk])
+
+    @classmethod
+    def draw_winners(cls, draw_date, bonus_num, raffle_ids=None):
+        """
+        발표일이 로또 추첨일(`draw_date`)인 종료(done) 래플들의 당첨자를 한 번에 추첨
+        - 보너스 번호를 부여받은 후보자를 (raffle, number_start) 인덱스로 한 번에 조회
+        - 이미 당첨자가 있는 래플은 건너뛰므로 같은 추첨일로 다시 실행해도 안전
+        """
+        announce_from = KST.localize(datetime.combine(draw_date, datetime.min.time()))
+        raffles = cls.objects.filter(
+            progress=Raffle.PROGRESS_CHOICES[2][0],
+            announce_date_time__gte=announce_from,
+            announce_date_time__lt=announce_from + timedelta(days=1),
+        ).exclude(
+            candidates__raffle_winner__isnull=False,
+        )
+        if raffle_ids is not None:
+            raffles = raffles.filter(pk__in=raffle_ids)
+
+        winner_ids = dict(RaffleCandidate.objects
+                          .holding(bonus_num)
+                          .filter(raffle__in=raffles.values('pk'))
+                          .values_list('id', 'raffle_id'))
+        winners = [RaffleWinner(raffle_candidate_id=winner_id) for winner_id in winner_ids]
+
+        with transaction.atomic():
+            RaffleWinner.objects.bulk_create(winners, ignore_conflicts=True)
+
+        if winner_ids:
+            RaffleResult.capture(winner_ids.values(), RaffleResult.KIND_CHOICES[1][0])
+        return len(winners)
 
 
 class RaffleApply(models.Model):
@@ -305,6 +997,13 @@ class RaffleApply(models.Model):
         on_delete=models.CASCADE
     )
 
+    # 삭제(soft delete)하면 슬롯을 돌려주고 비움 (복구하면 빈 슬롯을 다시 선점)
+    ordinal_number = models.PositiveIntegerField(
+        verbose_name='응모 순번',
+        editable=False,
+        null=True,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False, editable=False)
@@ -314,6 +1013,16 @@ class RaffleApply(models.Model):
 
     class Meta:
         db_table = '_'.join((__package__, 'raffle_apply'))
+        constraints = [
+            # 한 사용자는 래플 하나에 한 번만 응모 가능
+            models.UniqueConstraint(fields=['raffle', 'user'], name='unique_raffle_apply_user'),
+            # 래플 내 응모 순번 중복 방지
+            models.UniqueConstraint(fields=['raffle', 'ordinal_number'], name='unique_raffle_apply_ordinal_number'),
+        ]
+        indexes = [
+            # 응모자 목록 키셋 페이지네이션 (raffle_id = ? AND (created_at, id) > (?, ?) ORDER BY created_at, id)
+            models.Index(fields=['raffle', 'created_at', 'id'], name='raffle_apply_created_idx'),
+        ]
 
     def __str__(self):
         return f'RaffleApply ({self.pk}) | {self.raffle} | {self.user}'
@@ -342,37 +1051,430 @@ class RaffleApply(models.Model):
 
         super().clean()
 
+    __original_is_deleted = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__original_is_deleted = self.__dict__.get('is_deleted')
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        if not self._state.adding:
+            return self.save_deleted(*args, **kwargs)
+
+        self.raffle = Raffle.objects.select_related(None).get(pk=self.raffle_id)
+
+        # 래플 상태 검사 (미리 거르는 용도 - 실제 확인은 아래 트랜잭션 안에서)
+        self.check_raffle_open()
+
+        # 빈 슬롯 선점, 응모 기록, 티켓 차감은 한 트랜잭션에서 처리
+        with transaction.atomic():
+            slot = RaffleSlot.claim(self.raffle_id, self.user)
+            if slot is not None:
+                self.ordinal_number = slot.number
+                super().save(*args, **kwargs)
+                RaffleSlot.objects.filter(pk=slot.pk).update(raffle_apply=self)
+
+                # 티켓 차감 (잔액이 없으면 ValidationError 발생 -> 슬롯 선점과 응모 기록도 롤백)
+                TicketLedger.debit(self)
+
+                # 응모 수 갱신 (진행중이 아니면 ValidationError 발생 -> 티켓 차감까지 롤백)
+                self.increment_applied_count()
+
+        # 래플이 목표 수량을 채운 경우 종료(done)로 변경 (커밋 이후에 확인해야 마지막 응모에서 빠짐없이 처리됨)
+        closed = self.raffle.try_close()
+
+        # 응모 가능 수량 검사
+        if slot is None:
+            raise ValidationError({'raffle': [f"응모 가능한 수량<{self.raffle.target_quantity}>을 초과하였습니다."]})
+
+        # 1차 추첨(후보자 뽑기)은 응모 요청에서 하지 않고 `Raffle.create_pending_candidates()`에서 처리
+        return closed
+
+    def save_deleted(self, *args, **kwargs):
+        """
+        응모 삭제(soft delete)/복구 저장
+        - 삭제: 슬롯을 돌려주고 사용한 티켓을 원장에서 되돌림 (실패한 래플이라 이미 환불했으면 환불도 되돌림)
+        - 복구: 진행중인 래플에서만 가능하며, 빈 슬롯을 다시 선점하고 티켓을 차감
+        """
+        is_deleted_changed = self.is_deleted != self.__original_is_deleted
+        restored = is_deleted_changed and not self.is_deleted
+        if restored:
+            self.raffle = Raffle.objects.select_related(None).get(pk=self.raffle_id)
+            self.check_raffle_open()
+
+        with transaction.atomic():
+            slot = None
+            if is_deleted_changed and self.is_deleted:
+                RaffleSlot.release(self)
+                self.ordinal_number = None
+            elif restored:
+                slot = RaffleSlot.claim(self.raffle_id, self.user)
+                if slot is None:
+                    raise ValidationError({'raffle': [
+                        f"응모 가능한 수량<{self.raffle.target_quantity}>을 초과하여 복구할 수 없습니다."]})
+                self.ordinal_number = slot.number
+
+            super().save(*args, **kwargs)
+
+            if is_deleted_changed and self.is_deleted:
+                TicketLedger.reverse(raffle_apply=self)
+                # 래플 행의 잠금을 짧게 유지하도록 트랜잭션의 마지막에 응모 수 갱신
+                Raffle.objects.filter(pk=self.raffle_id).update(applied_count=F('applied_count') - 1)
+            elif restored:
+                RaffleSlot.objects.filter(pk=slot.pk).update(raffle_apply=self)
+                TicketLedger.debit(self, seq=TicketLedger.next_seq(TicketLedger.KIND_CHOICES[1][0], raffle_apply=self))
+                self.increment_applied_count()
+        self.__original_is_deleted = self.__dict__.get('is_deleted')
+
+        if restored:
+            self.raffle.try_close()
+
+    def check_raffle_open(self):
+        if self.raffle.progress != Raffle.PROGRESS_CHOICES[1][0] or self.raffle.end_date_time <= timezone.now():
+            raise self.raffle_closed_error()
+
+    def increment_applied_count(self):
+        """
+        진행중이고 종료 일시 전인 래플만 응모 수 갱신
+        - 래플 행을 잠그므로 동시에 실행되는 종료/실패 처리(`Raffle.close()`, `Raffle.advance_progress()`)와 순서가 맞춰짐
+        - 그 사이 종료/실패로 바뀌었으면 ValidationError 발생 (호출한 트랜잭션 전체 롤백)
+        - 래플 행의 잠금을 짧게 유지하도록 트랜잭션의 마지막 문장으로 실행
+        """
+        updated = Raffle.objects \
+            .filter(pk=self.raffle_id, progress=Raffle.PROGRESS_CHOICES[1][0], end_date_time__gt=timezone.now()) \
+            .update(applied_count=F('applied_count') + 1)
+        if not updated:
+            self.raffle.refresh_from_db(fields=['progress'])
+            raise self.raffle_closed_error()
+        self.raffle.applied_count += 1
+
+    def raffle_closed_error(self):
+        if self.raffle.progress == Raffle.PROGRESS_CHOICES[1][0]:
+            return ValidationError({'raffle': ['응모 종료 일시가 지난 래플은 응모할 수 없습니다.']})
+        return ValidationError({'raffle': [
+            f'진행 상황이 <{self.raffle.get_progress_display()}>인 래플은 응모할 수 없습니다.']})
+
+
+class RaffleSlot(models.Model):
+    """
+    래플 응모 순번 슬롯
+    - 래플을 만들 때 목표 수량만큼 미리 만들어 두고, 응모할 때 비어 있는 가장 작은 번호의 슬롯을 선점
+    - 슬롯 번호가 응모 순번(`RaffleApply.ordinal_number`)이 되며, 빈 슬롯이 없으면 마감
+    """
+    raffle = models.ForeignKey(
+        Raffle,
+        related_name='slots',
+        on_delete=models.CASCADE,
+    )
+    number = models.PositiveIntegerField(
+        verbose_name='순번',
+    )
+    user = models.ForeignKey(
+        User,
+        verbose_name='선점한 사람',
+        related_name='raffle_slots',
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+    )
+    raffle_apply = models.OneToOneField(
+        RaffleApply,
+        related_name='slot',
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+    )
+
+    class Meta:
+        db_table = '_'.join((__package__, 'raffle_slot'))
+        constraints = [
+            models.UniqueConstraint(fields=['raffle', 'number'], name='unique_raffle_slot_number'),
+            # 한 사용자는 래플 하나에서 슬롯 하나만 선점 가능
+            models.UniqueConstraint(fields=['raffle', 'user'], name='unique_raffle_slot_user'),
+        ]
+        indexes = [
+            # 가장 작은 빈 슬롯 찾기 (raffle_id = ? AND user_id IS NULL ORDER BY number)
+            models.Index(fields=['raffle', 'user', 'number'], name='raffle_slot_free_idx'),
+        ]
+
+    @classmethod
+    def claim(cls, raffle_id, user):
+        """
+        비어 있는 가장 작은 번호의 슬롯 선점 (빈 슬롯이 없으면 None)
+        - 다른 트랜잭션이 잠근 슬롯은 건너뛰므로 동시 응모가 한 행에서 기다리지 않음
+        - 이미 선점한 사용자는 (raffle, user) unique 제약으로 IntegrityError 발생
+        """
+        free_slots = cls.objects.filter(raffle_id=raffle_id, user=None).order_by('number')
+
+        if connection.features.has_select_for_update_skip_locked:
+            slot = free_slots.select_for_update(skip_locked=True).first()
+            if slot is not None:
+                cls.objects.filter(pk=slot.pk).update(user=user)
+                slot.user = user
+            return slot
+
+        # SKIP LOCKED를 지원하지 않는 DB(SQLite 등)는 조건부 UPDATE로 선점하고, 다른 응모가 먼저 가져가면 다시 시도
+        while True:
+            slot = free_slots.first()
+            if slot is None:
+                return None
+            if cls.objects.filter(pk=slot.pk, user=None).update(user=user):
+                slot.user = user
+                return slot
+
+    @classmethod
+    def release(cls, raffle_apply):
+        """
+        응모가 선점한 슬롯 비우기 (응모 삭제 시)
+        - 목표 수량을 줄여서 남아 있던 범위 밖의 슬롯은 비우지 않고 삭제
+        """
+        slots = cls.objects.filter(raffle_id=raffle_apply.raffle_id, user_id=raffle_apply.user_id)
+        slots.filter(number__gt=raffle_apply.raffle.target_quantity).delete()
+        slots.update(user=None, raffle_apply=None)
+
+
+class RaffleApplyRequest(models.Model):
+    """
+    처리 대기 중인 래플 응모 요청 (write-behind 모드, `RAFFLE_APPLY_MODE = 'queued'`)
+    - 응모 요청에서는 정원만 예약하고(`Raffle.enqueue_apply()`), `flush()`가 모아서 한 트랜잭션에 처리
+    - 사용자는 처리 결과(`status`)를 접수증으로 조회
+    """
+    STATUS_CHOICES = [
+        ('pending', '처리 대기'),
+        ('applied', '응모 완료'),
+        ('rejected', '응모 실패'),
+    ]
+
+    raffle = models.ForeignKey(
+        Raffle,
+        related_name='apply_requests',
+        on_delete=models.CASCADE,
+    )
+    user = models.ForeignKey(
+        User,
+        related_name='raffle_apply_requests',
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(
+        verbose_name='처리 상태',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_CHOICES[0][0],
+    )
+    raffle_apply = models.OneToOneField(
+        RaffleApply,
+        related_name='request',
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+    )
+    message = models.CharField(
+        verbose_name='처리 결과',
+        max_length=200,
+        blank=True,
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = '_'.join((__package__, 'raffle_apply_request'))
+        constraints = [
+            # 사용자당 한 행 - 처리되지 못한(rejected) 요청은 `Raffle.enqueue_apply()`에서 다시 사용
+            # (MySQL 은 조건부 unique 제약을 지원하지 않으므로 status=pending 으로 제한하지 않음)
+            models.UniqueConstraint(fields=['raffle', 'user'], name='unique_raffle_apply_request_user'),
+        ]
+        indexes = [
+            # 처리 대기 중인 요청을 접수 순서대로 조회 (status = 'pending' ORDER BY id)
+            models.Index(fields=['status', 'id'], name='raffle_apply_request_idx'),
+        ]
+
+    def get_receipt(self):
+        return {
+            'id': self.pk,
+            'raffle': self.raffle_id,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'ordinal_number': self.raffle_apply.ordinal_number if self.raffle_apply_id else None,
+            'message': self.message,
+            'created_at': self.created_at,
+            'processed_at': self.processed_at,
+        }
+
+    @classmethod
+    def flush(cls, batch_size=500):
+        """
+        처리 대기 중인 응모 요청을 접수 순서대로 최대 `batch_size`개 처리
+        - 슬롯 선점, 응모 기록(bulk_create), 티켓 차감(`TicketLedger.debit_many()`), 응모 수 갱신을 한 트랜잭션에서 처리
+        - 응모할 수 없는 요청(진행중이 아닌 래플, 이미 응모, 티켓 없음, 수량 초과)은 rejected 로 변경
+        - 다른 워커가 잠근 요청은 건너뛰므로(SKIP LOCKED 지원 DB) 여러 워커를 동시에 실행할 수 있음
+        - 처리한 요청 수를 상태별로 반환
+        """
+        pending, applied, rejected = (status for status, _ in cls.STATUS_CHOICES)
+        ongoing = Raffle.PROGRESS_CHOICES[1][0]
+
+        with transaction.atomic():
+            requests = cls.objects.filter(status=pending).order_by('id')
+            if connection.features.has_select_for_update_skip_locked:
+                requests = requests.select_for_update(skip_locked=True)
+            requests = list(requests[:batch_size])
+            if not requests:
+                return {applied: 0, rejected: 0}
+
+            requests_by_raffle = defaultdict(list)
+            for request in requests:
+                requests_by_raffle[request.raffle_id].append(request)
+            raffles = Raffle.objects.select_related(None).in_bulk(list(requests_by_raffle))
+
+            # 배치 안에서 같은 사용자가 여러 래플에 응모할 수 있으므로 잔액을 잠그고 차감할 몫을 직접 계산
+            user_ids = {request.user_id for request in requests}
+            TicketBalance.ensure(user_ids)
+            balances = {
+                balance.user_id: balance.num_tickets
+                for balance in TicketBalance.objects.select_for_update().filter(user_id__in=user_ids)
+            }
+            already_applied = set(
+                RaffleApply._base_manager
+                .filter(raffle_id__in=list(requests_by_raffle), user_id__in=user_ids)
+                .values_list('raffle_id', 'user_id')
+            )
+
+            accepted = []  # [(request, slot), ...]
+            for raffle_id, raffle_requests in requests_by_raffle.items():
+                raffle = raffles.get(raffle_id)
+                if raffle is None or raffle.progress != ongoing:
+                    for request in raffle_requests:
+                        request.status = rejected
+                        request.message = '진행중인 래플이 아닙니다.'
+                    continue
+
+                free_slots = RaffleSlot.objects.filter(raffle_id=raffle_id, user=None).order_by('number')
+                if connection.features.has_select_for_update_skip_locked:
+                    free_slots = free_slots.select_for_update(skip_locked=True)
+                free_slots = iter(free_slots[:len(raffle_requests)])
+
+                for request in raffle_requests:
+                    if (raffle_id, request.user_id) in already_applied:
+                        request.status, request.message = rejected, '이미 응모한 래플입니다.'
+                    elif balances.get(request.user_id, 0) <= 0:
+                        request.status, request.message = rejected, '소유한 티켓이 없습니다.'
+                    else:
+                        slot = next(free_slots, None)
+                        if slot is None:
+                            request.status, request.message = rejected, \
+                                f'응모 가능한 수량<{raffle.target_quantity}>을 초과하였습니다.'
+                            continue
+                        balances[request.user_id] -= 1
+                        request.status = applied
+                        accepted.append((request, slot))
+
+            if accepted:
+                RaffleApply.objects.bulk_create([
+                    RaffleApply(raffle_id=request.raffle_id, user_id=request.user_id, ordinal_number=slot.number)
+                    for request, slot in accepted
+                ], batch_size=500)
+
+                # MySQL 은 bulk_create 로 만든 행의 id 를 돌려주지 않으므로 (raffle, user)로 다시 조회
+                apply_ids = {
+                    (raffle_id, user_id): pk
+                    for pk, raffle_id, user_id in RaffleApply.objects
+                    .filter(raffle_id__in=list(requests_by_raffle), user_id__in=user_ids)
+                    .values_list('id', 'raffle_id', 'user_id')
+                }
+                for request, slot in accepted:
+                    request.raffle_apply_id = apply_ids[(request.raffle_id, request.user_id)]
+                    slot.user_id = request.user_id
+                    slot.raffle_apply_id = request.raffle_apply_id
+                RaffleSlot.objects.bulk_update([slot for _, slot in accepted], fields=['user', 'raffle_apply'],
+                                               batch_size=500)
+
+                TicketLedger.debit_many([(request.raffle_apply_id, request.user_id) for request, _ in accepted])
+
+            now = timezone.now()
+            for request in requests:
+                request.processed_at = now
+            cls.objects.bulk_update(requests, fields=['status', 'raffle_apply', 'message', 'processed_at'],
+                                    batch_size=500)
+
+            # 래플 행의 잠금을 짧게 유지하도록 트랜잭션의 마지막에 응모 수/예약 수 갱신
+            applied_counts = Counter(request.raffle_id for request, _ in accepted)
+            for raffle_id, raffle_requests in requests_by_raffle.items():
+                Raffle.objects.filter(pk=raffle_id).update(
+                    applied_count=F('applied_count') + applied_counts[raffle_id],
+                    reserved_count=F('reserved_count') - len(raffle_requests),
+                )
+                bump_response_cache('raffle', raffle_id)
+
+        # 목표 수량을 채운 래플은 종료(done)로 변경 (커밋 이후에 확인)
+        for raffle_id in applied_counts:
+            raffles[raffle_id].try_close()
+
+        return {applied: len(accepted), rejected: len(requests) - len(accepted)}
+
+
+class RaffleCandidateDraw(models.Model):
+    """
+    1차 추첨(후보자 뽑기) 기록
+    - 같은 seed 로 `Raffle.sample_candidates()`를 다시 실행하면 같은 후보자가 나옴
+    """
+    raffle = models.OneToOneField(
+        Raffle,
+        related_name='candidate_draw',
+        on_delete=models.CASCADE,
+    )
+    seed = models.CharField(
+        verbose_name='seed',
+        max_length=64,
+    )
+    num_applicants = models.PositiveIntegerField(
+        verbose_name='추첨 당시 응모자 수',
+    )
+    created_at = models.DateTimeField(
+        verbose_name='추첨 일시',
+        auto_now_add=True,
+    )
 
-        # 래플이 목표 수량을 채운 경우
-        if self.raffle.applied_count == self.raffle.target_quantity:
-            # 래플의 진행 상황을 종료(done)로 변경
-            self.raffle.progress = Raffle.PROGRESS_CHOICES[2][0]  # done
+    class Meta:
+        db_table = '_'.join((__package__, 'raffle_candidate_draw'))
 
-            # 래플의 발표일시 업데이트
-            self.raffle.announce_date_time = self.raffle.calc_announce_date_time(done_date_time=datetime.now())
 
-            self.raffle.save(update_fields=['progress', 'announce_date_time'])
+class RaffleCandidateQuerySet(models.QuerySet):
 
-            # 1차 추첨 시작
-            self.raffle.create_candidates()
+    def holding(self, number):
+        # number_start <= number < number_start + number_count
+        return self.filter(number_start__lte=number, number_start__gt=number - F('number_count'))
 
 
 class RaffleCandidate(models.Model):
+    raffle = models.ForeignKey(
+        Raffle,
+        related_name='candidates',
+        on_delete=models.CASCADE,
+        editable=False,
+    )
     raffle_apply = models.OneToOneField(
         RaffleApply,
         related_name='raffle_candidate',
         verbose_name='1차 당첨',
         on_delete=models.CASCADE,
     )
-    given_numbers = models.CharField(
-        verbose_name='부여받은 번호',
-        max_length=100,
+    # 부여받은 번호: number_start 부터 연속된 number_count 개의 번호
+    number_start = models.PositiveSmallIntegerField(
+        verbose_name='부여받은 첫 번호',
     )
+    number_count = models.PositiveSmallIntegerField(
+        verbose_name='부여받은 번호 개수',
+    )
+
+    objects = RaffleCandidateQuerySet.as_manager()
 
     class Meta:
         db_table = '_'.join((__package__, 'raffle_candidate'))
+        constraints = [
+            # 번호 N 을 가진 후보자 조회: raffle_id = ? AND number_start <= N (인덱스 범위 스캔)
+            models.UniqueConstraint(fields=['raffle', 'number_start'], name='unique_raffle_candidate_number_start'),
+        ]
+
+    @property
+    def given_numbers(self):
+        return list(range(self.number_start, self.number_start + self.number_count))
 
 
 class RaffleWinner(models.Model):
@@ -387,6 +1489,130 @@ class RaffleWinner(models.Model):
         db_table = '_'.join((__package__, 'raffle_winner'))
 
 
+class RaffleResult(models.Model):
+    """
+    래플 추첨 결과(1차 당첨자 / 최종 당첨자) 응답 스냅샷
+    - 1차 추첨, 당첨자 추첨 직후 한 번 만들고 수정하지 않음 (래플 + 종류별로 하나)
+    - 발표 시각에 몰리는 조회는 캐시 -> 스냅샷 테이블 순서로 응답하고, 발표 전에 캐시를 미리 채움(`warm_up`)
+    """
+    KIND_CHOICES = [
+        ('candidates', '1차 당첨자'),
+        ('winner', '최종 당첨자'),
+    ]
+
+    raffle = models.ForeignKey(
+        Raffle,
+        related_name='results',
+        on_delete=models.CASCADE,
+    )
+    kind = models.CharField(
+        verbose_name='종류',
+        max_length=10,
+        choices=KIND_CHOICES,
+    )
+    payload = models.TextField(
+        verbose_name='응답 (JSON)',
+    )
+    created_at = models.DateTimeField(
+        verbose_name='생성 일시',
+        auto_now_add=True,
+    )
+
+    CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+    class Meta:
+        db_table = '_'.join((__package__, 'raffle_result'))
+        constraints = [
+            models.UniqueConstraint(fields=['raffle', 'kind'], name='unique_raffle_result_kind'),
+        ]
+
+    @staticmethod
+    def get_cache_key(raffle_id, kind):
+        return f'{__package__}:raffle-result:{raffle_id}:{kind}'
+
+    @classmethod
+    def build_payloads(cls, raffle_ids, kind):
+        """
+        래플별 응답 만들기 (`RaffleCandidateSerializer`, `RaffleWinnerSerializer`와 같은 형식)
+        """
+        payloads = {raffle_id: [] for raffle_id in raffle_ids}
+        if kind == cls.KIND_CHOICES[0][0]:
+            for rc in RaffleCandidate.objects \
+                    .filter(raffle_id__in=raffle_ids) \
+                    .select_related('raffle_apply__user') \
+                    .order_by('raffle_id', 'number_start'):
+                payloads[rc.raffle_id].append({'user': str(rc.raffle_apply.user), 'given_numbers': rc.given_numbers})
+        else:
+            for rw in RaffleWinner.objects \
+                    .filter(raffle_candidate__raffle_id__in=raffle_ids) \
+                    .select_related('raffle_candidate__raffle_apply__user') \
+                    .order_by('id'):
+                payloads[rw.raffle_candidate.raffle_id].append({'user': str(rw.raffle_candidate.raffle_apply.user)})
+        return payloads
+
+    @classmethod
+    def capture(cls, raffle_ids, kind):
+        """
+        래플들의 결과 스냅샷을 만들고 캐시에 올리기 (이미 있는 스냅샷은 그대로 둠)
+        """
+        raffle_ids = list(raffle_ids)
+        payloads = cls.build_payloads(raffle_ids, kind)
+        cls.objects.bulk_create(
+            [cls(raffle_id=raffle_id, kind=kind, payload=dumps(payload, ensure_ascii=False))
+             for raffle_id, payload in payloads.items()],
+            ignore_conflicts=True,
+        )
+        # 동시에 만들어진 스냅샷이 있을 수 있으므로 저장된 값을 캐시에 올림
+        cls.cache_many(cls.objects.filter(raffle_id__in=raffle_ids, kind=kind))
+
+    @classmethod
+    def cache_many(cls, results):
+        cache.set_many(
+            {cls.get_cache_key(result.raffle_id, result.kind): loads(result.payload) for result in results},
+            timeout=cls.CACHE_TIMEOUT,
+        )
+
+    @classmethod
+    def get_payload(cls, raffle_id, kind):
+        """
+        캐시 -> 스냅샷 테이블 순서로 응답을 찾고, 스냅샷이 없으면 None
+        """
+        key = cls.get_cache_key(raffle_id, kind)
+        payload = cache.get(key)
+        if payload is None:
+            result = cls.objects.filter(raffle_id=raffle_id, kind=kind).first()
+            if result is None:
+                return None
+            payload = loads(result.payload)
+            cache.set(key, payload, timeout=cls.CACHE_TIMEOUT)
+        return payload
+
+    @classmethod
+    def warm_up(cls, until, now=None, since=None):
+        """
+        발표 일시가 `until` 이전인 종료(done) 래플들의 1차 당첨자 스냅샷을 캐시에 미리 올림
+        - 스냅샷이 없는 래플(1차 추첨은 했지만 스냅샷이 없는 경우)은 새로 만듦
+        - `since`를 지정하면 발표 일시가 `since` 이후인 래플만 (이전 호출에서 이미 올린 래플은 다시 쓰지 않음)
+        """
+        now = now or timezone.now()
+        kind = cls.KIND_CHOICES[0][0]
+        raffle_ids = list(Raffle.objects.filter(
+            progress=Raffle.PROGRESS_CHOICES[2][0],
+            candidates_count__gt=0,
+            announce_date_time__gt=max(now, since) if since else now,
+            announce_date_time__lte=until,
+        ).values_list('id', flat=True))
+        if not raffle_ids:
+            return 0
+
+        results = list(cls.objects.filter(raffle_id__in=raffle_ids, kind=kind))
+        missing = set(raffle_ids) - {result.raffle_id for result in results}
+        if missing:
+            cls.capture(missing, kind)
+        cls.cache_many(results)
+        return len(raffle_ids)
+
+
 class Lotto(models.Model):
     draw_no = models.SmallIntegerField(
         verbose_name='회차 번호',
@@ -415,18 +1641,13 @@ class Lotto(models.Model):
         self.clean()
 
         self.draw_no = self.__calc_lotto_no()
-        if bool(self.bonus_num):
+        if not self.bonus_num:
             self.bonus_num = self.__get_lotto_bonus_num()
 
         super().save(*args, **kwargs)
 
         # 응모 종료('done') 상태이고 발표일이 동일한 래플들 추첨 진행하기
-        qs = Raffle.objects.filter(
-            progress=Raffle.PROGRESS_CHOICES[2][0],
-            announce_date_time__date=self.draw_date
-        )
-        for raffle in qs:
-            raffle.draw_winner()
+        Raffle.draw_winners(self.draw_date, self.bonus_num)
 
     def __calc_lotto_no(self):
         """
@@ -439,17 +1660,84 @@ class Lotto(models.Model):
         return ((self.draw_date - _first_draw_date) / 7).days + 1
 
     def __get_lotto_bonus_num(self):
-        # TODO: timeout 설정, 응답 없을 경우 예외 처리
-        """
-        Exception Type: ConnectionError at /admin/loffle/lotto/add/
-        Exception Value: HTTPSConnectionPool(host='www.dhlottery.co.kr', port=443): Max retries exceeded with url:
-        /common.do?method=getLottoNumber&drwNo=987 (Caused by NewConnectionError(
-            '<urllib3.connection.HTTPSConnection object at 0x0000023114F3CC70>: Failed to establish a new connection:
-                [WinError 10060] 연결된 구성원으로부터 응답이 없어 연결하지 못했거나, 호스트로부터 응답이 없어 연결이 끊어졌습니다'))
-        """
+        try:
+            return LottoResult.fetch(self.__calc_lotto_no()).bonus_num
+        except LottoFetchError as e:
+            raise ValidationError({'bonus_num': str(e)})
+
+
+class LottoResult(models.Model):
+    """
+    회차별 로또 당첨 번호 (동행복권 API 조회 결과 캐시)
+    - 한 회차는 한 번만 조회하고 이후에는 이 테이블에서 읽음
+    """
+    draw_no = models.PositiveSmallIntegerField(
+        verbose_name='회차 번호',
+        unique=True,
+    )
+    draw_date = models.DateField(
+        verbose_name='추첨 날짜',
+    )
+    numbers = models.CharField(
+        verbose_name='당첨 번호',
+        max_length=30,
+    )
+    bonus_num = models.SmallIntegerField(
+        verbose_name='보너스 당첨 번호',
+    )
 
-        lotto_api_url = 'https://www.dhlottery.co.kr/common.do?method=getLottoNumber&drwNo='
-        draw_no = self.__calc_lotto_no()
+    created_at = models.DateTimeField(auto_now_add=True)
 
-        res = requests.get(lotto_api_url + str(draw_no))
-        return res.json().get('bnusNo', 0)
+    class Meta:
+        db_table = '_'.join((__package__, 'lotto_result'))
+
+    def __str__(self):
+        return f'{self.draw_no}회 ({self.draw_date}) | {self.numbers} + {self.bonus_num}'
+
+    @classmethod
+    def from_fetched(cls, data):
+        return cls(
+            draw_no=data['draw_no'],
+            draw_date=data['draw_date'],
+            numbers=dumps(data['numbers']),
+            bonus_num=data['bonus_num'],
+        )
+
+    @classmethod
+    def fetch(cls, draw_no):
+        """
+        회차의 당첨 번호 (저장된 결과가 없을 때만 API 조회)
+        """
+        result = cls.objects.filter(draw_no=draw_no).first()
+        if result is None:
+            result = cls.from_fetched(get_lotto_fetcher().fetch(draw_no))
+            cls.objects.bulk_create([result], ignore_conflicts=True)
+        return result
+
+    @classmethod
+    def fetch_many(cls, draw_nos, workers=8):
+        """
+        여러 회차의 당첨 번호를 동시에 조회하여 저장 (이미 저장된 회차는 건너뜀)
+        - 반환값: (저장한 회차 수, {회차 번호: 오류 메시지})
+        """
+        saved = set(cls.objects.filter(draw_no__in=draw_nos).values_list('draw_no', flat=True))
+        missing = [draw_no for draw_no in draw_nos if draw_no not in saved]
+
+        fetcher = get_lotto_fetcher()
+        results, errors = [], {}
+
+        def fetch(draw_no):
+            try:
+                return draw_no, fetcher.fetch(draw_no), None
+            except LottoFetchError as e:
+                return draw_no, None, str(e)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for draw_no, data, error in executor.map(fetch, missing):
+                if error:
+                    errors[draw_no] = error
+                else:
+                    results.append(cls.from_fetched(data))
+
+        cls.objects.bulk_create(results, batch_size=500, ignore_conflicts=True)
+        return len(results), errors
@@ -1,11 +1,55 @@
-from rest_framework.pagination import PageNumberPagination
+from django.db.models import Case, When, F
 
+from _common.paginations import KeysetPagination, OrderingKeysetPagination
 
-class RafflePagination(PageNumberPagination):
+
+class RafflePagination(OrderingKeysetPagination):
+    """
+    래플 목록 키셋 페이지네이션
+    - (진행 상황 순서 `rank`, 정렬 기준 일시 `sort_key`, id) 순서로 정렬
+    - 진행 상황별로 정렬 방향이 다름: ongoing, waiting 은 오름차순 / done, failed 는 내림차순
+    - `?ordering=`(view 의 `ordering_fields`)을 지정하면 (해당 필드, id) 순서로 정렬
+    """
     page_size = 5
     page_size_query_param = 'page_size'
 
+    ordering = ('rank', 'sort_key', 'id')
+    DESCENDING_RANK = 3  # done, failed
+
+    def is_descending(self, field, position):
+        if field == 'sort_key':
+            return position[0] >= self.DESCENDING_RANK
+        return super().is_descending(field, position)
+
+    def get_order_by(self, reverse=False):
+        if self.ordering != RafflePagination.ordering:
+            return super().get_order_by(reverse)
+
+        # rank 그룹 안에서는 sort_key 가 한쪽 방향으로만 정렬되도록 나머지 그룹은 NULL 로 둠
+        ascending_key = Case(When(rank__lt=self.DESCENDING_RANK, then=F('sort_key')))
+        descending_key = Case(When(rank__gte=self.DESCENDING_RANK, then=F('sort_key')))
+
+        if reverse:
+            return [F('rank').desc(), ascending_key.desc(), descending_key.asc(), F('id').desc()]
+        return [F('rank').asc(), ascending_key.asc(), descending_key.desc(), F('id').asc()]
+
 
-class ApplyUserPagination(PageNumberPagination):
+class ApplyUserPagination(KeysetPagination):
+    """
+    래플 응모자 목록 키셋 페이지네이션
+    - 응모 일시, id 순서로 정렬하므로 응모자가 많아도 페이지마다 비용이 같음
+    """
     page_size = 10
     page_size_query_param = 'page_size'
+
+    ordering = ('created_at', 'id')
+
+
+class ProductPagination(KeysetPagination):
+    """
+    제품 목록 키셋 페이지네이션 (최신순)
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+
+    ordering = ('-created_at', '-id')
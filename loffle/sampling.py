@@ -0,0 +1,48 @@
+from math import exp, floor, log
+from random import Random
+from secrets import token_hex
+
+
+def new_seed():
+    return token_hex(16)
+
+
+def reservoir_sample(iterable, k, seed):
+    """
+    `iterable`에서 k 개를 무작위로 뽑기 (reservoir sampling, Algorithm L)
+    - 전체를 메모리에 올리지 않고 한 번만 순회하므로, 모집단 크기와 상관없이 메모리는 k 개만 사용
+    - 같은 seed 와 같은 순서의 `iterable`이면 항상 같은 결과 (감사(audit) 시 재현 가능)
+    - 결과의 순서도 seed 로 섞음
+    """
+    rng = Random(seed)
+    iterator = iter(iterable)
+
+    reservoir = []
+    for item in iterator:
+        reservoir.append(item)
+        if len(reservoir) == k:
+            break
+    if len(reservoir) < k:
+        return None
+
+    # 다음으로 교체될 항목까지 건너뛸 개수를 기하분포로 계산
+    w = exp(log(_random(rng)) / k)
+    skip = floor(log(_random(rng)) / log(1 - w))
+    for item in iterator:
+        if skip:
+            skip -= 1
+            continue
+        reservoir[rng.randrange(k)] = item
+        w *= exp(log(_random(rng)) / k)
+        skip = floor(log(_random(rng)) / log(1 - w))
+
+    rng.shuffle(reservoir)
+    return reservoir
+
+
+def _random(rng):
+    # (0, 1) 범위의 난수 (log(0) 방지)
+    while True:
+        u = rng.random()
+        if u:
+            return u
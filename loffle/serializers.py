@@ -1,13 +1,10 @@
-from json import loads
-
-from rest_framework.fields import SerializerMethodField, DateTimeField
+from rest_framework.fields import SerializerMethodField, DateTimeField, IntegerField, ListField, CharField
 from rest_framework.relations import HyperlinkedIdentityField, StringRelatedField, PrimaryKeyRelatedField
 from rest_framework.serializers import HyperlinkedModelSerializer
 
 from _common.serializers import CommonSerializer, CustomSerializer
-from account.models import User
 from _common.serializer_fields import ChildListUrlField
-from loffle.models import Ticket, Product, Raffle, RaffleCandidate, RaffleWinner
+from loffle.models import Ticket, Product, Raffle, RaffleApply, RaffleCandidate, RaffleWinner
 
 
 class TicketSerializer(CommonSerializer):
@@ -41,7 +38,7 @@ class RaffleSerializer(CommonSerializer):
     product = PrimaryKeyRelatedField(label='연결된 제품', queryset=Product.objects.all(), write_only=True)
     product_preview = RaffleProductSerializer(source='product', read_only=True)
 
-    apply_count = SerializerMethodField()
+    apply_count = IntegerField(source='applied_count', read_only=True)
     apply_or_not = SerializerMethodField()
 
     class RaffleLinksSerializer(CustomSerializer):
@@ -54,43 +51,37 @@ class RaffleSerializer(CommonSerializer):
 
     class Meta:
         model = Raffle
-        exclude = ('is_deleted',)
-
-    @staticmethod
-    def get_apply_count(obj):
-        return obj.applied.count()
+        exclude = ('is_deleted', 'applied_count', 'candidates_count', 'reserved_count')
 
     def get_apply_or_not(self, obj):
-        return obj.applied.filter(user__pk=self.context['request'].user.pk).exists()
+        # RaffleViewSet 에서 annotate 한 값이 있으면 그대로 사용
+        if hasattr(obj, 'apply_or_not'):
+            return obj.apply_or_not
+
+        user = self.context['request'].user
+        if not user.is_authenticated:
+            return False
+        return obj.applied.filter(user__pk=user.pk).exists()
 
 
 class RaffleApplicantSerializer(CommonSerializer):
-    user = StringRelatedField(source='username')
-    apply_at = SerializerMethodField()
+    user = CharField(source='user.username', read_only=True)
+    apply_at = DateTimeField(source='created_at', read_only=True)
 
     class Meta:
-        model = User
+        model = RaffleApply
         fields = ('user', 'apply_at')
 
-    def get_apply_at(self, obj):
-        raffle_id = self.context['view'].kwargs['parent_lookup_raffle']
-        return DateTimeField().to_representation(
-            obj.applied_raffles.get(raffle_id=raffle_id, user_id=obj.id).created_at)
-
 
 class RaffleCandidateSerializer(CommonSerializer):
     user = StringRelatedField(source='raffle_apply.user', read_only=True)
 
+    given_numbers = ListField(child=IntegerField(), read_only=True)
+
     class Meta:
         model = RaffleCandidate
         fields = ('user', 'given_numbers')
 
-    def to_representation(self, instance):
-        ret = super().to_representation(instance)
-        if 'given_numbers' in ret:
-            ret['given_numbers'] = loads(instance.given_numbers)
-        return ret
-
 
 class RaffleWinnerSerializer(CommonSerializer):
     user = StringRelatedField(source='raffle_candidate.raffle_apply.user')
@@ -0,0 +1,137 @@
+import asyncio
+from json import dumps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from loffle.models import Raffle
+
+
+class RaffleBroadcaster:
+    """
+    래플 응모 수/진행 상황 변경을 구독자에게 전달 (워커 프로세스마다 하나)
+    - 구독 중인 래플들을 `interval` 마다 한 번의 쿼리로 조회하고, 바뀐 래플만 구독자에게 전달
+    - 구독자마다 최신 값 하나만 보관하므로, 느린 클라이언트에게는 중간 값을 건너뛰고 마지막 값만 전달
+      (래플당 최대 초당 1 / `interval` 번)
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.subscribers = {}  # {raffle_id: {asyncio.Queue, ...}}
+        self.states = {}  # {raffle_id: 마지막으로 전달한 상태}
+        self.task = None
+
+    def subscribe(self, raffle_id):
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers.setdefault(raffle_id, set()).add(queue)
+        if raffle_id in self.states:
+            queue.put_nowait(self.states[raffle_id])
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.run())
+        return queue
+
+    def unsubscribe(self, raffle_id, queue):
+        queues = self.subscribers.get(raffle_id, set())
+        queues.discard(queue)
+        if not queues:
+            self.subscribers.pop(raffle_id, None)
+            self.states.pop(raffle_id, None)
+
+    async def run(self):
+        while self.subscribers:
+            try:
+                states = await self.fetch_states(list(self.subscribers))
+            except Exception:
+                # DB 오류가 나도 구독은 유지하고 다음 주기에 다시 조회
+                states = {}
+
+            for raffle_id, state in states.items():
+                if self.states.get(raffle_id) != state:
+                    self.states[raffle_id] = state
+                    self.publish(raffle_id, state)
+            await asyncio.sleep(self.interval)
+
+    def publish(self, raffle_id, state):
+        for queue in self.subscribers.get(raffle_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(state)
+
+    @staticmethod
+    @sync_to_async
+    def fetch_states(raffle_ids):
+        close_old_connections()
+        return {
+            raffle_id: {'id': raffle_id, 'apply_count': applied_count, 'progress': progress}
+            for raffle_id, applied_count, progress in Raffle.objects.select_related(None)
+            .filter(pk__in=raffle_ids)
+            .values_list('id', 'applied_count', 'progress')
+        }
+
+
+_broadcaster = None
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = RaffleBroadcaster()
+    return _broadcaster
+
+
+async def raffle_stream(scope, receive, send, raffle_id, keepalive=15):
+    """
+    래플 응모 수/진행 상황 SSE(Server-Sent Events) 스트림 - `GET /raffles/<id>/stream`
+    - 연결하면 현재 상태를 먼저 보내고, 이후 바뀔 때마다 `event: raffle` 로 전달
+    - 종료(done)/실패(failed) 상태가 되면 스트림을 닫음
+    """
+    broadcaster = get_broadcaster()
+    states = await broadcaster.fetch_states([raffle_id])
+    if raffle_id not in states:
+        await send({'type': 'http.response.start', 'status': 404, 'headers': [(b'content-type', b'text/plain')]})
+        await send({'type': 'http.response.body', 'body': b'Not Found'})
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+
+    async def wait_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    disconnected = asyncio.ensure_future(wait_disconnect())
+    queue = broadcaster.subscribe(raffle_id)
+    try:
+        state = states[raffle_id]
+        while True:
+            data = dumps(state, ensure_ascii=False)
+            await send({'type': 'http.response.body', 'body': f'event: raffle\ndata: {data}\n\n'.encode(),
+                        'more_body': True})
+            if state['progress'] not in (Raffle.PROGRESS_CHOICES[0][0], Raffle.PROGRESS_CHOICES[1][0]):
+                break
+
+            while True:
+                get = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({get, disconnected}, timeout=keepalive,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if get in done:
+                    if get.result() == state:
+                        continue
+                    state = get.result()
+                    break
+                get.cancel()
+                if disconnected in done:
+                    return
+                await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        broadcaster.unsubscribe(raffle_id, queue)
+        disconnected.cancel()
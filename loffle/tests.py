@@ -1,3 +1,581 @@
-from django.test import TestCase
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from json import loads
+from threading import Barrier
+from time import sleep
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, DatabaseError
+from django.db.models import Sum
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from account.models import User
+from loffle.filters import RaffleFilter
+from loffle.management.commands.run_raffle_scheduler import Command as RaffleSchedulerCommand
+from loffle.models import Ticket, TicketBuy, TicketLedger, TicketBalance, Product, Raffle, RaffleApply, \
+    RaffleApplyRequest, RaffleSlot, RaffleCandidate, RaffleResult
+
+
+class RaffleTestMixin:
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(email='staff@loffle.test', username='staff', sex='M', phone='00000000000')
+        cls.user = User.objects.create_user(email='user@loffle.test', username='user', sex='F', phone='00000000001')
+        cls.ticket = Ticket.objects.create(quantity=1, price=1000)
+        cls.product = Product.objects.create(name='product', size='270', brand='brand', serial='serial', color='black',
+                                             release_date=timezone.now().date(), user=cls.staff)
+
+    def create_user(self, number):
+        user = User.objects.create_user(email=f'user{number}@loffle.test', username=f'user{number}', sex='M',
+                                        phone=f'010{number:08d}')
+        TicketBuy.objects.create(ticket=self.ticket, user=user)
+        return user
+
+    def create_raffle(self, target_quantity=3, start=timedelta(days=-1), end=timedelta(days=1)):
+        now = timezone.now()
+        return Raffle.objects.create(start_date_time=now + start, end_date_time=now + end,
+                                     target_quantity=target_quantity, user=self.staff, product=self.product)
+
+
+class TicketLedgerTest(RaffleTestMixin, TestCase):
+
+    def get_balance(self, user=None):
+        balance = TicketBalance.objects.get(user=user or self.user)
+        return balance.num_buy_tickets, balance.num_use_tickets, balance.num_return_tickets
+
+    def test_record(self):
+        TicketBuy.objects.create(ticket=self.ticket, user=self.user)
+        TicketLedger.record(self.user.pk, 'buy', 2)
+        self.assertEqual(self.get_balance(), (3, 0, 0))
+
+    def test_debit(self):
+        raffle = self.create_raffle()
+        # 응모 기록만 만들고 티켓은 직접 차감
+        RaffleApply.objects.bulk_create([RaffleApply(raffle=raffle, user=self.user, ordinal_number=1)])
+        ra = RaffleApply.objects.get(raffle=raffle, user=self.user)
+
+        # 잔액이 없으면 차감하지 않음
+        with self.assertRaises(ValidationError):
+            TicketLedger.debit(ra)
+        self.assertFalse(TicketLedger.objects.filter(raffle_apply=ra).exists())
+
+        TicketBuy.objects.create(ticket=self.ticket, user=self.user)
+        TicketLedger.debit(ra)
+        self.assertEqual(self.get_balance(), (1, 1, 0))
+
+    def test_refund_raffles(self):
+        TicketBuy.objects.create(ticket=self.ticket, user=self.user)
+        raffle = self.create_raffle()
+        raffle.apply(self.user)
+
+        self.assertEqual(TicketLedger.refund_raffles([raffle.pk]), 1)
+        # 이미 환불한 응모는 다시 환불하지 않음
+        self.assertEqual(TicketLedger.refund_raffles([raffle.pk]), 0)
+        self.assertEqual(self.get_balance(), (1, 1, 1))
+
+    def test_rebuild(self):
+        TicketBuy.objects.create(ticket=self.ticket, user=self.user)
+        self.create_raffle().apply(self.user)
+        TicketBalance.objects.filter(user=self.user).update(num_buy_tickets=10, num_use_tickets=0)
+
+        self.assertEqual(TicketBalance.rebuild([self.user.pk]), 1)
+        self.assertEqual(self.get_balance(), (1, 1, 0))
+
+    def test_ticket_buy_delete_and_restore(self):
+        tb = TicketBuy.objects.create(ticket=self.ticket, user=self.user)
+
+        # 삭제한 구매는 잔액에서 빠지고, 복구하면 다시 더해짐 (원장으로 다시 계산해도 같음)
+        tb.is_deleted = True
+        tb.save()
+        self.assertEqual(self.get_balance(), (0, 0, 0))
+        tb.is_deleted = False
+        tb.save()
+        self.assertEqual(self.get_balance(), (1, 0, 0))
+        tb.is_deleted = True
+        tb.save()
+        self.assertEqual(self.get_balance(), (0, 0, 0))
+
+        TicketBalance.rebuild([self.user.pk])
+        self.assertEqual(self.get_balance(), (0, 0, 0))
+        self.assertEqual(list(TicketLedger.objects.filter(ticket_buy=tb).order_by('seq').values_list('quantity', flat=True)),
+                         [1, -1, 1, -1])
+
+
+class RaffleApplyTest(RaffleTestMixin, TestCase):
+
+    def test_delete_releases_slot(self):
+        raffle = self.create_raffle(target_quantity=3)
+        users = [self.create_user(i) for i in range(1, 5)]
+        applies = [raffle.apply(user) for user in users[:2]]
+
+        # 삭제한 응모의 슬롯은 비워지고 순번도 비움
+        applies[0].is_deleted = True
+        applies[0].save()
+        self.assertFalse(RaffleSlot.objects.filter(raffle=raffle, user=users[0]).exists())
+        self.assertIsNone(RaffleApply.deleted_objects.get(pk=applies[0].pk).ordinal_number)
+
+        # 비운 슬롯을 다른 사용자가 선점해서 목표 수량을 채울 수 있음
+        self.assertEqual(raffle.apply(users[2]).ordinal_number, 1)
+        raffle.apply(users[3])
+        raffle.refresh_from_db()
+        self.assertEqual(raffle.applied_count, 3)
+        self.assertEqual(raffle.progress, 'done')
+        self.assertFalse(raffle.slots.filter(user=None).exists())
+
+    def test_restore_claims_slot(self):
+        raffle = self.create_raffle(target_quantity=3)
+        user = self.create_user(1)
+        ra = raffle.apply(user)
+
+        ra.is_deleted = True
+        ra.save()
+        ra.is_deleted = False
+        ra.save()
+
+        slot = RaffleSlot.objects.get(raffle=raffle, user=user)
+        self.assertEqual((slot.raffle_apply_id, slot.number), (ra.pk, ra.ordinal_number))
+        raffle.refresh_from_db()
+        self.assertEqual(raffle.applied_count, 1)
+
+    def test_delete_returns_ticket(self):
+        raffle = self.create_raffle()
+        user = self.create_user(1)
+        ra = raffle.apply(user)
+        self.assertEqual(User.objects.get(pk=user.pk).num_tickets, 0)
+
+        ra.is_deleted = True
+        ra.save()
+        self.assertEqual(User.objects.get(pk=user.pk).num_tickets, 1)
+        self.assertEqual(TicketBalance.objects.get(user=user).num_use_tickets, 0)
+
+    def test_delete_after_refund(self):
+        raffle = self.create_raffle()
+        user = self.create_user(1)
+        ra = raffle.apply(user)
+        TicketLedger.refund_raffles([raffle.pk])
+
+        # 실패한 래플에서 이미 환불한 응모는 삭제해도 티켓이 늘지 않음
+        ra.is_deleted = True
+        ra.save()
+        self.assertEqual(User.objects.get(pk=user.pk).num_tickets, 1)
+
+    def test_restore_uses_ticket(self):
+        raffle = self.create_raffle()
+        user = self.create_user(1)
+        ra = raffle.apply(user)
+        ra.is_deleted = True
+        ra.save()
+
+        ra.is_deleted = False
+        ra.save()
+        self.assertEqual(User.objects.get(pk=user.pk).num_tickets, 0)
+        self.assertEqual(TicketLedger.objects.filter(raffle_apply=ra, kind='use').count(), 3)
+
+        # 티켓이 없으면 복구할 수 없음
+        ra.is_deleted = True
+        ra.save()
+        self.create_raffle().apply(user)
+        ra.is_deleted = False
+        with self.assertRaises(ValidationError):
+            ra.save()
+        self.assertTrue(RaffleApply.deleted_objects.filter(pk=ra.pk).exists())
+        self.assertFalse(RaffleSlot.objects.filter(raffle=raffle, user=user).exists())
+
+    def test_restore_after_close(self):
+        raffle = self.create_raffle()
+        user = self.create_user(1)
+        ra = raffle.apply(user)
+        ra.is_deleted = True
+        ra.save()
+
+        Raffle.advance_progress(now=raffle.end_date_time + timedelta(seconds=1))
+        ra.is_deleted = False
+        with self.assertRaises(ValidationError):
+            ra.save()
+
+        raffle.refresh_from_db()
+        self.assertEqual((raffle.progress, raffle.applied_count), ('failed', 0))
+        self.assertTrue(RaffleApply.deleted_objects.filter(pk=ra.pk).exists())
+        self.assertFalse(RaffleSlot.objects.filter(raffle=raffle, user=user).exists())
+        self.assertEqual(User.objects.get(pk=user.pk).num_tickets, 1)
+
+    def test_close_error_after_commit(self):
+        raffle = self.create_raffle(target_quantity=1)
+        user = self.create_user(1)
+
+        # 커밋 이후의 종료 처리가 실패해도 응모는 성공
+        with mock.patch.object(Raffle, 'close', side_effect=DatabaseError):
+            ra = raffle.apply(user)
+        raffle.refresh_from_db()
+        self.assertEqual((raffle.progress, raffle.applied_count), ('ongoing', 1))
+
+        # 종료 일시가 지나도 실패(환불)가 아니라 종료(done)로 변경
+        self.assertEqual(Raffle.advance_progress(now=raffle.end_date_time + timedelta(seconds=1)),
+                         {'started': 0, 'closed': 1, 'failed': 0})
+        raffle.refresh_from_db()
+        self.assertEqual(raffle.progress, 'done')
+        self.assertFalse(TicketLedger.objects.filter(raffle_apply=ra, kind='refund').exists())
+
+    def test_apply_to_closed_raffle(self):
+        raffle = self.create_raffle()
+        user = self.create_user(1)
+        Raffle.objects.filter(pk=raffle.pk).update(end_date_time=timezone.now() - timedelta(seconds=1))
+
+        with self.assertRaises(ValidationError):
+            raffle.apply(user)
+        self.assertFalse(TicketLedger.objects.filter(user=user, kind='use').exists())
+        self.assertFalse(RaffleSlot.objects.filter(raffle=raffle, user=user).exists())
+
+
+class ConcurrentRaffleApplyTest(TransactionTestCase):
+    """
+    여러 스레드에서 동시에 응모해도 목표 수량을 넘지 않고, 순번이 겹치지 않고, 응모 수만큼만 티켓을 차감하는지 확인
+    """
+    NUM_USERS = 12
+    TARGET_QUANTITY = 5
+    MAX_RETRIES = 20
+
+    def setUp(self):
+        staff = User.objects.create_user(email='staff@loffle.test', username='staff', sex='M', phone='00000000000')
+        ticket = Ticket.objects.create(quantity=1, price=1000)
+        product = Product.objects.create(name='product', size='270', brand='brand', serial='serial', color='black',
+                                         release_date=timezone.now().date(), user=staff)
+        now = timezone.now()
+        self.raffle = Raffle.objects.create(start_date_time=now - timedelta(days=1),
+                                            end_date_time=now + timedelta(days=1),
+                                            target_quantity=self.TARGET_QUANTITY, user=staff, product=product)
+        self.users = []
+        for i in range(self.NUM_USERS):
+            user = User.objects.create_user(email=f'user{i}@loffle.test', username=f'user{i}', sex='M',
+                                            phone=f'010{i:08d}')
+            TicketBuy.objects.create(ticket=ticket, user=user)
+            self.users.append(user)
+
+    def apply(self, user, barrier):
+        barrier.wait()
+        try:
+            for retries in range(self.MAX_RETRIES):
+                try:
+                    Raffle.objects.get(pk=self.raffle.pk).apply(user)
+                    return 'applied'
+                except ValidationError:
+                    return 'rejected'
+                except DatabaseError:
+                    # 동시 쓰기를 지원하지 않는 DB(SQLite)의 잠금 오류는 트랜잭션 전체가 롤백되므로 다시 시도
+                    sleep(0.01 * (retries + 1))
+            return 'db error'
+        finally:
+            connection.close()
+
+    def test_concurrent_apply(self):
+        # 같은 사용자가 동시에 두 번 응모하는 경우도 포함
+        users = self.users * 2
+        barrier = Barrier(len(users))
+        with ThreadPoolExecutor(max_workers=len(users)) as executor:
+            results = Counter(executor.map(lambda user: self.apply(user, barrier), users))
+
+        self.raffle.refresh_from_db()
+        applies = RaffleApply.objects.filter(raffle=self.raffle)
+        ordinal_numbers = list(applies.values_list('ordinal_number', flat=True))
+
+        self.assertEqual(results['applied'], len(ordinal_numbers))
+        self.assertLessEqual(self.raffle.applied_count, self.TARGET_QUANTITY)
+        self.assertEqual(self.raffle.applied_count, len(ordinal_numbers))
+        self.assertEqual(sorted(ordinal_numbers), list(range(1, len(ordinal_numbers) + 1)))
+        self.assertEqual(len(set(applies.values_list('user', flat=True))), len(ordinal_numbers))
+
+        # 티켓은 응모한 수만큼만 차감
+        debits = TicketLedger.objects.filter(raffle_apply__raffle=self.raffle, kind='use')
+        self.assertEqual(debits.aggregate(total=Sum('quantity'))['total'] or 0, len(ordinal_numbers))
+        self.assertEqual(TicketBalance.objects.filter(user__in=self.users)
+                         .aggregate(total=Sum('num_use_tickets'))['total'], len(ordinal_numbers))
+
+        if not results['db error']:
+            self.assertEqual(len(ordinal_numbers), self.TARGET_QUANTITY)
+            self.assertEqual(self.raffle.progress, 'done')
+
+
+class RaffleProgressTest(RaffleTestMixin, TestCase):
+
+    def test_advance_progress(self):
+        waiting = self.create_raffle(start=timedelta(hours=1), end=timedelta(hours=2))
+        ongoing = self.create_raffle(target_quantity=2)
+        users = [self.create_user(i) for i in range(1, 3)]
+        ra = ongoing.apply(users[0])
+        self.assertEqual((waiting.progress, ongoing.progress), ('waiting', 'ongoing'))
+
+        # 시작 일시가 지나면 waiting -> ongoing
+        self.assertEqual(Raffle.advance_progress(now=waiting.start_date_time),
+                         {'started': 1, 'closed': 0, 'failed': 0})
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.progress, 'ongoing')
+
+        # 종료 일시까지는 그대로
+        self.assertEqual(Raffle.advance_progress(now=waiting.end_date_time),
+                         {'started': 0, 'closed': 0, 'failed': 0})
+
+        # 목표 수량을 채우지 못하고 종료 일시가 지나면 failed, 응모에 사용한 티켓 환불
+        self.assertEqual(Raffle.advance_progress(now=ongoing.end_date_time + timedelta(seconds=1)),
+                         {'started': 0, 'closed': 0, 'failed': 2})
+        self.assertEqual(list(Raffle.objects.filter(pk__in=[waiting.pk, ongoing.pk])
+                              .values_list('progress', flat=True).distinct()), ['failed'])
+        self.assertEqual(TicketLedger.objects.filter(raffle_apply=ra, kind='refund').count(), 1)
+        self.assertEqual(User.objects.get(pk=users[0].pk).num_tickets, 1)
+
+        # 다시 실행해도 환불하지 않음
+        self.assertEqual(Raffle.advance_progress(now=ongoing.end_date_time + timedelta(seconds=1)),
+                         {'started': 0, 'closed': 0, 'failed': 0})
+        self.assertEqual(TicketLedger.objects.filter(raffle_apply=ra, kind='refund').count(), 1)
+
+        # 목표 수량을 채운 래플은 그대로 종료(done)
+        done = self.create_raffle(target_quantity=1)
+        done.apply(users[1])
+        Raffle.advance_progress(now=done.end_date_time + timedelta(seconds=1))
+        done.refresh_from_db()
+        self.assertEqual(done.progress, 'done')
+
+
+class RaffleSchedulerTest(RaffleTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.scheduler = RaffleSchedulerCommand(stdout=StringIO())
+        self.scheduler.poll = timedelta(seconds=5)
+        self.scheduler.warm_up = timedelta(minutes=15)
+        self.scheduler.warmed_until = timezone.now()
+
+    def test_get_next_due(self):
+        self.scheduler.advance()
+        self.assertIsNone(self.scheduler.get_next_due(timezone.now()))
+
+        waiting = self.create_raffle(start=timedelta(hours=1), end=timedelta(hours=2))
+        self.assertEqual(self.scheduler.get_next_due(timezone.now()), waiting.start_date_time)
+
+        # 목표 수량을 채워 종료된 래플은 다음 `poll` 에 1차 추첨
+        raffle = self.create_raffle(target_quantity=3)
+        for i in range(1, 4):
+            raffle.apply(self.create_user(i))
+        self.assertEqual(self.scheduler.get_next_due(timezone.now()), self.scheduler.advanced_at + self.scheduler.poll)
+
+        self.scheduler.advance()
+        raffle.refresh_from_db()
+        self.assertEqual(raffle.candidates_count, 3)
+        self.assertEqual(self.scheduler.get_next_due(timezone.now()),
+                         min(waiting.start_date_time, raffle.announce_date_time - self.scheduler.warm_up))
+
+    def test_warm_up_once(self):
+        raffle = self.create_raffle(target_quantity=3)
+        for i in range(1, 4):
+            raffle.apply(self.create_user(i))
+        self.assertTrue(raffle.create_candidates())
+        raffle.refresh_from_db()
+
+        # 발표 일시 전 `warm_up` 안에 들어오면 한 번만 캐시에 올림
+        self.scheduler.warmed_until = raffle.announce_date_time - self.scheduler.warm_up - timedelta(seconds=1)
+        with mock.patch.object(timezone, 'now', return_value=self.scheduler.warmed_until), \
+                mock.patch.object(RaffleResult, 'cache_many', wraps=RaffleResult.cache_many) as cache_many:
+            self.scheduler.advance()
+            self.assertEqual(cache_many.call_count, 0)
+
+        now = raffle.announce_date_time - self.scheduler.warm_up
+        with mock.patch.object(timezone, 'now', return_value=now), \
+                mock.patch.object(RaffleResult, 'cache_many', wraps=RaffleResult.cache_many) as cache_many:
+            self.assertEqual(self.scheduler.get_next_due(now), now)
+            self.scheduler.advance()
+            self.assertEqual(cache_many.call_count, 1)
+            self.assertIsNone(self.scheduler.get_next_due(now))
+
+            self.scheduler.advance()
+            self.assertEqual(cache_many.call_count, 1)
+
+
+class RaffleConditionalGetTest(RaffleTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.raffle = self.create_raffle()
+
+    def test_list(self):
+        etag = self.client.get('/raffles')['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/raffles', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # 응모 수와 제품 정보가 바뀌면 ETag 가 바뀜
+        self.raffle.apply(self.create_user(1))
+        response = self.client.get('/raffles', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        Product.objects.filter(pk=self.product.pk).update(modified_at=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(self.client.get('/raffles', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail(self):
+        etag = self.client.get(f'/raffles/{self.raffle.pk}')['ETag']
+        self.assertEqual(self.client.get(f'/raffles/{self.raffle.pk}', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # 없는(삭제된) 래플은 ETag 없이 404
+        Raffle.objects.filter(pk=self.raffle.pk).update(is_deleted=True)
+        response = self.client.get(f'/raffles/{self.raffle.pk}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class RaffleApplyRequestTest(RaffleTestMixin, TestCase):
+
+    def test_enqueue_apply_after_rejected(self):
+        raffle = self.create_raffle()
+        TicketBuy.objects.create(ticket=self.ticket, user=self.user)
+
+        # 처리되기 전에 다른 래플에 티켓을 사용해서 처리되지 못한 요청
+        raffle.enqueue_apply(self.user)
+        self.create_raffle().apply(self.user)
+        RaffleApplyRequest.flush()
+        apply_request = RaffleApplyRequest.objects.get(raffle=raffle, user=self.user)
+        self.assertEqual(apply_request.status, 'rejected')
+
+        # 티켓을 구매한 뒤 다시 응모하면 같은 요청을 처리 대기로 되돌림
+        TicketBuy.objects.create(ticket=self.ticket, user=self.user)
+        requeued = raffle.enqueue_apply(self.user)
+        self.assertEqual(requeued.pk, apply_request.pk)
+        self.assertEqual(requeued.status, 'pending')
+        self.assertIsNone(requeued.processed_at)
+
+        RaffleApplyRequest.flush()
+        requeued.refresh_from_db()
+        self.assertEqual(requeued.status, 'applied')
+        self.assertEqual(requeued.raffle_apply.ordinal_number, 1)
+        self.assertEqual(User.objects.get(pk=self.user.pk).num_tickets, 0)
+
+        raffle.refresh_from_db()
+        self.assertEqual((raffle.applied_count, raffle.reserved_count), (1, 0))
+
+
+@mock.patch.object(Raffle, 'CANDIDATES_CHUNK_SIZE', 2)
+class RaffleCandidateTest(RaffleTestMixin, TestCase):
+
+    def setUp(self):
+        # 목표 수량 7 -> 후보자 5 명 (응모 기록은 나눠 읽도록 2 개씩 조회)
+        self.raffle = self.create_raffle(target_quantity=7)
+        self.applies = [self.raffle.apply(self.create_user(i)) for i in range(1, 8)]
+        self.raffle.refresh_from_db()
+
+    def test_iterate_apply_ids(self):
+        self.applies[3].is_deleted = True
+        self.applies[3].save()
+        self.assertEqual(list(self.raffle.iterate_apply_ids()),
+                         [ra.pk for i, ra in enumerate(self.applies) if i != 3])
+
+    def test_sample_candidates(self):
+        candidates = self.raffle.sample_candidates('seed')
+        self.assertEqual(len(candidates), 5)
+        self.assertEqual(len(set(candidates)), 5)
+        self.assertTrue(set(candidates) <= {ra.pk for ra in self.applies})
+
+        # 같은 seed 면 같은 후보자가 같은 순서로 나옴
+        self.assertEqual(self.raffle.sample_candidates('seed'), candidates)
+
+    def test_verify_candidates(self):
+        self.assertTrue(self.raffle.create_candidates(seed='seed'))
+        self.assertEqual(list(self.raffle.candidates.order_by('number_start').values_list('raffle_apply_id', flat=True)),
+                         self.raffle.sample_candidates('seed'))
+        self.assertTrue(self.raffle.verify_candidates())
+
+        # 저장된 후보자를 바꾸면 검증에 실패
+        candidate = self.raffle.candidates.order_by('number_start').first()
+        other = next(ra for ra in self.applies
+                     if not RaffleCandidate.objects.filter(raffle_apply=ra).exists())
+        RaffleCandidate.objects.filter(pk=candidate.pk).update(raffle_apply=other)
+        self.assertFalse(self.raffle.verify_candidates())
+
+
+class RaffleApplicantTest(RaffleTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.raffle = self.create_raffle(target_quantity=10)
+        self.applies = [self.raffle.apply(self.create_user(i)) for i in range(1, 8)]
+
+        # 응모 일시가 같은 응모자가 있어도 id 로 구분해서 순서가 유지되어야 함
+        RaffleApply.objects.filter(pk__in=[ra.pk for ra in self.applies[1:5]]) \
+            .update(created_at=self.applies[1].created_at)
+        self.usernames = [ra.user.username for ra in self.applies]
+
+    def test_cursor_paging(self):
+        usernames, pages, url = [], [], f'/raffles/{self.raffle.pk}/applicants?page_size=2'
+        while url:
+            data = self.client.get(url).json()
+            pages.append([applicant['user'] for applicant in data['results']])
+            usernames += pages[-1]
+            url = data['next']
+        self.assertEqual(usernames, self.usernames)
+
+        # 마지막 페이지에서 이전 페이지로 되돌아가기
+        data = self.client.get(f'/raffles/{self.raffle.pk}/applicants?page_size=2').json()
+        for _ in range(2):
+            data = self.client.get(data['next']).json()
+        self.assertEqual([applicant['user'] for applicant in data['results']], pages[2])
+        for page in reversed(pages[:2]):
+            data = self.client.get(data['previous']).json()
+            self.assertEqual([applicant['user'] for applicant in data['results']], page)
+        self.assertIsNone(data['previous'])
+
+    def test_stream(self):
+        self.applies[2].is_deleted = True
+        self.applies[2].save()
+
+        with mock.patch('loffle.views.RaffleApplicantViewSet.STREAM_CHUNK_SIZE', 2):
+            response = self.client.get(f'/raffles/{self.raffle.pk}/applicants/stream')
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual([loads(line)['user'] for line in lines],
+                         [username for i, username in enumerate(self.usernames) if i != 2])
+
+
+class QueryPlanTest(TestCase):
+    """
+    검색/목록 조회가 기대한 인덱스를 사용하는지 실행 계획(EXPLAIN)으로 확인
+    - 운영 DB(MySQL)에서는 `explain_raffle_search` 명령으로 같은 내용을 확인
+    """
+
+    def assertUsesIndex(self, queryset, *indexes):
+        plan = queryset.explain()
+        for index in indexes:
+            self.assertIn(index, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def search(self, **params):
+        query = QueryDict(mutable=True)
+        query.update(params)
+        filterset = RaffleFilter(query, queryset=Raffle.objects.select_related(None))
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        return filterset.qs
+
+    def test_raffle_search(self):
+        now = timezone.now()
+        week = (now + timedelta(days=7)).isoformat()
+
+        self.assertUsesIndex(self.search(progress='ongoing', end_date_time_after=now.isoformat(),
+                                         end_date_time_before=week).order_by(), 'raffle_progress_end_idx')
+        self.assertUsesIndex(self.search(progress='waiting', start_date_time_after=now.isoformat()).order_by(),
+                             'raffle_progress_start_idx')
+        self.assertUsesIndex(self.search(announce_date_time_after=now.isoformat(),
+                                         announce_date_time_before=week).order_by(), 'raffle_announce_idx')
+        self.assertUsesIndex(self.search(brand='Nike').order_by(), 'product_brand_idx', 'raffle_product_idx')
+
+    def test_common_manager(self):
+        # `is_deleted__in=[False]` 조건으로도 (is_deleted, ...) 인덱스로 조회하고 정렬함
+        self.assertIn('"is_deleted" IN (False)', str(Product.objects.all().query))
+        self.assertUsesIndex(Product.objects.select_related(None).order_by('-created_at', '-id')[:5],
+                             'product_created_idx')
+        self.assertUsesIndex(Product.deleted_objects.select_related(None).order_by('-created_at', '-id')[:5],
+                             'product_created_idx')
@@ -1,27 +1,41 @@
+from json import dumps
+from math import ceil
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db.models import Case, When, Value
+from django.db.models import Case, When, Value, F, IntegerField, Exists, OuterRef
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
-from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_200_OK
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_200_OK, \
+    HTTP_429_TOO_MANY_REQUESTS, HTTP_202_ACCEPTED, HTTP_404_NOT_FOUND
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
+from _common.cache import CachedResponseMixin
 from _common.views import CommonViewSet
 from _common.permissions import IsSuperuserOrReadOnly, IsStaffAndOwnerOrReadOnly
 from _common.serializers import CustomSerializer
-from account.models import User
-from loffle.models import Ticket, TicketBuy, Product, Raffle, RaffleApply, RaffleCandidate, RaffleWinner
-from loffle.paginations import RafflePagination
+from loffle.filters import RaffleFilter, ProductFilter
+from loffle.models import Ticket, TicketBuy, Product, Raffle, RaffleApply, RaffleCandidate, RaffleWinner, \
+    RaffleResult, RaffleApplyRequest, ProductFacet
+from loffle.paginations import RafflePagination, ApplyUserPagination, ProductPagination
 from loffle.serializers import TicketSerializer, ProductSerializer, RaffleSerializer, RaffleApplicantSerializer, \
     RaffleCandidateSerializer, RaffleWinnerSerializer
+from loffle.waiting_room import WaitingRoom
 
 
-class TicketViewSet(ModelViewSet):
+class TicketViewSet(CachedResponseMixin, ModelViewSet):
     permission_classes = [IsSuperuserOrReadOnly]
 
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
 
+    cache_group = 'ticket'
+    cache_dependencies = {Ticket: 'pk'}
+
     @action(methods=('post',), detail=True, permission_classes=(IsAuthenticated,), serializer_class=CustomSerializer,
             url_path='buy', url_name='buy')
     def buy_ticket(self, request, **kwargs):
@@ -51,9 +65,24 @@ class TicketViewSet(ModelViewSet):
 class ProductViewSet(CommonViewSet):
     permission_classes = [IsStaffAndOwnerOrReadOnly]  # Only Staff and Owner has Obj Permission
 
+    pagination_class = ProductPagination
+
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
 
+    filterset_class = ProductFilter
+
+    cache_group = 'product'
+    cache_dependencies = {Product: 'pk'}
+
+    @action(methods=('get',), detail=False, serializer_class=CustomSerializer,
+            url_path='facets', url_name='facets')
+    def facets(self, request, **kwargs):
+        """
+        제품 패싯(브랜드, 사이즈, 색상)별 값과 제품 수 - 미리 계산된 `ProductFacet`만 조회
+        """
+        return Response(ProductFacet.get_counts())
+
 
 class RaffleViewSet(CommonViewSet):
     permission_classes = [IsStaffAndOwnerOrReadOnly]  # Only Staff and Owner has Obj Permission
@@ -62,107 +91,195 @@ class RaffleViewSet(CommonViewSet):
     serializer_class = RaffleSerializer
     queryset = Raffle.objects.all()
 
-    def list(self, request, *args, **kwargs):
-        qs = self.filter_queryset(self.get_queryset())
-
-        ordering_keys_iter = iter(Raffle.PROGRESS_ORDERING.keys())
-        ordering_values_iter = iter(Raffle.PROGRESS_ORDERING.values())
+    # 정렬(`?ordering=`)을 지정하지 않으면 진행 상황 순서로 정렬 (`RafflePagination`)
+    filter_backends = (DjangoFilterBackend, OrderingFilter)
+    filterset_class = RaffleFilter
+    ordering_fields = ('start_date_time', 'end_date_time', 'announce_date_time', 'created_at')
 
-        # 'ongoing'
-        qs1 = qs.filter(progress=next(ordering_keys_iter)).order_by('end_date_time') \
-            .annotate(
-            rank=Value(next(ordering_values_iter))
-        )
+    # 응모 수는 modified_at 을 바꾸지 않는 UPDATE 로 갱신되고, 응모 여부는 사용자마다 다름
+    etag_fields = CommonViewSet.etag_fields + ('applied_count', 'product.modified_at')
+    etag_per_user = True
 
-        # 'waiting'
-        qs2 = qs.filter(progress=next(ordering_keys_iter)).order_by('start_date_time') \
-            .annotate(
-            rank=Value(next(ordering_values_iter))
-        )
+    # 상세 조회만 캐시 (응모 여부 때문에 사용자별로 캐시)
+    cache_group = 'raffle'
+    cache_dependencies = {Raffle: 'pk', RaffleApply: 'raffle_id', Product: None}
+    cache_actions = ('retrieve',)
+    cache_per_user = True
 
-        # 'done', 'failed'
-        qs3 = qs.filter(progress__in=list(Raffle.PROGRESS_ORDERING.keys())[2:]) \
-            .order_by('-end_date_time') \
-            .annotate(
-            rank=Case(
-                When(progress=next(ordering_keys_iter), then=Value(next(ordering_values_iter))),
-                When(progress=next(ordering_keys_iter), then=Value(next(ordering_values_iter))),
-                default=Value(99),
-            )
-        )
+    def get_queryset(self):
+        qs = super().get_queryset().select_related('product')
 
-        # result = qs1.union(qs2, qs3)
-        query_list = [*qs1, *qs2, *qs3]
+        # 요청한 사용자의 응모 여부를 행마다 조회하지 않고 한 쿼리에서 계산
+        user = self.request.user
+        if user.is_authenticated:
+            qs = qs.annotate(apply_or_not=Exists(RaffleApply.objects.filter(raffle=OuterRef('pk'), user=user)))
 
-        page = self.paginate_queryset(query_list)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        if self.action != 'list':
+            return qs
 
-        serializer = self.get_serializer(query_list, many=True)
-        return Response(serializer.data)
+        ongoing, waiting, done = list(Raffle.PROGRESS_ORDERING.keys())[:3]
+        return qs.annotate(
+            # 진행 상황 순서: ongoing -> waiting -> done, failed
+            rank=Case(
+                When(progress=ongoing, then=Value(Raffle.PROGRESS_ORDERING[ongoing])),
+                When(progress=waiting, then=Value(Raffle.PROGRESS_ORDERING[waiting])),
+                default=Value(Raffle.PROGRESS_ORDERING[done]),
+                output_field=IntegerField(),
+            ),
+            # 진행 상황별 정렬 기준: ongoing 은 종료 일시 / waiting 은 시작 일시 / done, failed 는 종료 일시(역순)
+            sort_key=Case(
+                When(progress=waiting, then=F('start_date_time')),
+                default=F('end_date_time'),
+            ),
+        )
 
     @action(methods=('post',), detail=True, permission_classes=(IsAuthenticated,), serializer_class=CustomSerializer,
             url_path='apply', url_name='apply')
     def apply_raffle(self, request, **kwargs):
         obj = self.get_object()
-        applied_cnt = obj.applied_count  # 현재 래플에 응모된 티켓 수량
 
-        # RaffleApply 객체 생성하여 저장할 때 clean() 메소드에서 응모 가능 조건들 검사
-        # 조건: 응모 여부 / 래플 상태 / 티켓 소유 / 응모 가능 수량
-        ra = RaffleApply(raffle=obj, user=request.user)
+        # 대기열이 있는 래플은 입장한 대기표(`token`)가 있어야 응모 가능
+        if obj.admission_rate:
+            try:
+                status = WaitingRoom(obj).check(request.data.get('token'), request.user)
+            except ValidationError as e:
+                return Response(e.message_dict, status=HTTP_400_BAD_REQUEST)
+            if not status['admitted']:
+                return Response({'detail': '아직 입장 순서가 아닙니다.', **status}, status=HTTP_429_TOO_MANY_REQUESTS,
+                                headers={'Retry-After': str(ceil(status['estimated_wait']))})
+
+        # write-behind 모드: 정원만 예약하고 접수증 반환 (처리 결과는 `apply-receipt` 로 조회)
+        if settings.RAFFLE_APPLY_MODE == 'queued':
+            try:
+                apply_request = obj.enqueue_apply(request.user)
+            except ValidationError as e:
+                return Response(e.message_dict, status=HTTP_400_BAD_REQUEST)
+            return Response({'detail': '래플 응모 접수✅', **apply_request.get_receipt()}, status=HTTP_202_ACCEPTED)
+
+        # 응모 가능 조건(래플 상태 / 응모 가능 수량 / 응모 여부 / 티켓 소유) 검사와 저장을 한 트랜잭션에서 처리
         try:
-            ra.full_clean()
+            ra = obj.apply(request.user)
         except ValidationError as e:
             return Response(e.message_dict, status=HTTP_400_BAD_REQUEST)
-        ra.save()
 
-        ordinal_number = applied_cnt + 1
-        return Response({'detail': '래플 응모 성공✅', 'ordinal_number': ordinal_number}, status=HTTP_201_CREATED)
+        return Response({'detail': '래플 응모 성공✅', 'ordinal_number': ra.ordinal_number}, status=HTTP_201_CREATED)
+
+    @action(methods=('get',), detail=True, permission_classes=(IsAuthenticated,), serializer_class=CustomSerializer,
+            url_path='apply-receipt', url_name='apply-receipt')
+    def apply_receipt(self, request, **kwargs):
+        """
+        응모 접수증 조회 (write-behind 모드) - 처리 상태(`status`: pending / applied / rejected)와 응모 순번
+        """
+        apply_request = RaffleApplyRequest.objects.select_related('raffle_apply') \
+            .filter(raffle_id=kwargs['pk'], user=request.user).first()
+        if apply_request is None:
+            return Response({'detail': '접수된 응모 요청이 없습니다.'}, status=HTTP_404_NOT_FOUND)
+        return Response(apply_request.get_receipt())
+
+    @action(methods=('get', 'post'), detail=True, permission_classes=(IsAuthenticated,),
+            serializer_class=CustomSerializer, url_path='waiting-room', url_name='waiting-room')
+    def waiting_room(self, request, **kwargs):
+        """
+        래플 응모 대기열
+        - POST: 대기표(`token`) 발급 / GET `?token=`: 대기 순서(`position`), 입장 여부, 예상 대기 시간(초) 조회
+        - 입장(`admitted`)하면 대기표를 `apply` 요청 본문의 `token` 으로 보냄
+        """
+        obj = self.get_object()
+        if not obj.admission_rate:
+            return Response({'detail': '대기열이 없는 래플입니다.'}, status=HTTP_400_BAD_REQUEST)
+        if obj.progress not in (Raffle.PROGRESS_CHOICES[0][0], Raffle.PROGRESS_CHOICES[1][0]):
+            return Response({'detail': f'진행 상황이 <{obj.get_progress_display()}>인 래플입니다.'},
+                            status=HTTP_400_BAD_REQUEST)
+
+        room = WaitingRoom(obj)
+        if request.method == 'POST':
+            return Response(room.join(request.user), status=HTTP_201_CREATED)
+
+        try:
+            return Response(room.check(request.query_params.get('token'), request.user))
+        except ValidationError as e:
+            return Response(e.message_dict, status=HTTP_400_BAD_REQUEST)
 
-    @action(methods=('post',), detail=True, permission_classes=(AllowAny,), serializer_class=CustomSerializer,
+    @action(methods=('post',), detail=True, permission_classes=(IsAdminUser,), serializer_class=CustomSerializer,
             url_path='refresh-progress', url_name='refresh-progress')
     def refresh_progress(self, request, **kwargs):
         """
-        래플 상태를 새로고침 (임시)
+        래플 상태를 새로고침 (관리자용)
+        - 진행 상황은 `run_raffle_scheduler` 가 시작/종료 일시에 맞춰 바꾸므로 스케줄러가 멈췄을 때만 사용
         """
         obj = self.get_object()
         prev_progress = obj.get_progress_display()
 
-        obj.progress = None
-        obj.save()
+        Raffle.advance_progress()
+        obj.refresh_from_db(fields=['progress'])
 
         now_progress = obj.get_progress_display()
 
         if prev_progress != now_progress:
             message = f'래플 상태가 변경되었습니다. prev:{prev_progress} -> now:{now_progress}'
         else:
-            message = f'래플 상태가 변경되지 않았습니다.'
+            message = '래플 상태가 변경되지 않았습니다.'
         return Response({'detail': message}, status=HTTP_200_OK)
 
 
 class RaffleApplicantViewSet(ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     serializer_class = RaffleApplicantSerializer
+    pagination_class = ApplyUserPagination
+
+    STREAM_CHUNK_SIZE = 2000
 
     def get_queryset(self):
-        return User.objects.filter(
-            applied_raffles__raffle_id=self.kwargs['parent_lookup_raffle']).order_by('applied_raffles__created_at')
+        return RaffleApply.objects \
+            .filter(raffle_id=self.kwargs['parent_lookup_raffle']) \
+            .only('id', 'created_at', 'user__username') \
+            .order_by('created_at', 'id')
+
+    @action(methods=('get',), detail=False, url_path='stream', url_name='stream')
+    def stream(self, request, **kwargs):
+        """
+        응모자 전체를 한 줄에 한 명씩(NDJSON) 스트리밍
+        - 응모자가 많은 래플을 한 번에 내려받을 때 사용하며, 나눠 읽으므로 메모리 사용량이 일정함
+        """
+        # 목록 조회와 같은 (응모 일시, id) 키셋으로 나눠 읽음
+        queryset = self.pagination_class().iterate_queryset(self.get_queryset(), self.STREAM_CHUNK_SIZE)
+        serializer = self.get_serializer()
+        lines = (dumps(serializer.to_representation(ra), ensure_ascii=False) + '\n' for ra in queryset)
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson; charset=utf-8')
+
+
+class RaffleResultMixin:
+    """
+    목록 조회는 추첨 직후 만들어 둔 결과 스냅샷(`RaffleResult`)으로 응답하고, 스냅샷이 없을 때만 직접 조회
+    """
+    result_kind = None
+
+    def list(self, request, *args, **kwargs):
+        payload = RaffleResult.get_payload(self.kwargs['parent_lookup_raffle'], self.result_kind)
+        if payload is not None:
+            return Response(payload)
+        return super().list(request, *args, **kwargs)
 
 
-class RaffleCandidateViewSet(ReadOnlyModelViewSet):
+class RaffleCandidateViewSet(RaffleResultMixin, ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     serializer_class = RaffleCandidateSerializer
+    result_kind = RaffleResult.KIND_CHOICES[0][0]
 
     def get_queryset(self):
-        return RaffleCandidate.objects.filter(
-            raffle_apply__raffle_id=self.kwargs['parent_lookup_raffle'])
+        return RaffleCandidate.objects \
+            .filter(raffle_id=self.kwargs['parent_lookup_raffle']) \
+            .select_related('raffle_apply__user') \
+            .order_by('number_start')
 
 
-class RaffleWinnerViewSet(ReadOnlyModelViewSet):
+class RaffleWinnerViewSet(RaffleResultMixin, ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     serializer_class = RaffleWinnerSerializer
+    result_kind = RaffleResult.KIND_CHOICES[1][0]
 
     def get_queryset(self):
-        return RaffleWinner.objects.filter(
-            raffle_candidate__raffle_apply__raffle_id=self.kwargs['parent_lookup_raffle'])
+        return RaffleWinner.objects \
+            .filter(raffle_candidate__raffle_id=self.kwargs['parent_lookup_raffle']) \
+            .select_related('raffle_candidate__raffle_apply__user') \
+            .order_by('id')
@@ -0,0 +1,88 @@
+from time import time
+
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+
+class WaitingRoom:
+    """
+    래플 응모 대기열 - 대기표를 순서대로 발급하고, 초당 `Raffle.admission_rate` 명씩 입장시킴
+    - 대기표 번호는 캐시의 원자적 증가(incr)로 발급하고, 입장한 인원(frontier)은 시간이 지나면 계산으로 늘어남
+      (입장 처리를 하는 별도 워커가 없음)
+    - 대기열이 비면 기준 시각을 옮겨서, 한가한 동안 입장 가능 인원이 쌓였다가 한꺼번에 몰리지 않게 함
+    - 응모 시작 전에 받은 대기표는 시작 일시부터 입장
+    - 대기표(token)는 서명되어 있어 다른 래플/사용자가 쓸 수 없음
+    """
+    token_salt = 'loffle.waiting-room'
+
+    def __init__(self, raffle):
+        self.raffle = raffle
+        self.rate = raffle.admission_rate
+
+    def key(self, name):
+        return f'waiting-room:{self.raffle.pk}:{name}'
+
+    @property
+    def timeout(self):
+        # 응모 종료 후 1시간까지 유지
+        return max(self.raffle.end_date_time.timestamp() - time(), 0) + 60 * 60
+
+    def get_admitted(self, now=None):
+        """
+        지금까지 입장한 인원 (대기표 번호가 이 값 이하면 입장)
+        """
+        now = now or time()
+        issued = cache.get(self.key('issued'), 0)
+        admitted, since = cache.get(self.key('frontier')) or (0, self.raffle.start_date_time.timestamp())
+        if now <= since:
+            return admitted
+
+        admitted += int((now - since) * self.rate)
+        if admitted >= issued:
+            cache.set(self.key('frontier'), (issued, now), timeout=self.timeout)
+            return issued
+        return admitted
+
+    def join(self, user):
+        """
+        대기표 발급 (이미 받은 사용자에게는 같은 대기표를 다시 돌려줌)
+        """
+        user_key = self.key(f'user:{user.pk}')
+        number = cache.get(user_key)
+        if number is None:
+            # 대기열이 비어 있으면 기준 시각을 지금으로 옮긴 뒤 발급
+            self.get_admitted()
+            cache.add(self.key('issued'), 0, timeout=self.timeout)
+            number = cache.incr(self.key('issued'))
+            if not cache.add(user_key, number, timeout=self.timeout):
+                number = cache.get(user_key)
+
+        token = signing.dumps({'r': self.raffle.pk, 'u': user.pk, 'n': number}, salt=self.token_salt)
+        return {'token': token, **self.get_status(number)}
+
+    def get_status(self, number):
+        admitted = self.get_admitted()
+        ahead = max(number - admitted, 0)
+        wait = ahead / self.rate
+        start = self.raffle.start_date_time.timestamp() - time()
+        if start > 0:
+            wait += start
+        return {
+            'number': number,
+            'position': ahead,
+            'admitted': ahead == 0,
+            'estimated_wait': round(wait, 1),
+        }
+
+    def check(self, token, user):
+        """
+        대기표 확인 - 잘못된 대기표면 ValidationError, 올바르면 대기 상황 반환
+        """
+        try:
+            data = signing.loads(token or '', salt=self.token_salt)
+        except signing.BadSignature:
+            data = None
+        if not data or data.get('r') != self.raffle.pk or data.get('u') != user.pk:
+            raise ValidationError({'token': ['대기열에서 발급받은 올바른 대기표가 필요합니다.']})
+        return self.get_status(data['n'])